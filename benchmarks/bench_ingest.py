@@ -0,0 +1,87 @@
+"""Measure ingest throughput: validating and serializing CSV rows for solr.
+
+Runs feed_ursus.importer.map_row_for_solr, which is what `feed_ursus load` does for
+each row, on copies of a typical work row. It is timed as it is, and with the full
+comparison dump that UrsusSolrRecord's validator used to make of every record, even
+when it had no computed fields to compare. Run with:
+
+    python benchmarks/bench_ingest.py [--rows N]
+"""
+
+import argparse
+import csv
+import time
+from collections.abc import Callable, Generator
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, ContextManager
+
+from feed_ursus.importer import map_row_for_solr
+from feed_ursus.ursus_solr_record import UrsusSolrRecord
+
+FIXTURE = Path(__file__).parent.parent / "tests/fixtures/anais_work_simple.csv"
+
+
+def make_rows(count: int) -> list[dict[str, Any]]:
+    with FIXTURE.open(encoding="utf-8") as stream:
+        template = next(csv.DictReader(stream))
+
+    template.pop("Parent ARK")
+    template |= {
+        "Date.normalized": "1914/1920",
+        "Rights.copyrightStatus": "copyrighted",
+        "Subject topic": "Photography|~|Portraits",
+    }
+
+    return [template | {"Item ARK": f"ark:/21198/zz{n:08d}"} for n in range(count)]
+
+
+@contextmanager
+def comparison_dump() -> Generator[None, None, None]:
+    """Serialize every validated record in full, as the validator used to."""
+
+    original = UrsusSolrRecord.model_validate
+
+    def model_validate(obj: Any, *args: Any, **kwargs: Any) -> UrsusSolrRecord:  # noqa: ANN401 (any-type)
+        record = original(obj, *args, **kwargs)
+        record.model_dump(mode="json")
+        return record
+
+    setattr(UrsusSolrRecord, "model_validate", model_validate)
+    try:
+        yield
+    finally:
+        setattr(UrsusSolrRecord, "model_validate", original)
+
+
+def rows_per_second(rows: list[dict[str, Any]]) -> float:
+    start = time.perf_counter()
+    for row in rows:
+        mapped = map_row_for_solr(dict(row))
+        assert mapped.error is None, mapped.error
+    return len(rows) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=5000)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    variants: list[tuple[str, Callable[[], ContextManager[None]]]] = [
+        ("with comparison dump", comparison_dump),
+        ("without", nullcontext),
+    ]
+
+    results: list[float] = []
+    for name, context in variants:
+        with context():
+            rate = rows_per_second(rows)
+        results.append(rate)
+        print(f"{name}: {rate:.0f} rows/s ({1e6 / rate:.0f} us/row)")
+
+    print(f"speedup: {results[1] / results[0]:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
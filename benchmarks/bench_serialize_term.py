@@ -0,0 +1,55 @@
+"""Time serialize_term on a record's worth of controlled values.
+
+Compares the lookup maps in feed_ursus.controlled_fields with the linear scan over
+enum members that serialize_term used to do. Run with:
+
+    python benchmarks/bench_serialize_term.py
+"""
+
+import timeit
+from enum import Enum
+
+from feed_ursus.controlled_fields import ResourceType, RightsStatement
+from feed_ursus.util import serialize_term
+
+# Label strings, as found in less strict records, for each controlled field that
+# serialize_term converts to ids
+RECORD = [
+    (ResourceType, [member.value for member in list(ResourceType)[-3:]]),
+    (RightsStatement, [list(RightsStatement)[-1].value]),
+]
+# each field is serialized by several computed fields (_sim, _ssim, _tesim)
+CALLS_PER_FIELD = 3
+
+
+def linear_scan(item: str, enum_cls: type[Enum]) -> str:
+    for member in enum_cls:
+        if member.value == item:
+            return member.name
+    return item
+
+
+def serialize_record_linear() -> None:
+    for enum_cls, values in RECORD:
+        for _ in range(CALLS_PER_FIELD):
+            [linear_scan(value, enum_cls) for value in values]
+
+
+def serialize_record() -> None:
+    for enum_cls, values in RECORD:
+        for _ in range(CALLS_PER_FIELD):
+            serialize_term(values, by="id", enum_cls=enum_cls)
+
+
+def main() -> None:
+    number = 20_000
+    for name, fn in [
+        ("linear scan", serialize_record_linear),
+        ("lookup maps", serialize_record),
+    ]:
+        seconds = min(timeit.repeat(fn, number=number, repeat=5))
+        print(f"{name}: {seconds / number * 1e6:.2f} µs per record")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Measure how long feed_ursus takes to import, i.e. the startup cost of every command.
+
+Each scenario is run in a fresh interpreter with `python -X importtime`, and the
+median total import time is reported, along with the modules that take longest on
+their own. To compare revisions, run it on each one:
+
+    python benchmarks/bench_startup.py [--runs N] [--top N]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+SCENARIOS = {
+    # what `feed_ursus --help` pays
+    "cli": "import feed_ursus.feed_ursus",
+    # what every subcommand pays, e.g. `feed_ursus count`
+    "importer": "import feed_ursus.feed_ursus, feed_ursus.importer",
+    # what `feed_ursus load` and `feed_ursus reindex` pay on top
+    "records": (
+        "import feed_ursus.importer, feed_ursus.reindex; "
+        "feed_ursus.reindex.less_strict_solr_record.LessStrictSolrRecord"
+    ),
+}
+
+
+def import_times(code: str) -> tuple[int, dict[str, int]]:
+    """Run `code` in a new interpreter, and return its total import time, and the
+    time taken by each module on its own, in microseconds."""
+
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+
+    total = 0
+    self_times: dict[str, int] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        self_times[name.strip()] = int(self_us)
+        if not name.startswith("  "):  # a top-level import
+            total += int(cumulative_us)
+
+    return total, self_times
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5)
+    args = parser.parse_args()
+
+    for scenario, code in SCENARIOS.items():
+        totals: list[int] = []
+        self_times: defaultdict[str, list[int]] = defaultdict(list)
+        for _ in range(args.runs):
+            total, times = import_times(code)
+            totals.append(total)
+            for name, us in times.items():
+                self_times[name].append(us)
+
+        print(f"{scenario}: {statistics.median(totals) / 1000:.0f} ms")
+        slowest = sorted(
+            self_times.items(), key=lambda item: statistics.median(item[1])
+        )[-args.top :]
+        for name, times in reversed(slowest):
+            print(f"    {statistics.median(times) / 1000:6.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,12 @@ import os
 import click
 
 from feed_sinai.sinai_json_importer import SinaiJsonImporter
+from feed_ursus.submission import (
+    CommitPolicy,
+    SubmissionSettings,
+    commit_options,
+    submission_options,
+)
 
 
 @click.group()
@@ -43,8 +49,20 @@ def export(base_path: str) -> None:
     default=os.getenv("SOLR_URL", "http://localhost:8983/solr/ursus"),
     # help="URL of a solr instance, e.g. http://localhost:8983/solr/ursus",
 )
-def load(base_path: str, solr_url: str) -> None:
-    importer = SinaiJsonImporter(base_path=base_path, solr_url=solr_url)
+@commit_options
+@submission_options
+def load(
+    base_path: str,
+    solr_url: str,
+    commit_policy: CommitPolicy,
+    submission: SubmissionSettings,
+) -> None:
+    importer = SinaiJsonImporter(
+        base_path=base_path,
+        solr_url=solr_url,
+        commit_policy=commit_policy,
+        submission=submission,
+    )
     asyncio.run(importer.load_to_solr())
 
 
@@ -9,7 +9,6 @@ Output is pushed to a solr index suitable for use by https://github.com/UCLALibr
 import asyncio
 import json
 import logging
-from math import inf
 from pathlib import Path
 from typing import Any, Awaitable, Iterator, Optional
 
@@ -19,6 +18,13 @@ from pysolr import Solr, SolrError  # type: ignore
 
 import feed_sinai.sinai_types as st
 from feed_sinai.solr_record import ManuscriptSolrRecord
+from feed_ursus.submission import (
+    REJECTED_STATUSES,
+    RETRY_STATUSES,
+    CommitMode,
+    CommitPolicy,
+    SubmissionSettings,
+)
 
 
 class SinaiJsonImporter:
@@ -27,15 +33,27 @@ class SinaiJsonImporter:
     base_path: Path
     solr: Solr
     solr_url: str | None
+    commit_policy: CommitPolicy
+    submission: SubmissionSettings
     async_client = httpx.AsyncClient()
-    connection_pool = asyncio.Semaphore(3)
+    connection_pool: asyncio.Semaphore
 
     _ms_objs_merged: dict[Path, st.ManuscriptObjectMerged]
 
-    def __init__(self, base_path: str = ".", solr_url: Optional[str] = None):
+    def __init__(
+        self,
+        base_path: str = ".",
+        solr_url: Optional[str] = None,
+        commit_policy: CommitPolicy = CommitPolicy(),
+        submission: SubmissionSettings = SubmissionSettings(),
+    ):
         self.base_path = Path(base_path)
-        self.solr = Solr(solr_url, always_commit=True)
+        # commits are left to `commit_policy`
+        self.solr = Solr(solr_url, always_commit=False)
         self.solr_url = solr_url
+        self.commit_policy = commit_policy
+        self.submission = submission
+        self.connection_pool = asyncio.Semaphore(submission.max_concurrent)
 
         self._ms_objs_merged = dict()
 
@@ -328,47 +346,89 @@ class SinaiJsonImporter:
     def solr_record(self, ms_obj: st.ManuscriptObjectMerged) -> dict[str, Any]:
         return json.loads(ManuscriptSolrRecord(ms_obj=ms_obj).model_dump_json())
 
-    async def load_to_solr(self, batch_size: float = inf) -> None:
-        """
-        Loads records to Solr in batches. `batch_size` should be a positive integer or
-        `math.inf`.
-        """
-        batch: list[dict] = list()
-        results: list[Awaitable[None]] = list()
-
+    def iterate_solr_records(self) -> Iterator[dict[str, Any]]:
         for record in self.iterate_merged_records():
             try:
-                batch.append(self.solr_record(record))
+                yield self.solr_record(record)
             except Exception as e:
                 logging.warning(f"could not generate solr document {record.ark}: {e}")
 
-            if len(batch) > 100:
-                results.append(self.add_batch(batch))
-                batch = list()
-
-        if len(batch) > 0:
-            results.append(self.add_batch(batch))
+    async def load_to_solr(self) -> None:
+        """
+        Loads records to Solr in batches, as configured by `self.submission`.
+        """
+        results: list[Awaitable[None]] = [
+            self.add_batch(batch)
+            for batch in self.submission.batches(self.iterate_solr_records())
+        ]
 
         await asyncio.gather(*results)
 
-    async def add_batch(self, batch: list[dict]) -> None:
+        if self.commit_policy.mode is CommitMode.FINAL:
+            response = await self.async_client.post(
+                f"{self.solr_url}/update", params={"commit": "true"}
+            )
+            if response.is_error:
+                raise self.solr_error(response)
+
+    @staticmethod
+    def error_message(response: httpx.Response) -> str:
         try:
-            async with self.connection_pool:
+            return response.json()["error"]["msg"]
+        except (ValueError, KeyError, TypeError):
+            return response.text
+
+    @classmethod
+    def solr_error(cls, response: httpx.Response) -> SolrError:
+        """An error for a failed solr response, like the ones pysolr raises."""
+
+        return SolrError(
+            f"Solr responded with an error (HTTP {response.status_code}): "
+            f"{cls.error_message(response)}"
+        )
+
+    async def post_update(self, batch: list[dict]) -> httpx.Response:
+        """Post `batch` to solr, retrying with exponential backoff after a 429 or 5xx
+        response."""
+
+        async with self.connection_pool:
+            for attempt in range(self.submission.retries + 1):
                 response = await self.async_client.post(
-                    f"{self.solr_url}/update?commit=true", json=batch
+                    f"{self.solr_url}/update",
+                    params=self.commit_policy.update_params(),
+                    json=batch,
                 )
+                if response.status_code not in RETRY_STATUSES:
+                    break
+                if attempt < self.submission.retries:
+                    await asyncio.sleep(self.submission.backoff_seconds(attempt))
 
-            if response.is_error:
-                raise SolrError(response.json().get("error").get("msg"))
-
-        except Exception as e:
-            if len(batch) == 1:
-                print(f"Error adding record {batch[0]['id']}: {e}")
-            else:
-                mid = int(len(batch) / 2)
-                await asyncio.gather(
-                    self.add_batch(batch[:mid]), self.add_batch(batch[mid:])
-                )
+        return response
+
+    async def add_batch(self, batch: list[dict]) -> None:
+        """Post `batch` to solr. If solr rejects the documents, split the batch in half
+        and retry each half, so that only the offending documents are left out.
+
+        Other errors, e.g. a 5xx response that is still failing after the retries, are
+        raised rather than bisected, since they would affect every half just the same.
+        """
+
+        response = await self.post_update(batch)
+        if not response.is_error:
+            return
+
+        if response.status_code not in REJECTED_STATUSES:
+            raise self.solr_error(response)
+
+        if len(batch) == 1:
+            print(
+                f"Error adding record {batch[0]['id']}: {self.error_message(response)}"
+            )
+        else:
+            mid = int(len(batch) / 2)
+            await asyncio.gather(
+                self.add_batch(batch[:mid]), self.add_batch(batch[mid:])
+            )
 
     def save_solr_records(self) -> None:
         (self.base_path / "solr").mkdir(exist_ok=True)
@@ -379,4 +439,5 @@ class SinaiJsonImporter:
             )
 
     def wipe_solr_records(self) -> None:
-        self.solr.delete(q="*:*")
+        self.solr.delete(q="*:*", **self.commit_policy.delete_kwargs())
+        self.commit_policy.finish(self.solr)
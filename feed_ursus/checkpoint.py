@@ -0,0 +1,181 @@
+"""Checkpoints, so that long-running commands can carry on where they stopped."""
+
+import hashlib
+import json
+import threading
+import time
+from collections import deque
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from types import TracebackType
+from typing import Any, TypeVar
+
+import click
+
+T = TypeVar("T")
+M = TypeVar("M")
+
+
+class Checkpoint:
+    """Records how far a command has got, so that it can be resumed with --resume.
+
+    Work is sent to solr in batches, each registered with `add` along with the state
+    the command will have reached once it is written: e.g. the last record or input
+    row in the batch, and the number of errors so far. Batches may be written out of
+    order by several threads, so the checkpoint only moves on to the end of the
+    longest run of batches that have all been written. It is saved at most every
+    `interval` seconds while the command runs, and when it fails. Used as a context
+    manager, the checkpoint is removed once the command finishes.
+
+    Args:
+        cache_dir: Directory in which checkpoints are kept, or None to keep none.
+        command: Name of the command.
+        inputs: What the command is working through, e.g. the solr URL and query, or
+            input files. Only a run with the same inputs resumes the checkpoint.
+        resume: Carry on from the checkpoint left by an earlier run.
+        interval: Minimum number of seconds between saves.
+    """
+
+    path: Path | None
+    command: str
+    inputs: dict[str, Any]
+    interval: float
+    resumed: dict[str, Any] | None
+    state: dict[str, Any] | None
+
+    def __init__(
+        self,
+        cache_dir: Path | None,
+        command: str,
+        inputs: dict[str, Any],
+        resume: bool = False,
+        interval: float = 10,
+    ):
+        self.path = None
+        if cache_dir:
+            digest = hashlib.sha256(
+                json.dumps(inputs, sort_keys=True).encode("utf-8")
+            ).hexdigest()[:16]
+            self.path = cache_dir / "checkpoints" / f"{command}-{digest}.json"
+
+        self.command = command
+        self.inputs = inputs
+        self.interval = interval
+
+        self._lock = threading.Lock()
+        self._added = 0
+        self._written = 0
+        self._finished: set[int] = set()
+        self._pending: dict[int, dict[str, Any]] = {}
+        self._saved_at = time.monotonic()
+
+        self.resumed = self.load() if resume else None
+        if resume and self.resumed is None:
+            raise click.ClickException(
+                f"No checkpoint to resume {command} from"
+                + ("" if self.path else ": checkpoints are kept in the cache dir")
+            )
+        self.state = self.resumed
+
+    def load(self) -> dict[str, Any] | None:
+        if self.path is None:
+            return None
+        try:
+            saved = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if saved.get("inputs") != self.inputs:
+            return None
+        return saved["state"]
+
+    def add(self, state: dict[str, Any]) -> int:
+        """Register a batch that is about to be sent, returning a ticket to pass to
+        `written` once it has been."""
+
+        with self._lock:
+            ticket = self._added
+            self._added += 1
+            self._pending[ticket] = state
+            return ticket
+
+    def written(self, ticket: int) -> None:
+        with self._lock:
+            self._finished.add(ticket)
+            while self._written in self._finished:
+                self._finished.remove(self._written)
+                self.state = self._pending.pop(self._written)
+                self._written += 1
+
+            if time.monotonic() - self._saved_at >= self.interval:
+                self._save()
+
+    def save(self) -> None:
+        with self._lock:
+            self._save()
+
+    def _save(self) -> None:
+        self._saved_at = time.monotonic()
+        if self.path is None or self.state is None:
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(
+            json.dumps({"inputs": self.inputs, "state": self.state}), encoding="utf-8"
+        )
+        tmp_path.replace(self.path)
+
+    def clear(self) -> None:
+        if self.path:
+            self.path.unlink(missing_ok=True)
+
+    def __enter__(self) -> "Checkpoint":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if exc is None:
+            self.clear()
+        else:
+            self.save()
+            if self.path and self.state is not None:
+                click.echo(
+                    f"Progress saved: run {self.command} again with --resume to "
+                    "carry on.",
+                    err=True,
+                )
+
+
+def describe_files(filenames: Iterable[str]) -> list[dict[str, Any]]:
+    """Identify input files for a checkpoint, so that it isn't resumed if they have
+    changed since."""
+
+    return [
+        {
+            "path": str(Path(filename).resolve()),
+            "size": (stat := Path(filename).stat()).st_size,
+            "mtime": stat.st_mtime,
+        }
+        for filename in filenames
+    ]
+
+
+def with_marks(
+    batches: Iterable[list[T]], marks: "deque[M]"
+) -> Iterator[tuple[list[T], M]]:
+    """Pair each batch with the mark of its last item.
+
+    The producer of the items appends one mark to `marks` for each item, just before
+    the item is taken. Since batching keeps items in order, the marks of each batch
+    are at the front of the queue when it comes out, followed by at most the mark of
+    the item that started the next batch.
+    """
+
+    for batch in batches:
+        for _ in batch[1:]:
+            marks.popleft()
+        yield batch, marks.popleft()
@@ -0,0 +1,91 @@
+"""Compression for the JSON Lines files written by `feed_ursus dump`."""
+
+import gzip
+import io
+from enum import Enum
+from pathlib import Path
+from typing import TextIO
+
+import click
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+class Compression(Enum):
+    NONE = "none"
+    GZIP = "gzip"
+    ZSTD = "zstd"  # needs the optional zstandard package
+
+    @classmethod
+    def of_file(cls, path: str | Path) -> "Compression":
+        """Tell how a file is compressed from its first few bytes."""
+
+        with open(path, "rb") as file:
+            magic = file.read(4)
+
+        if magic.startswith(GZIP_MAGIC):
+            return Compression.GZIP
+        if magic == ZSTD_MAGIC:
+            return Compression.ZSTD
+        return Compression.NONE
+
+    @property
+    def extension(self) -> str:
+        """Suffix added to the names of compressed files."""
+
+        match self:
+            case Compression.NONE:
+                return ""
+            case Compression.GZIP:
+                return ".gz"
+            case Compression.ZSTD:
+                return ".zst"
+
+    def check_available(self) -> None:
+        """Raise a `click.ClickException` if the package needed for this compression
+        isn't installed."""
+
+        if self is Compression.ZSTD:
+            try:
+                import zstandard  # type: ignore # noqa: F401
+            except ImportError:
+                raise click.ClickException(
+                    "zstd compression needs the zstandard package, e.g. "
+                    "`uv tool install feed_ursus --with zstandard`"
+                )
+
+    def compress(self, data: bytes) -> bytes:
+        match self:
+            case Compression.NONE:
+                return data
+            case Compression.GZIP:
+                # mtime=0 so that the same documents always give the same checksum
+                return gzip.compress(data, compresslevel=6, mtime=0)
+            case Compression.ZSTD:
+                import zstandard  # type: ignore
+
+                return zstandard.ZstdCompressor().compress(data)  # type: ignore
+
+    def open_text(self, path: str | Path) -> TextIO:
+        """Open a file compressed this way for reading, as a stream of text."""
+
+        match self:
+            case Compression.NONE:
+                return open(path, "r", encoding="utf-8")
+            case Compression.GZIP:
+                return gzip.open(path, "rt", encoding="utf-8")
+            case Compression.ZSTD:
+                self.check_available()
+                import zstandard  # type: ignore
+
+                reader = zstandard.ZstdDecompressor().stream_reader(  # type: ignore
+                    open(path, "rb"), read_across_frames=True, closefd=True
+                )
+                return io.TextIOWrapper(reader, encoding="utf-8")  # type: ignore
+
+
+def open_text(path: str | Path) -> TextIO:
+    """Open a file for reading as text, decompressing it first if it's compressed."""
+
+    return Compression.of_file(path).open_text(path)
@@ -5,6 +5,7 @@ should be defined with the class Enum syntax and conventional, all-uppercase mem
 names."""
 
 from enum import Enum
+from functools import cache
 from typing import Annotated
 
 from pydantic.functional_validators import AfterValidator
@@ -79,6 +80,18 @@ License = Enum(
 )
 
 
+@cache
+def ids_by_label(enum_cls: type[Enum]) -> dict[str, str]:
+    """Map each term label in a controlled vocabulary to its id."""
+    return {member.value: member.name for member in enum_cls}
+
+
+@cache
+def labels_by_id(enum_cls: type[Enum]) -> dict[str, str]:
+    """Map each term id in a controlled vocabulary to its label."""
+    return {member.name: member.value for member in enum_cls}
+
+
 # Defined as models in Californica
 class ObjectType(Enum):
     COLLECTION = "Collection"
@@ -5,14 +5,19 @@
 
 import importlib.metadata
 import typing
+from datetime import datetime
 from math import inf
+from pathlib import Path
 
 import click
-import requests
-from packaging.version import Version
-from pydantic import BaseModel, ConfigDict
 
-from feed_ursus.importer import Importer
+from feed_ursus.compression import Compression
+from feed_ursus.submission import (
+    CommitPolicy,
+    SubmissionSettings,
+    commit_options,
+    submission_options,
+)
 
 
 @click.group()
@@ -29,7 +34,33 @@ from feed_ursus.importer import Importer
 @click.option(
     "--check-outdated/--ignore-outdated",
     default=True,
-    help="Check pypi for a newer version, and exit if one exists.",
+    help="Check pypi for a newer version (in the background, and at most daily), "
+    "and exit if one exists.",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=None,
+    help="Directory for caches kept between runs (default: ~/.cache/feed_ursus).",
+)
+@click.option(
+    "--cache/--no-cache",
+    default=True,
+    help="Enable or disable caches kept between runs.",
+)
+@click.option(
+    "--timeout",
+    type=click.FloatRange(0, None, min_open=True),
+    default=10,
+    show_default=True,
+    help="Timeout in seconds for HTTP requests to solr and IIIF servers.",
+)
+@click.option(
+    "--verbose",
+    "-v",
+    is_flag=True,
+    default=False,
+    help="Report the number of HTTP connections opened when the command finishes.",
 )
 @click.version_option(version=importlib.metadata.version("feed_ursus"))
 @click.pass_context
@@ -38,17 +69,56 @@ def feed_ursus(
     solr_url: str,
     show_progress: bool,
     check_outdated: bool,
+    cache_dir: Path | None,
+    cache: bool,
+    timeout: float,
+    verbose: bool,
 ):
     """CLI for managing a Solr index for Ursus."""
 
-    if check_outdated and (new_version := is_outdated()):
-        raise click.ClickException(
-            f"feed_ursus is outdated: please upgrade to version {new_version}"
-            "(e.g. `uv tool upgrade feed_ursus`)"
+    # imported here rather than at the top, so that --help and --version stay quick
+    from feed_ursus.http_client import HttpClient
+    from feed_ursus.importer import Importer
+    from feed_ursus.pypi import OutdatedCheck
+    from feed_ursus.util import default_cache_dir
+
+    http = HttpClient(timeout=timeout)
+    if verbose:
+        ctx.call_on_close(
+            lambda: click.echo(
+                f"{http.connections_opened()} HTTP connections opened.", err=True
+            )
+        )
+
+    cache_dir = (cache_dir or default_cache_dir()) if cache else None
+
+    if check_outdated:
+        # not `http`: the importer remounts adapters on that session as it goes
+        check = OutdatedCheck(
+            cache_path=cache_dir / "pypi_version.json" if cache_dir else None
         )
+        if new_version := check.result:
+            raise click.ClickException(
+                f"feed_ursus is outdated: please upgrade to version {new_version} "
+                "(e.g. `uv tool upgrade feed_ursus`)"
+            )
+        ctx.call_on_close(check.warn)
 
     ctx.ensure_object(dict)
-    ctx.obj["importer"] = Importer(solr_url=solr_url, show_progress=show_progress)
+    ctx.obj["importer"] = Importer(
+        solr_url=solr_url,
+        show_progress=show_progress,
+        cache_dir=cache_dir,
+        http=http,
+    )
+
+
+resume_option = click.option(
+    "--resume",
+    is_flag=True,
+    default=False,
+    help="Carry on from where an earlier run with the same input stopped.",
+)
 
 
 @feed_ursus.command("load")
@@ -58,15 +128,63 @@ def feed_ursus(
     default=True,
     help="Enable or disable batch mode.",
 )
+@click.option(
+    "--workers",
+    type=click.IntRange(1, None),
+    default=1,
+    help="Number of processes used to validate and serialize records.",
+)
+@click.option(
+    "--manifest-concurrency",
+    type=click.IntRange(1, None),
+    default=8,
+    help="Maximum number of IIIF manifests to download at once.",
+)
+@click.option(
+    "--refresh-thumbnails",
+    is_flag=True,
+    default=False,
+    help="Download every IIIF manifest again, ignoring cached thumbnails.",
+)
+@click.option(
+    "--skip-unchanged",
+    is_flag=True,
+    default=False,
+    help="Skip records whose content is the same as when they were last loaded.",
+)
+@resume_option
 @click.pass_context
-def load_csv(ctx: click.Context, filenames: typing.List[str], batch: bool):
+@commit_options
+@submission_options
+def load_csv(
+    ctx: click.Context,
+    filenames: typing.List[str],
+    batch: bool,
+    workers: int,
+    manifest_concurrency: int,
+    refresh_thumbnails: bool,
+    skip_unchanged: bool,
+    resume: bool,
+    commit_policy: CommitPolicy,
+    submission: SubmissionSettings,
+):
     """Load data from a csv.
 
     Args:
         filenames: A list of CSV filenames.
     """
 
-    ctx.obj["importer"].load_csv(filenames=filenames, batch=batch)
+    ctx.obj["importer"].submission = submission
+    ctx.obj["importer"].load_csv(
+        filenames=filenames,
+        batch=batch,
+        workers=workers,
+        manifest_concurrency=manifest_concurrency,
+        refresh_thumbnails=refresh_thumbnails,
+        commit_policy=commit_policy,
+        resume=resume,
+        skip_unchanged=skip_unchanged,
+    )
 
 
 @feed_ursus.command()
@@ -75,15 +193,22 @@ def load_csv(ctx: click.Context, filenames: typing.List[str], batch: bool):
     "--yes/--no", is_flag=True, default=False, help="Skip confirmation prompts."
 )
 @click.pass_context
-def delete(ctx: click.Context, items: typing.List[str], yes: bool):
+@commit_options
+def delete(
+    ctx: click.Context,
+    items: typing.List[str],
+    yes: bool,
+    commit_policy: CommitPolicy,
+):
     """Delete records from a Solr index.
 
     Args:
         solr_url: URL of a solr instance.
         items: List of items to delete. Can be ARKs, Solr IDs, or csv filenames.
                If a csv filename is provided, all ARKs in the file will be deleted.
+               Use "-" to read items from stdin, one per line.
     """
-    ctx.obj["importer"].delete(items=items, yes=yes)
+    ctx.obj["importer"].delete(items=items, yes=yes, commit_policy=commit_policy)
 
 
 @feed_ursus.command()
@@ -108,7 +233,18 @@ def log(ctx: click.Context):
     default=None,
     help="Stop after this many errors.",
 )
-def validate(ctx: click.Context, start: int = 0, max_errors: int | None = None):
+@click.option(
+    "--page-size",
+    type=click.IntRange(1, None),
+    default=250,
+    help="Number of records to fetch from solr per request.",
+)
+def validate(
+    ctx: click.Context,
+    start: int = 0,
+    max_errors: int | None = None,
+    page_size: int = 250,
+):
     """Validate solr index.
 
     All records will be validated as Ursus records, and any errors printed to stdout.
@@ -116,7 +252,9 @@ def validate(ctx: click.Context, start: int = 0, max_errors: int | None = None):
     Example:
         >>> feed_ursus validate
     """
-    ctx.obj["importer"].validate(start=start, max_errors=(max_errors or inf))
+    ctx.obj["importer"].validate(
+        start=start, max_errors=(max_errors or inf), page_size=page_size
+    )
 
 
 @feed_ursus.command()
@@ -153,13 +291,61 @@ def count(ctx: click.Context, query: str = "ark_ssi:*"):
     default=False,
     help="Check data processing but do not resubmit to solr.",
 )
+@click.option(
+    "--page-size",
+    type=click.IntRange(1, None),
+    default=250,
+    help="Number of records to fetch from solr per request.",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(1, None),
+    default=1,
+    help="Number of processes used to reindex records.",
+)
+@click.option(
+    "--incremental",
+    is_flag=True,
+    default=False,
+    help=(
+        "Only reindex records last loaded or reindexed by an older version of "
+        "feed_ursus."
+    ),
+)
+@click.option(
+    "--modified-before",
+    type=click.DateTime(),
+    default=None,
+    help="With --incremental, also reindex records last modified before this date.",
+)
+@click.option(
+    "--atomic-updates/--full-updates",
+    "atomic",
+    default=True,
+    show_default=True,
+    help=(
+        "Send only the fields that have changed, as atomic updates, rather than "
+        "whole records."
+    ),
+)
+@resume_option
 @click.argument("query", nargs=1, type=click.STRING, default="ark_ssi:*")
+@commit_options
+@submission_options
 def reindex(
     ctx: click.Context,
+    commit_policy: CommitPolicy,
+    submission: SubmissionSettings,
     query: str = "ark_ssi:*",
     start: int = 0,
     max_errors: int | None = None,
     dry_run: bool = False,
+    page_size: int = 250,
+    workers: int = 1,
+    resume: bool = False,
+    incremental: bool = False,
+    modified_before: datetime | None = None,
+    atomic: bool = True,
 ):
     """Reindex solr index.
 
@@ -170,11 +356,19 @@ def reindex(
     Example:
         >>> feed_ursus reindex
     """
+    ctx.obj["importer"].submission = submission
     ctx.obj["importer"].reindex(
         query=query,
         start=start,
         max_errors=(max_errors or inf),
         dry_run=dry_run,
+        page_size=page_size,
+        workers=workers,
+        commit_policy=commit_policy,
+        resume=resume,
+        incremental=incremental,
+        modified_before=modified_before,
+        atomic=atomic,
     )
 
 
@@ -191,57 +385,73 @@ def reindex(
     default=1000,
     help="Number of records to save per file.",
 )
+@click.option(
+    "--compression",
+    type=click.Choice([compression.value for compression in Compression]),
+    default=Compression.NONE.value,
+    show_default=True,
+    help="Compress each file with gzip or zstd (zstd needs the zstandard package).",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(1, None),
+    default=1,
+    help="Number of threads compressing and writing files.",
+)
 @click.pass_context
-def dump(ctx: click.Context, filename_prefix: str, batch_size: int):
+def dump(
+    ctx: click.Context,
+    filename_prefix: str,
+    batch_size: int,
+    compression: str,
+    workers: int,
+):
     """Write entire index to disk.
 
     Example:
         >>> feed_ursus dump --filename-prefix data
-        # writes output to `data01.jsonl`, `data02.jsonl`, etc.
+        # writes output to `data01.jsonl`, `data02.jsonl`, etc., and a list of the
+        # files with their record counts and checksums to `data.manifest.json`
     """
-    ctx.obj["importer"].dump(filename_prefix=filename_prefix, batch_size=batch_size)
+    ctx.obj["importer"].dump(
+        filename_prefix=filename_prefix,
+        batch_size=batch_size,
+        compression=Compression(compression),
+        workers=workers,
+    )
 
 
 @feed_ursus.command()
 @click.pass_context
 @click.argument("filenames", nargs=-1, type=click.Path(exists=True, dir_okay=False))
-def loaddump(ctx: click.Context, filenames: tuple[str, ...]):
+@click.option(
+    "--workers",
+    type=click.IntRange(1, None),
+    default=1,
+    help="Number of processes used to reindex records.",
+)
+@resume_option
+@commit_options
+@submission_options
+def loaddump(
+    ctx: click.Context,
+    filenames: tuple[str, ...],
+    workers: int,
+    resume: bool,
+    commit_policy: CommitPolicy,
+    submission: SubmissionSettings,
+):
     """
-    Reload data saved with 'feed_ursus dump'.
+    Reload data saved with 'feed_ursus dump'. Files compressed with gzip or zstd are
+    decompressed as they are read.
 
     Example:
-        >>> feed_ursus load_dump data*.jsonl
+        >>> feed_ursus load_dump data*.jsonl.gz
     """
-    ctx.obj["importer"].load_dump(filenames)
-
-
-class PyPIInfo(BaseModel):
-    """Very limited model of a PyPI json response – intended only for retrieving version
-    numbers, everything else is ignored."""
-
-    model_config = ConfigDict(extra="ignore")
-    version: str
-
-
-class PyPIResponse(BaseModel):
-    """Very limited model of a PyPI json response – intended only for retrieving version
-    numbers, everything else is ignored."""
-
-    model_config = ConfigDict(extra="ignore")
-    info: PyPIInfo
-
-
-def is_outdated() -> typing.Literal[False] | Version:
-    local_version = Version(importlib.metadata.version("feed_ursus"))
-    response = PyPIResponse.model_validate(
-        requests.get("https://pypi.python.org/pypi/feed_ursus/json").json()
+    ctx.obj["importer"].submission = submission
+    ctx.obj["importer"].load_dump(
+        filenames, commit_policy=commit_policy, workers=workers, resume=resume
     )
-    latest_version = Version(response.info.version)
-
-    if local_version < latest_version and not local_version.is_devrelease:
-        return latest_version
-    else:
-        return False
 
 
 if __name__ == "__main__":
@@ -0,0 +1,93 @@
+"""A single pooled HTTP session for the requests feed_ursus makes to solr, IIIF
+servers and PyPI."""
+
+import importlib.metadata
+from typing import Any
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class HttpClient:
+    """Wraps a `requests.Session`, so that connections are kept alive and reused across
+    every request in a run.
+
+    Responses are requested gzip-compressed, and every request gets `timeout` unless
+    it passes its own. Adapters with their own retry policy can be mounted for a URL
+    prefix, e.g. the solr core, with `mount`.
+
+    Args:
+        timeout: Default timeout in seconds for each request.
+        pool_maxsize: Number of connections kept open per host.
+    """
+
+    session: requests.Session
+    timeout: float
+    pool_maxsize: int
+
+    def __init__(self, timeout: float = 10, pool_maxsize: int = 10):
+        self.session = requests.Session()
+        self.session.headers.update(
+            {
+                "Accept-Encoding": "gzip, deflate",
+                "User-Agent": f"feed_ursus/{importlib.metadata.version('feed_ursus')}",
+            }
+        )
+        self.timeout = timeout
+        self.pool_maxsize = pool_maxsize
+
+        self._adapters: dict[str, HTTPAdapter] = {}
+        self._retired_connections = 0
+        self.mount("http://")
+        self.mount("https://")
+
+    def mount(
+        self,
+        prefix: str,
+        max_retries: Retry | int = 0,
+        pool_maxsize: int | None = None,
+    ) -> None:
+        """Use a new pooled adapter for URLs starting with `prefix`."""
+
+        if old := self._adapters.get(prefix):
+            self._retired_connections += self._count_connections(old)
+            old.close()
+
+        adapter = HTTPAdapter(
+            pool_maxsize=max(pool_maxsize or 0, self.pool_maxsize),
+            max_retries=max_retries,
+        )
+        self._adapters[prefix] = adapter
+        self.session.mount(prefix, adapter)
+
+    def ensure_pool_size(self, pool_maxsize: int) -> None:
+        """Keep at least `pool_maxsize` connections open per host, for that many
+        concurrent requests."""
+
+        if pool_maxsize > self.pool_maxsize:
+            self.pool_maxsize = pool_maxsize
+            for prefix, adapter in list(self._adapters.items()):
+                self.mount(prefix, adapter.max_retries, pool_maxsize)
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:  # noqa: ANN401 (any-type)
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.get(url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> requests.Response:  # noqa: ANN401 (any-type)
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.post(url, **kwargs)
+
+    def connections_opened(self) -> int:
+        """Number of TCP connections opened so far."""
+
+        return self._retired_connections + sum(
+            self._count_connections(adapter) for adapter in self._adapters.values()
+        )
+
+    @staticmethod
+    def _count_connections(adapter: HTTPAdapter) -> int:
+        pools = adapter.poolmanager.pools
+        return sum(
+            pool.num_connections for key in pools.keys() if (pool := pools.get(key))
+        )
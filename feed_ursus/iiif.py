@@ -0,0 +1,287 @@
+"""Pick thumbnails for records by downloading their IIIF manifests."""
+
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import requests
+
+from feed_ursus.http_client import HttpClient
+
+
+def thumbnail_from_manifest_json(manifest: Any) -> str | None:  # noqa: ANN401 (any-type)
+    """Picks a thumbnail from a IIIF presentation 2 manifest.
+
+    Uses the canvas labelled "f. 001r" if there is one, otherwise the first canvas.
+
+    Returns:
+        A string containing the thumbnail URL, or None if the manifest has no images
+        or can't be parsed.
+    """
+
+    try:
+        canvases = {
+            c["label"]: c["images"][0]["resource"]["service"]["@id"]
+            for seq in manifest["sequences"]
+            for c in seq["canvases"]
+        }
+
+        return (
+            canvases.get("f. 001r") or list(canvases.values())[0]
+        ) + "/full/!200,200/0/default.jpg"
+
+    except Exception:
+        return None
+
+
+class CachedThumbnail(NamedTuple):
+    thumbnail: str | None
+    etag: str | None
+    last_modified: str | None
+    fetched_at: float
+
+
+class ThumbnailCache:
+    """Single-file SQLite cache of the thumbnails picked from IIIF manifests.
+
+    Entries are keyed on manifest URL, and keep the ETag and Last-Modified headers of
+    the manifest so that stale entries can be revalidated with a conditional request.
+    Once there are more than `max_entries`, the least recently used are evicted, when
+    the cache is opened and after every `EVICT_INTERVAL` new entries.
+
+    Args:
+        path: Location of the SQLite database. Created if it doesn't exist.
+        ttl: Seconds for which an entry is used without revalidation.
+        max_entries: Maximum number of manifests to remember.
+    """
+
+    path: Path
+    ttl: float
+    max_entries: int
+
+    # Number of entries put between evictions
+    EVICT_INTERVAL = 1000
+
+    def __init__(
+        self,
+        path: Path,
+        ttl: float = 7 * 24 * 60 * 60,
+        max_entries: int = 100_000,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+        self._puts_since_evict = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database the first time it's used, so that commands that never
+        download a manifest don't pay for it. Call with `_lock` held."""
+
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            with self._db:
+                self._db.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS thumbnails (
+                        manifest_url TEXT PRIMARY KEY,
+                        thumbnail TEXT,
+                        etag TEXT,
+                        last_modified TEXT,
+                        fetched_at REAL NOT NULL,
+                        used_at REAL NOT NULL
+                    )
+                    """
+                )
+                self._db.execute(
+                    "CREATE INDEX IF NOT EXISTS thumbnails_used_at "
+                    "ON thumbnails (used_at)"
+                )
+                self._evict(self._db)
+        return self._db
+
+    def get(self, manifest_url: str) -> CachedThumbnail | None:
+        with self._lock:
+            db = self._connect()
+            row = db.execute(
+                "SELECT thumbnail, etag, last_modified, fetched_at FROM thumbnails "
+                "WHERE manifest_url = ?",
+                (manifest_url,),
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            db.execute(
+                "UPDATE thumbnails SET used_at = ? WHERE manifest_url = ?",
+                (time.time(), manifest_url),
+            )
+            return CachedThumbnail(*row)
+
+    def is_fresh(self, entry: CachedThumbnail) -> bool:
+        return time.time() - entry.fetched_at < self.ttl
+
+    def put(
+        self,
+        manifest_url: str,
+        thumbnail: str | None,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> None:
+        now = time.time()
+        with self._lock:
+            db = self._connect()
+            db.execute(
+                "INSERT OR REPLACE INTO thumbnails VALUES (?, ?, ?, ?, ?, ?)",
+                (manifest_url, thumbnail, etag, last_modified, now, now),
+            )
+
+            self._puts_since_evict += 1
+            if self._puts_since_evict >= self.EVICT_INTERVAL:
+                self._evict(db)
+
+    def commit(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.commit()
+
+    def evict(self) -> None:
+        """Remove the least recently used entries beyond `max_entries`."""
+
+        with self._lock:
+            db = self._connect()
+            with db:
+                self._evict(db)
+
+    def _evict(self, db: sqlite3.Connection) -> None:
+        self._puts_since_evict = 0
+        db.execute(
+            "DELETE FROM thumbnails WHERE manifest_url IN ("
+            "  SELECT manifest_url FROM thumbnails ORDER BY used_at DESC"
+            "  LIMIT -1 OFFSET ?"
+            ")",
+            (self.max_entries,),
+        )
+
+
+class ManifestFetcher:
+    """Downloads IIIF manifests over a pooled session, several at a time.
+
+    Args:
+        max_concurrency: Maximum number of manifests to download at once.
+        timeout: Timeout in seconds for each request.
+        cache: If given, thumbnails are remembered between runs, and manifests are
+            only requested again once their cache entries expire.
+        refresh: Ignore anything in the cache, download every manifest again and
+            update the cache with the results.
+        http: Client whose connection pool is used for the downloads.
+    """
+
+    timeout: float
+    http: HttpClient
+    session: requests.Session
+    cache: ThumbnailCache | None
+    refresh: bool
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        timeout: float = 10,
+        cache: ThumbnailCache | None = None,
+        refresh: bool = False,
+        http: HttpClient | None = None,
+    ):
+        self.http = http or HttpClient()
+        self.session = self.http.session
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.cache = cache
+        self.refresh = refresh
+
+    @property
+    def max_concurrency(self) -> int:
+        return self._max_concurrency
+
+    @max_concurrency.setter
+    def max_concurrency(self, value: int) -> None:
+        # keep enough pooled connections for every thread
+        self._max_concurrency = value
+        self.http.ensure_pool_size(value)
+
+    def thumbnail(self, manifest_url: str) -> str | None:
+        """Download a single manifest and pick its thumbnail."""
+
+        thumbnail = self._thumbnail(manifest_url)
+        if self.cache:
+            self.cache.commit()
+        return thumbnail
+
+    def _thumbnail(self, manifest_url: str) -> str | None:
+        """Like `thumbnail`, but leaves any change to the cache uncommitted."""
+
+        cached = None
+        if self.cache and not self.refresh:
+            cached = self.cache.get(manifest_url)
+
+        if cached and self.cache and self.cache.is_fresh(cached):
+            return cached.thumbnail
+
+        headers: dict[str, str] = {}
+        if cached and cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached and cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+
+        try:
+            response = self.session.get(
+                manifest_url, headers=headers, timeout=self.timeout
+            )
+
+            if cached and response.status_code == 304:
+                thumbnail = cached.thumbnail
+            else:
+                thumbnail = thumbnail_from_manifest_json(response.json())
+
+            if self.cache and response.status_code in (200, 304):
+                self.cache.put(
+                    manifest_url,
+                    thumbnail,
+                    etag=response.headers.get("ETag") or (cached and cached.etag),
+                    last_modified=(
+                        response.headers.get("Last-Modified")
+                        or (cached and cached.last_modified)
+                    ),
+                )
+
+            return thumbnail
+
+        except Exception:
+            return None
+
+    def thumbnails(self, manifest_urls: Iterable[str]) -> dict[str, str | None]:
+        """Download several manifests concurrently.
+
+        Returns:
+            A dict mapping each manifest URL to its thumbnail URL (or None).
+        """
+
+        unique_urls = list(dict.fromkeys(manifest_urls))
+        if len(unique_urls) <= 1:
+            results = {url: self._thumbnail(url) for url in unique_urls}
+        else:
+            with ThreadPoolExecutor(
+                max_workers=min(self.max_concurrency, len(unique_urls))
+            ) as pool:
+                results = dict(zip(unique_urls, pool.map(self._thumbnail, unique_urls)))
+
+        if self.cache:
+            self.cache.commit()
+
+        return results
@@ -2,32 +2,42 @@
 """Convert UCLA Library CSV files for Ursus, our Blacklight installation."""
 
 import csv
+import functools
+import hashlib
 import importlib.metadata
 import json
 import logging
+import sys
 import typing
-from collections.abc import Iterable
+from collections import deque
+from collections.abc import Iterable, Iterator
 from datetime import datetime, timezone
 from getpass import getuser
-from math import ceil, inf
+from math import inf
 from pathlib import Path
 
 import click
 import pydantic
-import requests
 import rich.progress
 import rich.rule
+from packaging.version import InvalidVersion, Version
 from pysolr import Solr, SolrError  # type: ignore
 from rich.console import Console
 from rich.table import Table
 
+from feed_ursus.checkpoint import Checkpoint, describe_files, with_marks
+from feed_ursus.compression import Compression, open_text
 from feed_ursus.controlled_fields import (
     ResourceType,
 )
-from feed_ursus.reindex import UnexplainedChangesError, reindex_record
-from feed_ursus.ursus_solr_record import (
-    IngestSolrRecord,
-    UrsusSolrRecord,
+from feed_ursus.http_client import HttpClient
+from feed_ursus.iiif import ManifestFetcher, ThumbnailCache
+from feed_ursus.parallel import BackgroundWriter, ordered_map, prefetch
+from feed_ursus.submission import (
+    CommitPolicy,
+    SubmissionSettings,
+    add_bisecting,
+    solr_error_status,
 )
 from feed_ursus.util import (
     Ark,
@@ -35,28 +45,91 @@ from feed_ursus.util import (
     MARCList,
     UnknownItemError,
     UrsusId,
+    chunked,
     id_for_debugging,
+    solr_quote,
 )
 
+# The record models take a while to build, and deepdiff to import, so they are
+# imported where they are used: commands like `count` don't need them at all
+if typing.TYPE_CHECKING:
+    from feed_ursus.ursus_solr_record import IngestSolrRecord, UrsusSolrRecord
+
 
 class Importer:
     solr_url: str
     show_progress: bool
     solr_client: Solr
+    cache_dir: Path | None
 
     ingest_id: str  # for sync load_csv
-    titles: dict[Ark, str]
+    missing_titles: set[Ark]
+    http: HttpClient
+    manifests: ManifestFetcher
 
-    def __init__(self, solr_url: str, show_progress: bool = True):
+    def __init__(
+        self,
+        solr_url: str,
+        show_progress: bool = True,
+        cache_dir: Path | None = None,
+        submission: SubmissionSettings = SubmissionSettings(),
+        http: HttpClient | None = None,
+    ):
         self.solr_url = solr_url
         self.show_progress = show_progress
-
-        self.solr_client = Solr(solr_url, always_commit=True)
+        self.cache_dir = cache_dir
+
+        # every request to solr and IIIF servers shares one connection pool, and the
+        # same timeout
+        self.http = http or HttpClient()
+        self.submission = submission
+
+        self.solr_client = Solr(
+            solr_url,
+            session=self.http.session,
+            # pysolr hands this straight to requests, which takes a float, though its
+            # signature says int
+            timeout=self.http.timeout,  # pyright: ignore[reportArgumentType]
+        )
+        self.manifests = ManifestFetcher(
+            cache=(
+                ThumbnailCache(cache_dir / "thumbnails.sqlite") if cache_dir else None
+            ),
+            timeout=self.http.timeout,
+            http=self.http,
+        )
 
         self.ingest_id = f"{datetime.now(timezone.utc).isoformat()}-{getuser()}"
-        self.titles = {}
+        self._titles: dict[Ark, str] | None = None
+        self.missing_titles = set()
+
+    @property
+    def submission(self) -> SubmissionSettings:
+        return self._submission
+
+    @submission.setter
+    def submission(self, value: SubmissionSettings) -> None:
+        # retry solr requests, with enough pooled connections for every writer
+        self._submission = value
+        if self.solr_url:
+            value.mount(self.http, self.solr_url)
+
+    @property
+    def titles(self) -> dict[Ark, str]:
+        """Titles of records, keyed by ARK.
+
+        Collection titles are loaded from solr the first time this is accessed, so
+        subcommands that don't need titles never pay for the preload.
+        """
+
+        if self._titles is None:
+            self._titles = {}
+            self.titles_from_solr()
+        return self._titles
 
-        self.titles_from_solr()
+    @titles.setter
+    def titles(self, value: dict[Ark, str]) -> None:
+        self._titles = value
 
     T = typing.TypeVar("T")
 
@@ -64,13 +137,16 @@ class Importer:
         self,
         iter: typing.Iterable[T],
         description: str,
+        total: float | None = None,
     ) -> typing.Iterable[T]:
         if self.show_progress:
-            return rich.progress.track(iter, description=description)
+            return rich.progress.track(iter, description=description, total=total)
         else:
             return iter
 
-    def get_ingest_record(self, filenames: list[str]) -> IngestSolrRecord:
+    def get_ingest_record(self, filenames: list[str]) -> "IngestSolrRecord":
+        from feed_ursus.ursus_solr_record import IngestSolrRecord
+
         return IngestSolrRecord(
             id=self.ingest_id,
             is_ingest_bsi=True,
@@ -85,102 +161,320 @@ class Importer:
             ],
         )
 
-    def load_csv(self, filenames: list[str], batch: bool):
+    def iterate_csv_rows(self, filenames: Iterable[str]) -> Iterator[dict[str, str]]:
+        """Yield rows from one or more CSV files, without reading them into memory."""
+
+        for filename in filenames:
+            with open(filename, encoding="utf-8") as stream:
+                yield from csv.DictReader(stream)
+
+    def load_csv(
+        self,
+        filenames: list[str],
+        batch: bool,
+        workers: int = 1,
+        manifest_concurrency: int | None = None,
+        refresh_thumbnails: bool = False,
+        commit_policy: CommitPolicy = CommitPolicy(),
+        resume: bool = False,
+        skip_unchanged: bool = False,
+    ):
         """Load data from a csv.
 
+        Rows are streamed from disk, mapped, and submitted to solr in batches, so memory
+        use does not grow with the size of the input. If an ARK appears more than once,
+        the last row wins. The position of the last row saved is kept in a checkpoint,
+        so that with `resume` an interrupted load carries on after it, as part of the
+        same ingest.
+
         Args:
             filenames: A list of CSV filenames.
+            batch: If False, submit records to solr one at a time. Otherwise they are
+                submitted in batches, as configured by `self.submission`.
+            workers: Number of processes used to validate and serialize records.
+            manifest_concurrency: Maximum number of IIIF manifests to download at once.
+            refresh_thumbnails: Download every IIIF manifest again, even if its
+                thumbnail is cached.
+            commit_policy: When submitted records are committed.
+            resume: Carry on from the checkpoint left by an earlier load of the same
+                files.
+            skip_unchanged: Don't submit records whose content hash matches the one
+                already in solr.
         """
 
-        csv_data = {
-            row["Item ARK"]: row
-            for filename in self.maybe_progress(
-                filenames,
-                description=f"loading {len(filenames)} files...",
+        checkpoint = self.checkpoint(
+            "load", {"files": describe_files(filenames)}, resume=resume
+        )
+        resumed_row: int = checkpoint.resumed["row"] if checkpoint.resumed else -1
+        n_errors: int = checkpoint.resumed.get("errors", 0) if checkpoint.resumed else 0
+
+        if manifest_concurrency:
+            self.manifests.max_concurrency = manifest_concurrency
+        self.manifests.refresh = refresh_thumbnails
+
+        # First pass: keep only the ARKs, titles, and the position of the last row
+        # for each ARK, so that memory use doesn't scale with the size of the rows.
+        # Also collect the ARKs of parent and related records, so that their titles
+        # can be looked up in a few requests rather than one per row.
+        last_positions: dict[str, int] = {}
+        titles: dict[Ark, str] = {}
+        referenced_arks: set[Ark] = set()
+        for position, row in enumerate(
+            self.iterate_csv_rows(
+                self.maybe_progress(
+                    filenames,
+                    description=f"loading {len(filenames)} files...",
+                )
             )
-            for row in csv.DictReader(open(filename, encoding="utf-8"))
-        }
+        ):
+            last_positions[row["Item ARK"]] = position
+            titles[row["Item ARK"]] = row["Title"]
+            if row.get("Object Type") not in ("ChildWork", "Page"):
+                referenced_arks.update(self.referenced_arks(row))
+
+        self.ingest_id = (
+            checkpoint.resumed["ingest_id"]
+            if checkpoint.resumed
+            else f"{datetime.now(timezone.utc).isoformat()}-{getuser()}"
+        )
+        self.titles.update(titles)
+        self.fetch_titles(ark for ark in referenced_arks if ark not in self.titles)
 
-        self.ingest_id = f"{datetime.now(timezone.utc).isoformat()}-{getuser()}"
-        self.titles.update({row["Item ARK"]: row["Title"] for row in csv_data.values()})
+        rows = (
+            (position, row)
+            for position, row in enumerate(self.iterate_csv_rows(filenames))
+            if last_positions[row["Item ARK"]] == position and position > resumed_row
+        )
+        n_rows = sum(
+            1 for position in last_positions.values() if position > resumed_row
+        )
 
-        mapped_records: list[IngestSolrRecord | UrsusSolrRecord] = [
-            self.get_ingest_record(
-                filenames,
+        # position of the row of each document passed to solr, and the errors so far,
+        # in order
+        marks: deque[dict[str, typing.Any]] = deque()
+
+        def count_error(result: MappedRow) -> None:
+            nonlocal n_errors
+            n_errors += 1
+
+        def mapped_docs() -> Iterator[dict[str, typing.Any]]:
+            if not checkpoint.resumed:
+                marks.append({"row": -1, "ingest_id": self.ingest_id, "errors": 0})
+                yield self.get_ingest_record(filenames).model_dump(mode="json")
+
+            for position, doc in self.iterate_mapped_docs(
+                self.maybe_progress(
+                    rows,
+                    description=f"Importing {n_rows} records...",
+                    total=n_rows,
+                ),
+                workers=workers,
+                skip_unchanged=skip_unchanged,
+                on_error=count_error,
+            ):
+                marks.append(
+                    {"row": position, "ingest_id": self.ingest_id, "errors": n_errors}
+                )
+                yield doc
+
+        def write(item: tuple[int, list[dict[str, typing.Any]]]) -> None:
+            ticket, chunk = item
+            add_bisecting(
+                self.solr_client,
+                chunk,
+                commit_policy,
+                on_error=lambda doc, e: print(f"Error adding record {doc['id']}: {e}"),
             )
-        ]
+            checkpoint.written(ticket)
+
+        with checkpoint:
+            if batch:
+                print("Submitting records in batch mode...")
+                with BackgroundWriter(
+                    write, workers=self.submission.max_concurrent
+                ) as writer:
+                    for chunk, mark in with_marks(
+                        self.submission.batches(mapped_docs()),
+                        marks,
+                    ):
+                        writer.submit((checkpoint.add(mark), chunk))
 
-        for row in self.maybe_progress(
-            csv_data.values(),
-            description=f"Importing {len(csv_data)} records...",
-        ):
-            try:
-                if row.get("Object Type") not in ("ChildWork", "Page"):
-                    mapped_records.append(self.map_record(row))
-            except (pydantic.ValidationError, UnknownItemError) as e:
-                row_handle = row.get("Item ARK") or row.get("Item Title") or row
-
-                # Note: using "\r" overwrites what would otherwise be a duplicated
-                # progress bar
-                rich.print(f"\rCould not import row {row_handle}:")
-                rich.print(e)
-                rich.print("\n")
-
-        if batch:
-            print("Submitting records in batch mode...")
-            try:
-                self.solr_client.add(  # pyright: ignore[reportUnknownMemberType]
-                    [record.model_dump(mode="json") for record in mapped_records]
-                )
-            except SolrError as e:
-                print(f"Error adding records in batch mode: {e}")
+            else:
+                print("Submitting records one by one...")
+                for mapped_doc in mapped_docs():
+                    try:
+                        self.solr_client.add(mapped_doc, **commit_policy.add_kwargs())  # pyright: ignore[reportUnknownMemberType]
 
-        else:
-            print("Submitting records one by one...")
-            for mapped_record in mapped_records:
-                try:
-                    self.solr_client.add(mapped_record.model_dump(mode="json"))  # pyright: ignore[reportUnknownMemberType]
+                    except SolrError as e:
+                        print(f"Error adding record {mapped_doc['id']}: {e}")
 
-                except SolrError as e:
-                    print(f"Error adding record {mapped_record.solr_id}: {e}")
+                    checkpoint.written(checkpoint.add(marks.popleft()))
 
-    def delete(self, items: list[str], yes: bool):
-        """Delete records from a Solr index.
+            commit_policy.finish(self.solr_client)
 
-        Args:
-            solr_url: URL of a solr instance.
-            items: List of items to delete. Can be ARKs, Solr IDs, or csv filenames.
-                If a csv filename is provided, all ARKs in the file will be deleted.
+        if n_errors:
+            print(f"{n_errors} rows could not be imported.")
+
+    # Number of mapped records for which IIIF manifests are downloaded together
+    MANIFEST_WINDOW = 100
+
+    def iterate_mapped_docs(
+        self,
+        rows: Iterable[tuple[int, dict[str, str]]],
+        workers: int = 1,
+        skip_unchanged: bool = False,
+        on_error: typing.Callable[["MappedRow"], object] = lambda result: None,
+    ) -> Iterator[tuple[int, dict[str, typing.Any]]]:
+        """Map numbered CSV rows to solr documents, printing any errors and skipping
+        bad rows, which are also passed to `on_error`. Each document is yielded with
+        the number of its row.
+
+        Validation and serialization are spread across `workers` processes. Titles of
+        related records are looked up in this process, so that the title cache is
+        shared. Thumbnails from IIIF manifests are then downloaded concurrently for
+        each window of `MANIFEST_WINDOW` records. Errors are reported in input order.
+
+        With `skip_unchanged`, the content hashes of each window's records already in
+        solr are fetched in one request, and records whose hash hasn't changed are
+        skipped. The hash covers the thumbnail, so records that take theirs from a
+        IIIF manifest are only compared once it has been resolved.
         """
 
-        delete_ids: list[str] = []
-        for item in items:
-            if item.endswith(".csv"):
-                with open(item, "r", encoding="utf-8") as stream:
-                    csv_data = csv.DictReader(stream)
-                    delete_ids.extend(
-                        pydantic.TypeAdapter(UrsusId).validate_python(row["Item ARK"])
-                        for row in csv_data
-                    )
-            elif item.startswith("ark:/"):
-                delete_ids.append(pydantic.TypeAdapter(UrsusId).validate_python(item))
-            else:
-                delete_ids.append(item)
+        n_unchanged = 0
+
+        positions: deque[int] = deque()
+
+        def prepared_rows() -> Iterator["dict[str, typing.Any] | MappedRow"]:
+            for position, row in rows:
+                if row.get("Object Type") not in ("ChildWork", "Page"):
+                    positions.append(position)
+                    yield self.prepare_row_or_error(row)
+
+        for window in chunked(
+            ordered_map(map_row_for_solr, prepared_rows(), workers=workers),
+            self.MANIFEST_WINDOW,
+        ):
+            thumbnails = self.manifests.thumbnails(
+                result.manifest_url
+                for result in window
+                if result.manifest_url and result.doc
+            )
+            for result in window:
+                if result.manifest_url and result.doc:
+                    result.doc["thumbnail_url_ss"] = thumbnails[result.manifest_url]
+                    result.doc["content_hash_ssi"] = content_hash(result.doc)
+
+            existing_hashes = (
+                self.existing_hashes(
+                    result.doc["id"] for result in window if result.doc
+                )
+                if skip_unchanged
+                else {}
+            )
 
-        delete_work_ids: list[UrsusId] = []
-        delete_collections: list[UrsusId] = []
-        for record in (
-            requests.get(
-                f"{self.solr_client.url}/get?ids={','.join(delete_ids)}", timeout=10
+            for result in window:
+                position = positions.popleft()
+                if result.error is not None or result.doc is None:
+                    # Note: using "\r" overwrites what would otherwise be a duplicated
+                    # progress bar
+                    rich.print(f"\rCould not import row {result.label}:")
+                    rich.print(result.error)
+                    rich.print("\n")
+                    on_error(result)
+                    continue
+
+                if (
+                    existing_hashes.get(result.doc["id"])
+                    == result.doc["content_hash_ssi"]
+                ):
+                    n_unchanged += 1
+                    continue
+
+                yield position, result.doc
+
+        if skip_unchanged:
+            print(f"{n_unchanged} unchanged records were skipped.")
+
+    def existing_hashes(self, ids: Iterable[str]) -> dict[str, str | None]:
+        """Content hashes of the records in solr with any of the given ids."""
+
+        ids = list(ids)
+        if not ids:
+            return {}
+
+        docs = (
+            self.http.get(
+                f"{self.solr_client.url}/get?ids={','.join(ids)}&fl=id,content_hash_ssi"
             )
             .json()
             .get("response", {})
             .get("docs", [])
-        ):
-            if record["has_model_ssim"][0] == "Collection":
-                delete_collections.append(record["id"])
-            else:
-                delete_work_ids.append(record["id"])
+        )
+        return {doc["id"]: doc.get("content_hash_ssi") for doc in docs}
+
+    def prepare_row_or_error(
+        self, row: dict[str, str]
+    ) -> "dict[str, typing.Any] | MappedRow":
+        try:
+            return self.prepare_row(row)
+        except (pydantic.ValidationError, UnknownItemError) as e:
+            return MappedRow(doc=None, label=row_label(row), error=str(e))
+
+    # Number of ids per real-time get request, and per delete request, when deleting
+    DELETE_CHUNK = 1000
+    # Number of collections per delete-by-query request
+    DELETE_COLLECTIONS_CHUNK = 100
+
+    def delete(
+        self,
+        items: Iterable[str],
+        yes: bool,
+        commit_policy: CommitPolicy = CommitPolicy(),
+    ):
+        """Delete records from a Solr index.
+
+        Items are read as they are needed, and looked up in solr `DELETE_CHUNK` at a
+        time, so that tens of thousands of records can be deleted at once. Works are
+        deleted by id, and collections along with their children by query, both in
+        batches.
+
+        Args:
+            items: Items to delete. Can be ARKs, Solr IDs, or csv filenames. If a csv
+                filename is provided, all ARKs in the file will be deleted. "-" reads
+                more items from stdin, one per line.
+            yes: Delete without asking for confirmation.
+            commit_policy: When the deletions are committed.
+        """
+
+        delete_work_ids: dict[str, None] = {}
+        delete_collections: dict[str, str] = {}  # titles by id
+        n_missing = 0
+        for chunk in chunked(self.iterate_delete_ids(items), self.DELETE_CHUNK):
+            # POST, since a long list of ids won't fit in a URL
+            docs = (
+                self.http.post(
+                    f"{self.solr_client.url}/get",
+                    data={
+                        "ids": ",".join(chunk),
+                        "fl": "id,has_model_ssim,title_tesim",
+                    },
+                )
+                .json()
+                .get("response", {})
+                .get("docs", [])
+            )
+            n_missing += len(set(chunk) - {doc["id"] for doc in docs})
+            for record in docs:
+                if record["has_model_ssim"][0] == "Collection":
+                    delete_collections[record["id"]] = (
+                        record.get("title_tesim") or [record["id"]]
+                    )[0]
+                else:
+                    delete_work_ids[record["id"]] = None
+
+        if n_missing:
+            term = "item was" if n_missing == 1 else "items were"
+            rich.print(f"{n_missing} {term} not found in solr.")
 
         try:
             n_total_works = self.solr_client.search(
@@ -193,33 +487,98 @@ class Importer:
             if yes or click.confirm(
                 f"Delete {len(delete_work_ids)} of {n_total_works} Works?"
             ):
-                self.solr_client.delete(id=delete_work_ids)
-
-        for collection_id in delete_collections:
-            n_children = self.solr_client.search(
-                f"member_of_collection_ids_ssim:{collection_id}",
-                fq="ark_ssi:*",
-                defType="lucene",
-                rows=0,
-            ).hits
+                for ids in chunked(delete_work_ids, self.DELETE_CHUNK):
+                    self.solr_client.delete(id=ids, **commit_policy.delete_kwargs())
 
-            title = self.titles.get(collection_id, collection_id)
-            term = "child record" if n_children == 1 else "child records"
+        n_children = self.count_children(delete_collections)
+        confirmed_collections: list[str] = []
+        for collection_id, title in delete_collections.items():
+            term = "child record" if n_children[collection_id] == 1 else "child records"
             if yes or click.confirm(
-                f"Delete collection {title}? {n_children} {term} will also be deleted."
+                f"Delete collection {title}? {n_children[collection_id]} {term} will "
+                "also be deleted."
             ):
-                self.solr_client.delete(
-                    q=f"id:{collection_id} OR member_of_collection_ids_ssim:{collection_id}"  # noqa: E501
-                )
+                confirmed_collections.append(collection_id)
+
+        for ids in chunked(confirmed_collections, self.DELETE_COLLECTIONS_CHUNK):
+            terms = " OR ".join(solr_quote(collection_id) for collection_id in ids)
+            self.solr_client.delete(
+                q=f"id:({terms}) OR member_of_collection_ids_ssim:({terms})",
+                **commit_policy.delete_kwargs(),
+            )
+
+        commit_policy.finish(self.solr_client)
+
+    @staticmethod
+    def iterate_delete_ids(items: Iterable[str]) -> Iterator[str]:
+        """Solr ids of the items given to `delete`, reading csv files a row at a
+        time, and items from stdin a line at a time for "-"."""
+
+        for item in items:
+            item = item.strip()
+            if not item:
+                continue
+            if item == "-":
+                yield from Importer.iterate_delete_ids(sys.stdin)
+            elif item.endswith(".csv"):
+                with open(item, "r", encoding="utf-8") as stream:
+                    for row in csv.DictReader(stream):
+                        yield id_validator.validate_python(row["Item ARK"])
+            elif item.startswith("ark:/"):
+                yield id_validator.validate_python(item)
+            else:
+                yield item
+
+    def count_children(self, collection_ids: Iterable[str]) -> dict[str, int]:
+        """Number of records in each of the given collections, from a single facet
+        query."""
+
+        counts = dict.fromkeys(collection_ids, 0)
+        if not counts:
+            return counts
+
+        results = self.solr_client.search(
+            "ark_ssi:*",
+            fq="{!terms f=member_of_collection_ids_ssim}" + ",".join(counts),
+            defType="lucene",
+            rows=0,
+            facet="true",
+            **{
+                "facet.field": "member_of_collection_ids_ssim",
+                "facet.limit": -1,
+                "facet.mincount": 1,
+            },
+        )
+        facet = results.facets["facet_fields"]["member_of_collection_ids_ssim"]
+        for collection_id, count in zip(facet[::2], facet[1::2]):
+            if collection_id in counts:
+                counts[collection_id] = count
+        return counts
+
+    # Sort for paging through the index. Must be on a field that is not changed by
+    # the reindex operation, and end with the uniqueKey as a tiebreak for cursorMark.
+    PAGING_SORT = "ark_ssi asc, id asc"
 
     def iterate_solr_records(
         self,
         message: str,
         query: str = "ark_ssi:*",
         start: int = 0,
+        page_size: int = 250,
+        after: tuple[str, str] | None = None,
+        filter_queries: Iterable[str] = (),
     ) -> Iterable[dict[str, typing.Any]]:
+        """Yield every record matching `query`, paging with Solr's cursorMark.
+
+        Unlike `start`/`rows` paging, the cost of each page doesn't grow with its
+        depth in the result set. A nonzero `start` offset is converted to a filter
+        query on the sort fields, since cursors can only begin at zero. Likewise,
+        `after` (the ARK and id of a record) skips the records up to and including
+        that one. Any `filter_queries` further restrict the records.
+        """
+
         hits: int | float = inf
-        rows = 250
+        completed = start
         progress: rich.progress.Progress | None = None
         task_id: int | None = None
 
@@ -229,20 +588,29 @@ class Importer:
                 progress.start()
                 task_id = progress.add_task("{message} 0 / ??????...")
 
-            while start < hits:
+            filter_queries = list(filter_queries)
+            if start:
+                filter_queries.append(
+                    self.filter_after_offset(query, start, filter_queries)
+                )
+            if after:
+                filter_queries.append(self.filter_after(*after))
+            cursor_mark = "*"
+
+            while True:
                 results = self.solr_client.search(
                     query,
-                    sort="ark_ssi asc",  # must be a field that is not changed by reindex operation # noqa: E501
-                    start=start,
-                    rows=rows,
+                    fq=filter_queries,
+                    sort=self.PAGING_SORT,
+                    rows=page_size,
+                    cursorMark=cursor_mark,
                 )
-                hits = int(results.hits)
+                hits = start + int(results.hits)
 
-                for i, raw_record in enumerate(results):
+                for raw_record in results:
                     yield raw_record
+                    completed += 1
                     if progress and isinstance(task_id, int):
-                        # zero-based indexing for solr `start` and python `enumerate`
-                        completed = start + i + 1
                         progress.update(
                             task_id,
                             description=f"{message} {completed} / {hits}...",
@@ -250,16 +618,17 @@ class Importer:
                             completed=completed,
                         )
 
-                start += rows
+                if not results.docs or results.nextCursorMark in (None, cursor_mark):
+                    break
+                cursor_mark = results.nextCursorMark
 
         except Exception as e:
-            # Knock the counter back to the start of the interrupted batch
             if progress and isinstance(task_id, int):
                 progress.update(
                     task_id,
-                    description=f"{message} {start} / {hits}...",
+                    description=f"{message} {completed} / {hits}...",
                     total=hits,
-                    completed=start,
+                    completed=completed,
                 )
             raise e
 
@@ -267,10 +636,107 @@ class Importer:
             if progress:
                 progress.stop()
 
-    def validate(self, start: int = 0, max_errors: int | float = inf) -> None:
+    def filter_after_offset(
+        self, query: str, start: int, filter_queries: Iterable[str] = ()
+    ) -> str:
+        """Return a filter query matching the records after the first `start` records
+        (zero-based) matching `query` and `filter_queries`, in `PAGING_SORT` order."""
+
+        results = self.solr_client.search(
+            query,
+            fq=list(filter_queries),
+            sort=self.PAGING_SORT,
+            start=start - 1,
+            rows=1,
+            fl="ark_ssi,id",
+        )
+
+        match results.docs:
+            case [{"ark_ssi": str(ark), "id": str(solr_id)}]:
+                return self.filter_after(ark, solr_id)
+            case _:
+                # offset is past the end of the results
+                return "-*:*"
+
+    @staticmethod
+    def filter_after(ark: str, solr_id: str) -> str:
+        """Return a filter query matching the records after the one with `ark` and
+        `solr_id`, in `PAGING_SORT` order."""
+
+        ark, solr_id = solr_quote(ark), solr_quote(solr_id)
+        return f"ark_ssi:{{{ark} TO *] OR (ark_ssi:{ark} AND id:{{{solr_id} TO *])"
+
+    def filter_outdated(
+        self, query: str, modified_before: datetime | None = None
+    ) -> str:
+        """Return a filter query matching the records last loaded or reindexed by an
+        older version of feed_ursus than this one, or by no known version. With
+        `modified_before`, records last modified before then match too.
+
+        Versions can't be compared in a solr query, so the versions stored in records
+        matching `query` are listed with a facet and compared here.
+        """
+
+        current = Version(importlib.metadata.version("feed_ursus"))
+        results = self.solr_client.search(
+            query,
+            rows=0,
+            facet="true",
+            **{
+                "facet.field": "feed_ursus_version_ssi",
+                "facet.limit": -1,
+                "facet.mincount": 1,
+            },
+        )
+        counts = results.facets["facet_fields"]["feed_ursus_version_ssi"]
+
+        clauses = ["(*:* -feed_ursus_version_ssi:*)"]
+        for version in counts[::2]:
+            try:
+                outdated = Version(version) < current
+            except InvalidVersion:
+                outdated = True
+            if outdated:
+                clauses.append(f"feed_ursus_version_ssi:{solr_quote(version)}")
+
+        if modified_before:
+            from feed_ursus.ursus_solr_record import solr_date_from_python
+
+            clauses.append(
+                f"system_modified_dtsi:[* TO {solr_date_from_python(modified_before)}}}"
+            )
+
+        return " OR ".join(clauses)
+
+    # Minimum number of seconds between saving checkpoints
+    CHECKPOINT_INTERVAL = 10
+
+    def checkpoint(
+        self, command: str, inputs: dict[str, typing.Any], resume: bool = False
+    ) -> Checkpoint:
+        """Checkpoint for a run of `command` against this solr core."""
+
+        return Checkpoint(
+            self.cache_dir,
+            command,
+            {"solr_url": self.solr_url, **inputs},
+            resume=resume,
+            interval=self.CHECKPOINT_INTERVAL,
+        )
+
+    def validate(
+        self,
+        start: int = 0,
+        max_errors: int | float = inf,
+        page_size: int = 250,
+    ) -> None:
+        from feed_ursus.ursus_solr_record import UrsusSolrRecord
+
         n_errors = 0
 
-        for record in self.iterate_solr_records("validating", start=start):
+        for record in self.iterate_solr_records(
+            "validating", start=start, page_size=page_size
+        ):
             try:
                 UrsusSolrRecord.model_validate(record)
 
@@ -293,86 +759,493 @@ class Importer:
         results = self.solr_client.search(query, rows=0)
         click.echo(f"{results.hits} items")
 
+    # Number of records read ahead from solr while earlier ones are reindexed
+    REINDEX_PREFETCH_PAGES = 2
+
     def reindex(
         self,
         query: str = "ark_ssi:*",
         start: int = 0,
         max_errors: int | float = inf,
         dry_run: bool = False,
+        page_size: int = 250,
+        workers: int = 1,
+        commit_policy: CommitPolicy = CommitPolicy(),
+        resume: bool = False,
+        incremental: bool = False,
+        modified_before: datetime | None = None,
+        atomic: bool = True,
     ) -> None:
-        n_errors = 0
+        """Reload records from solr, regenerate their computed fields, and save them.
+
+        Runs as a pipeline: records are read ahead from solr in a background thread,
+        reindexed in `workers` processes, and submitted in batches by background
+        writers, as configured by `self.submission`, so that fetching, processing and
+        saving overlap.
+
+        Unless it's a dry run, the ARK and id of the last record saved are kept in a
+        checkpoint, so that with `resume` an interrupted reindex carries on after it.
+
+        With `incremental`, only records last computed by an older version of
+        feed_ursus, or last modified before `modified_before`, are reindexed; see
+        `filter_outdated`.
+
+        With `atomic`, only the fields that have changed are sent to solr, as atomic
+        updates, and records that haven't changed at all are skipped, or only have
+        their feed_ursus version updated; see `atomic_update`. If a record has changed
+        in solr since it was read, its update is worked out again from the record as
+        it is now. When solr rejects a batch of updates, those it applied before the
+        rejected one aren't sent again. A record is replaced in full instead if that's
+        no bigger, or if solr rejects the update for another reason.
+        """
 
-        validated = []
-        for record in self.iterate_solr_records("reindexing", query=query, start=start):
-            try:
-                validated.append(reindex_record(record))
+        from feed_ursus.reindex import atomic_update, is_unchanged
 
-            except UnexplainedChangesError as e:
-                rich.print(rich.rule.Rule(title=id_for_debugging(record), align="left"))
-                print(e.args[0], "\n")  # rich.print messes up deepdiff's pretty colors
-                n_errors += 1
+        if resume and start:
+            raise click.ClickException("--resume can't be combined with --start")
+        if resume and dry_run:
+            raise click.UsageError(
+                "--resume can't be combined with --dry-run, which keeps no checkpoint"
+            )
+        if modified_before and not incremental:
+            raise click.UsageError(
+                "--modified-before can only be used with --incremental"
+            )
 
-            except pydantic.ValidationError as e:
-                rich.print(
-                    rich.rule.Rule(title=id_for_debugging(record), align="left"),
-                    e,
-                    sep="\n",
+        filter_queries: list[str] = []
+        if incremental:
+            filter_queries.append(self.filter_outdated(query, modified_before))
+            n_total = int(self.solr_client.search(query, rows=0).hits)
+            n_outdated = int(
+                self.solr_client.search(query, fq=filter_queries, rows=0).hits
+            )
+            rich.print(
+                f"Skipping {n_total - n_outdated} of {n_total} records, which are up "
+                "to date."
+            )
+
+        checkpoint = (
+            Checkpoint(None, "reindex", {})  # a dry run doesn't touch checkpoints
+            if dry_run
+            else self.checkpoint(
+                "reindex",
+                {
+                    "query": query,
+                    # not the filter query itself, which changes as records are
+                    # reindexed
+                    "incremental": incremental,
+                    "modified_before": modified_before and modified_before.isoformat(),
+                },
+                resume=resume,
+            )
+        )
+        resumed = checkpoint.resumed or {}
+        n_errors: int = resumed.get("errors", 0)
+        n_unchanged = 0
+        cancelled = False
+        rejected: list[int] = []
+        # (ARK, id) of each record passed to solr, and the errors so far, in order
+        marks: deque[dict[str, typing.Any]] = deque()
+        # full records to fall back on, by id, for those sent as atomic updates
+        replacements: dict[str, dict[str, typing.Any]] = {}
+        # records that changed in solr while they were being reindexed
+        conflicts: list[str] = []
+
+        def conflict(label: str, message: str) -> None:
+            conflicts.append(label)
+            rich.print(rich.rule.Rule(title=label, align="left"), message, sep="\n")
+
+        def send_updates(
+            updates: list[dict[str, typing.Any]],
+            full_docs: dict[str, dict[str, typing.Any]],
+            retry_conflicts: bool = True,
+        ) -> list[dict[str, typing.Any]]:
+            """Send atomic updates, returning the full records (from `full_docs`) to
+            replace instead of any that solr rejected.
+
+            An update rejected for a version conflict is worked out again from the
+            record as it is now in solr, once, rather than replacing the record with
+            the version that was read before it changed.
+            """
+
+            fallbacks: list[dict[str, typing.Any]] = []
+            conflicting: list[dict[str, typing.Any]] = []
+
+            def unapplied(
+                docs: list[dict[str, typing.Any]],
+            ) -> list[dict[str, typing.Any]]:
+                # solr stops at the first update it rejects, having applied those
+                # before it, whose _version_ is now out of date: leave them out
+                current = {
+                    doc["id"]: doc
+                    for doc in self.http.get(
+                        f"{self.solr_client.url}/get",
+                        params={"ids": ",".join(doc["id"] for doc in docs)},
+                    )
+                    .json()
+                    .get("response", {})
+                    .get("docs", [])
+                }
+
+                def applied(doc: dict[str, typing.Any]) -> bool:
+                    stored = current.get(doc["id"])
+                    if stored is None or stored.get("_version_") == doc["_version_"]:
+                        return False
+                    update = atomic_update(stored, full_docs[doc["id"]])
+                    return update is not None and update.keys() <= {"id", "_version_"}
+
+                return [doc for doc in docs if not applied(doc)]
+
+            def on_error(doc: dict[str, typing.Any], e: SolrError) -> None:
+                if solr_error_status(e) == 409:
+                    conflicting.append(doc)
+                else:
+                    fallbacks.append(full_docs[doc["id"]])
+
+            if updates:
+                add_bisecting(
+                    self.solr_client,
+                    updates,
+                    commit_policy,
+                    on_error=on_error,
+                    field_updates={
+                        field: "set"
+                        for doc in updates
+                        for field in doc
+                        if field not in ("id", "_version_")
+                    },
+                    unapplied=unapplied,
                 )
-                n_errors += 1
 
-            if n_errors >= max_errors:
-                if len(validated) and not dry_run:
-                    self.solr_client.add(validated, commit=True)
+            for doc in conflicting:
+                label = id_for_debugging(full_docs[doc["id"]])
+                if not retry_conflicts:
+                    conflict(label, "Changed in solr again while being reindexed")
+                    continue
+
+                current = (
+                    self.http.get(
+                        f"{self.solr_client.url}/get", params={"ids": doc["id"]}
+                    )
+                    .json()
+                    .get("response", {})
+                    .get("docs", [])
+                )
+                if not current:
+                    conflict(label, "Deleted from solr while being reindexed")
+                    continue
+
+                result = reindex_record_or_error(current[0], atomic=True)
+                if result.doc is None:
+                    conflict(
+                        label,
+                        "Changed in solr while being reindexed, and now can't be "
+                        f"reindexed:\n{result.diff or result.error}",
+                    )
+                elif result.update is None:
+                    fallbacks.append(result.doc)
+                elif result.update.keys() > {"id", "_version_"}:
+                    fallbacks.extend(
+                        send_updates(
+                            [result.update],
+                            {doc["id"]: result.doc},
+                            retry_conflicts=False,
+                        )
+                    )
+
+            return fallbacks
+
+        def write(item: tuple[int, list[dict[str, typing.Any]]]) -> None:
+            ticket, batch = item
+            updates = [doc for doc in batch if doc["id"] in replacements]
+            docs = [doc for doc in batch if doc["id"] not in replacements]
+
+            docs.extend(send_updates(updates, replacements))
+            for doc in updates:
+                del replacements[doc["id"]]
+
+            rejected.append(
+                add_bisecting(
+                    self.solr_client,
+                    docs,
+                    commit_policy,
+                    on_error=lambda doc, e: rich.print(
+                        rich.rule.Rule(title=id_for_debugging(doc), align="left"),
+                        f"Rejected by solr: {e}",
+                        sep="\n",
+                    ),
+                )
+            )
+            checkpoint.written(ticket)
+
+        def reindexed_docs() -> Iterator[dict[str, typing.Any]]:
+            nonlocal n_errors, n_unchanged, cancelled
+
+            positions: deque[list[str | None]] = deque()
+
+            def records() -> Iterator[dict[str, typing.Any]]:
+                for record in prefetch(
+                    self.iterate_solr_records(
+                        "reindexing",
+                        query=query,
+                        start=start,
+                        page_size=page_size,
+                        after=(
+                            (resumed["after"][0], resumed["after"][1])
+                            if resumed
+                            else None
+                        ),
+                        filter_queries=filter_queries,
+                    ),
+                    depth=self.REINDEX_PREFETCH_PAGES * page_size,
+                ):
+                    positions.append([record.get("ark_ssi"), record.get("id")])
+                    yield record
+
+            for result in ordered_map(
+                functools.partial(reindex_record_or_error, atomic=atomic),
+                records(),
+                workers,
+            ):
+                position = positions.popleft()
+
+                if result.update is not None and result.doc is not None:
+                    if is_unchanged(result.update):
+                        n_unchanged += 1
+                    # an unchanged record is still stamped with this version, if it
+                    # was computed by another
+                    if result.update.keys() > {"id", "_version_"}:
+                        if not dry_run:
+                            replacements[result.update["id"]] = result.doc
+                        marks.append({"after": position, "errors": n_errors})
+                        yield result.update
+
+                elif result.doc is not None:
+                    marks.append({"after": position, "errors": n_errors})
+                    yield result.doc
+
+                elif result.diff is not None:
+                    rich.print(rich.rule.Rule(title=result.label, align="left"))
+                    print(result.diff, "\n")  # rich.print messes up deepdiff's colors
+                    n_errors += 1
+
+                else:
+                    rich.print(
+                        rich.rule.Rule(title=result.label, align="left"),
+                        result.error,
+                        sep="\n",
+                    )
+                    n_errors += 1
+
+                if n_errors >= max_errors:
+                    cancelled = True
+                    return
+
+        with checkpoint:
+            # records reindexed before an error are still saved if the reindex is
+            # cancelled
+            with BackgroundWriter(
+                write, workers=self.submission.max_concurrent
+            ) as writer:
+                for batch, mark in with_marks(
+                    self.submission.batches(reindexed_docs()), marks
+                ):
+                    if not dry_run:
+                        writer.submit((checkpoint.add(mark), batch))
+
+            if not dry_run:
+                commit_policy.finish(self.solr_client)
+
+            if cancelled:
                 term = "errors" if max_errors and max_errors > 1 else "error"
                 raise click.ClickException(
                     f"Reindex cancelled: reached {max_errors} {term}"
                 )
 
-            if len(validated) > 250 and not dry_run:
-                self.solr_client.add(validated, commit=True)
-                validated = []
+        rich.print(f"{n_errors} records could not be reindexed.")
+        if n_unchanged:
+            rich.print(
+                f"{n_unchanged} records were unchanged, and at most had their "
+                "feed_ursus version updated."
+            )
+        if n_rejected := sum(rejected):
+            rich.print(f"{n_rejected} records were rejected by solr.")
+        if conflicts:
+            rich.print(
+                f"{len(conflicts)} records changed in solr while being reindexed, and "
+                "were not updated."
+            )
+
+    DUMP_PAGE_SIZE = 1000
+    # Shards are numbered with a fixed width rather than one worked out from the
+    # number of records, which can grow while they are being dumped, so that their
+    # names still sort in order
+    DUMP_SUFFIX_DIGITS = 5
 
-        if len(validated) and not dry_run:
-            self.solr_client.add(validated, commit=True)
+    def dump(
+        self,
+        filename_prefix: str = "data",
+        batch_size: int = 1000,
+        compression: Compression = Compression.NONE,
+        workers: int = 1,
+    ) -> None:
+        """Write every record in the index to JSON Lines files of `batch_size` records,
+        along with a manifest (`<filename_prefix>.manifest.json`) listing the number of
+        records, size and sha256 checksum of each file. Files are numbered from
+        `<filename_prefix>00001`, unless the whole index fits in one.
 
-        rich.print(f"{n_errors} records could not be reindexed.")
+        Records are streamed from solr with cursorMark while earlier files are being
+        compressed and written by `workers` threads.
+        """
+
+        compression.check_available()
+
+        def shard_path(suffix: str) -> Path:
+            return Path(f"{filename_prefix}{suffix}.jsonl{compression.extension}")
 
-    def dump(self, filename_prefix: str = "data", batch_size: int = 1000) -> None:
-        hits = int(self.solr_client.search("ark_ssi:*", rows=0).hits)
+        shards: list[dict[str, typing.Any]] = []
 
-        # number of digits in file suffix
-        n_files = ceil(hits / batch_size)
-        digits = 0 if n_files == 1 else len(str(n_files))
+        def write(shard: tuple[int, list[dict[str, typing.Any]]]) -> None:
+            n, docs = shard
+            path = shard_path(str(n + 1).zfill(self.DUMP_SUFFIX_DIGITS))
 
-        for n in self.maybe_progress(range(n_files), "Saving"):
-            results = self.solr_client.search(
-                "ark_ssi:*",
-                start=n * batch_size,
-                rows=batch_size,
+            data = compression.compress(
+                "".join(json.dumps(doc) + "\n" for doc in docs).encode("utf-8")
+            )
+            path.write_bytes(data)
+            shards.append(
+                {
+                    "filename": path.name,
+                    "documents": len(docs),
+                    "bytes": len(data),
+                    "sha256": hashlib.sha256(data).hexdigest(),
+                }
             )
 
-            suffix = "" if digits == 0 else str(n + 1).zfill(digits)
-            filename = filename_prefix + suffix + ".jsonl"
+        records = prefetch(
+            self.iterate_solr_records("Saving", page_size=self.DUMP_PAGE_SIZE),
+            depth=2 * self.DUMP_PAGE_SIZE,
+        )
+        with BackgroundWriter(write, workers=workers) as writer:
+            for n, docs in enumerate(chunked(records, batch_size)):
+                writer.submit((n, docs))
+
+        if len(shards) == 1:
+            path = shard_path("")
+            shard_path("1".zfill(self.DUMP_SUFFIX_DIGITS)).replace(path)
+            shards[0]["filename"] = path.name
+
+        shards.sort(key=lambda shard: shard["filename"])
+        manifest = {
+            "solr_url": self.solr_url,
+            "created": datetime.now(timezone.utc).isoformat(),
+            "feed_ursus_version": importlib.metadata.version("feed_ursus"),
+            "compression": compression.value,
+            "documents": sum(shard["documents"] for shard in shards),
+            "shards": shards,
+        }
+        Path(f"{filename_prefix}.manifest.json").write_text(
+            json.dumps(manifest, indent=2) + "\n", encoding="utf-8"
+        )
 
-            with open(filename, "w", encoding="utf-8") as file:
-                for raw_doc in results:
-                    json.dump(raw_doc, file)
-                    file.write("\n")
+    LOAD_DUMP_PREFETCH_LINES = 1000
 
-    def load_dump(self, filenames: Iterable[str]) -> None:
-        for filename in self.maybe_progress(filenames, "loading"):
-            batch = []
-            with open(filename, "r", encoding="utf-8") as file:
-                for line in file:
-                    try:
-                        batch.append(reindex_record(json.loads(line), check=False))
-                    except pydantic.ValidationError as e:
-                        label = id_for_debugging(json.loads(line))
-                        logging.warning(f"Could not import {label}: {e}")
+    def load_dump(
+        self,
+        filenames: Iterable[str],
+        commit_policy: CommitPolicy = CommitPolicy(),
+        workers: int = 1,
+        resume: bool = False,
+    ) -> None:
+        """Load files written by `dump`, compressed or not, reindexing each record.
+
+        Lines are read and decompressed in a background thread, reindexed in a pool of
+        `workers` processes, and sent to solr in batches by background threads, so
+        only a few batches are held in memory at a time.
+
+        The file and line of the last record saved are kept in a checkpoint, so that
+        with `resume` an interrupted load carries on after it.
+        """
+
+        filenames = list(filenames)
+        checkpoint = self.checkpoint(
+            "loaddump", {"files": describe_files(filenames)}, resume=resume
+        )
+        resumed = checkpoint.resumed or {"file": 0, "line": -1, "errors": 0}
+        n_errors: int = resumed["errors"]
+        # file and line number of each record passed to solr, in order
+        marks: deque[dict[str, int]] = deque()
+
+        def write(item: tuple[int, list[dict[str, typing.Any]]]) -> None:
+            ticket, batch = item
+            add_bisecting(
+                self.solr_client,
+                batch,
+                commit_policy,
+                on_error=lambda doc, e: logging.warning(
+                    f"Could not import {id_for_debugging(doc)}: {e}"
+                ),
+            )
+            checkpoint.written(ticket)
+
+        positions: deque[tuple[int, int]] = deque()
+
+        def lines() -> Iterator[str]:
+            for file_number, filename in enumerate(
+                self.maybe_progress(filenames, "loading")
+            ):
+                if file_number < resumed["file"]:
+                    continue
+                with open_text(filename) as file:
+                    for line_number, line in enumerate(file):
+                        if line.strip() and (
+                            file_number > resumed["file"]
+                            or line_number > resumed["line"]
+                        ):
+                            positions.append((file_number, line_number))
+                            yield line
+
+        def reindexed_docs() -> Iterator[dict[str, typing.Any]]:
+            nonlocal n_errors
+
+            records = prefetch(lines(), depth=self.LOAD_DUMP_PREFETCH_LINES)
+            for result in ordered_map(reindex_dump_line, records, workers):
+                file_number, line_number = positions.popleft()
+                if result.doc is not None:
+                    marks.append(
+                        {"file": file_number, "line": line_number, "errors": n_errors}
+                    )
+                    yield result.doc
+                else:
+                    logging.warning(f"Could not import {result.label}: {result.error}")
+                    n_errors += 1
+
+        with checkpoint:
+            with BackgroundWriter(
+                write, workers=self.submission.max_concurrent
+            ) as writer:
+                for batch, mark in with_marks(
+                    self.submission.batches(reindexed_docs()), marks
+                ):
+                    writer.submit((checkpoint.add(mark), batch))
 
-            self.solr_client.add(batch)
+            commit_policy.finish(self.solr_client)
+
+        if n_errors:
+            logging.warning(f"{n_errors} records could not be loaded.")
+
+    def map_record(self, record: dict[str, str]) -> "UrsusSolrRecord":
+        mapped_record = validate_row(self.prepare_row(record))
+
+        if needs_thumbnail(mapped_record):
+            mapped_record.thumbnail_url_ss = self.thumbnail_from_manifest(mapped_record)
+
+        return mapped_record
+
+    def prepare_row(self, record: dict[str, str]) -> dict[str, typing.Any]:
+        """Add the fields that depend on the importer's state (ingest id, titles of
+        related records) to a CSV row, ready for validation."""
 
-    def map_record(self, record: dict[str, str]) -> UrsusSolrRecord:
         related_record_links = [
             f"<a href='/catalog/{ark}'>{title}</a>"
             for ark, title in zip(
@@ -381,30 +1254,13 @@ class Importer:
             )
         ] or None
 
-        mapped_record = UrsusSolrRecord.model_validate(
-            {
-                **record,
-                "feed_ursus_version_ssi": importlib.metadata.version("feed_ursus"),
-                "ingest_id_ssi": self.ingest_id,
-                "member_of_collections_ssim": self.get_titles(record, "Parent ARK"),
-                "human_readable_related_record_title_ssm": related_record_links,
-            }
-        )
-
-        if not mapped_record.thumbnail_url_ss and not {
-            ResourceType("moving image"),
-            ResourceType("sound recording"),
-            ResourceType("sound recording-musical"),
-            ResourceType("sound recording-nonmusical"),
-        }.intersection(mapped_record.human_readable_resource_type_tesim or []):
-            mapped_record.thumbnail_url_ss = self.thumbnail_from_access_copy(
-                mapped_record
-            ) or self.thumbnail_from_manifest(mapped_record)
-
-        if not mapped_record.sort_title_tsort:
-            raise ValueError("sort_title not populated")
-
-        return mapped_record
+        return {
+            **record,
+            "feed_ursus_version_ssi": importlib.metadata.version("feed_ursus"),
+            "ingest_id_ssi": self.ingest_id,
+            "member_of_collections_ssim": self.get_titles(record, "Parent ARK"),
+            "human_readable_related_record_title_ssm": related_record_links,
+        }
 
     def get_titles(self, row: dict[str, str], ark_field_name: str) -> list[str] | None:
         arks = ark_list_validator.validate_python(row.get(ark_field_name))
@@ -412,29 +1268,64 @@ class Importer:
         if not arks:
             return None
 
-        unknown_ids = [
-            id_validator.validate_python(ark) for ark in arks if ark not in self.titles
-        ]
+        if unknown_arks := [
+            ark
+            for ark in arks
+            if ark not in self.titles and ark not in self.missing_titles
+        ]:
+            self.fetch_titles(unknown_arks)
+
+        if still_unknown := ", ".join([ark for ark in arks if ark not in self.titles]):
+            term = "items" if len(still_unknown) > 1 else "item"
+            raise UnknownItemError(f"Title unknown for {term} {still_unknown}")
+
+        return [self.titles[ark] for ark in arks]
+
+    # Number of ids per real-time get request when looking up titles
+    TITLE_FETCH_CHUNK = 100
+
+    def fetch_titles(self, arks: Iterable[Ark]) -> None:
+        """Look up the titles of `arks` in solr, and add them to `self.titles`.
+
+        Uses real-time get, `TITLE_FETCH_CHUNK` ids per request. ARKs that aren't
+        found are added to `self.missing_titles`, so they aren't requested again.
+        """
 
-        if unknown_ids:
+        for chunk in chunked(dict.fromkeys(arks), self.TITLE_FETCH_CHUNK):
+            ids = [id_validator.validate_python(ark) for ark in chunk]
             docs = (
-                requests.get(
-                    f"{self.solr_client.url}/get?ids={','.join(unknown_ids)}&fl=ark_ssi,title_tesim",
-                    timeout=10,
+                self.http.get(
+                    f"{self.solr_client.url}/get?ids={','.join(ids)}&fl=ark_ssi,title_tesim"
                 )
                 .json()
                 .get("response", {})
                 .get("docs", [])
             )
             self.titles.update({doc["ark_ssi"]: doc["title_tesim"][0] for doc in docs})
+            self.missing_titles.update(ark for ark in chunk if ark not in self.titles)
 
-        if still_unknown := ", ".join([ark for ark in arks if ark not in self.titles]):
-            term = "items" if len(still_unknown) > 1 else "item"
-            raise UnknownItemError(f"Title unknown for {term} {still_unknown}")
+    @staticmethod
+    def referenced_arks(row: dict[str, str]) -> list[Ark]:
+        """ARKs of the parent and related records of a CSV row.
 
-        return [self.titles[ark] for ark in arks]
+        Invalid values are ignored here; they are reported when the row is mapped.
+        """
+
+        arks: list[Ark] = []
+        for field_name in ("Parent ARK", "Related Records"):
+            try:
+                arks.extend(
+                    ark_list_validator.validate_python(row.get(field_name)) or []
+                )
+            except pydantic.ValidationError:
+                pass
+
+        return arks
+
+    @staticmethod
+    def thumbnail_from_access_copy(record: "UrsusSolrRecord") -> str | None:
+        from feed_ursus.ursus_solr_record import UrsusSolrRecord
 
-    def thumbnail_from_access_copy(self, record: UrsusSolrRecord) -> str | None:
         # Cast None to "", so we ensure string methods
         access_copy = str(record.access_copy_ssi)
 
@@ -443,7 +1334,7 @@ class Importer:
         else:
             return None
 
-    def thumbnail_from_manifest(self, record: UrsusSolrRecord) -> str | None:
+    def thumbnail_from_manifest(self, record: "UrsusSolrRecord") -> str | None:
         """Picks a thumbnail downloading the IIIF manifest.
 
         Args:
@@ -453,51 +1344,129 @@ class Importer:
             A string containing the thumbnail URL
         """
 
-        try:
-            manifest_url = record.iiif_manifest_url_ssi
-            if not isinstance(manifest_url, str):
-                return None
-            response = requests.get(manifest_url)
-            manifest = response.json()
-
-            canvases = {
-                c["label"]: c["images"][0]["resource"]["service"]["@id"]
-                for seq in manifest["sequences"]
-                for c in seq["canvases"]
-            }
+        manifest_url = record.iiif_manifest_url_ssi
+        if not isinstance(manifest_url, str):
+            return None
 
-            return (
-                canvases.get("f. 001r") or list(canvases.values())[0]
-            ) + "/full/!200,200/0/default.jpg"
+        return self.manifests.thumbnail(manifest_url)
 
-        except Exception:
-            # ruff: noqa: E722
-            return None
+    # Number of collections per page when preloading titles
+    TITLE_PAGE_SIZE = 1000
 
     def titles_from_solr(self) -> None:
-        """Get a mapping of collection IDs to collection names.
+        """Load the titles of every collection in solr into `self.titles`.
 
-        Returns:
-            A dict mapping collection IDs to collection names.
+        Pages through all collections with cursorMark, fetching only the ARK and title.
+        If the importer has a cache_dir, the titles are saved there along with solr's
+        index version, and reused for as long as the index is unchanged.
         """
+
         try:
-            for doc in self.solr_client.search(
-                "has_model_ssim:Collection",
-                defType="lucene",
-                fl="ark_ssi,title_tesim",
-                rows=1000,
-            ):
-                match doc:
-                    case {"ark_ssi": str(ark), "title_tesim": [title, *_]}:
-                        self.titles[ark] = title
-                    case _:
-                        rich.print(f"Can't load title for collection", doc)
+            index_version = self.index_version()
+            if (titles := self.read_titles_cache(index_version)) is None:
+                titles = {}
+                cursor_mark = "*"
+                while True:
+                    results = self.solr_client.search(
+                        "has_model_ssim:Collection",
+                        defType="lucene",
+                        fl="ark_ssi,title_tesim",
+                        sort="id asc",
+                        rows=self.TITLE_PAGE_SIZE,
+                        cursorMark=cursor_mark,
+                    )
+                    for doc in results:
+                        match doc:
+                            case {"ark_ssi": str(ark), "title_tesim": [title, *_]}:
+                                titles[ark] = title
+                            case _:
+                                rich.print("Can't load title for collection", doc)
+
+                    if not results.docs or results.nextCursorMark in (
+                        None,
+                        cursor_mark,
+                    ):
+                        break
+                    cursor_mark = results.nextCursorMark
+
+                self.write_titles_cache(index_version, titles)
 
-        except SolrError as e:
+            self.titles.update(titles)
+
+        except SolrError:
             raise click.ClickException(
                 f"Could not connect to Solr index at {self.solr_url}"
             )
 
+    def index_version(self) -> int | None:
+        """Solr's index version, which changes whenever a commit modifies the index.
+
+        Returns:
+            The version, or None if it can't be determined.
+        """
+
+        try:
+            response = self.http.get(
+                f"{self.solr_url}/admin/luke",
+                params={"numTerms": 0, "show": "index", "wt": "json"},
+            )
+            return int(response.json()["index"]["version"])
+        except Exception:
+            return None
+
+    @property
+    def titles_cache_path(self) -> Path | None:
+        if self.cache_dir is None:
+            return None
+        url_hash = hashlib.sha256(self.solr_url.encode()).hexdigest()[:16]
+        return self.cache_dir / f"collection_titles-{url_hash}.json"
+
+    def read_titles_cache(self, index_version: int | None) -> dict[Ark, str] | None:
+        """Return cached collection titles if they match `index_version`, else None."""
+
+        path = self.titles_cache_path
+        if path is None or index_version is None:
+            return None
+
+        try:
+            cached = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+        match cached:
+            case {
+                "solr_url": self.solr_url,
+                "index_version": int(version),
+                "titles": dict(titles),
+            } if version == index_version:
+                return titles
+            case _:
+                return None
+
+    def write_titles_cache(
+        self, index_version: int | None, titles: dict[Ark, str]
+    ) -> None:
+        path = self.titles_cache_path
+        if path is None or index_version is None:
+            return
+
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_text(
+                json.dumps(
+                    {
+                        "solr_url": self.solr_url,
+                        "index_version": index_version,
+                        "titles": titles,
+                    }
+                ),
+                encoding="utf-8",
+            )
+            tmp_path.replace(path)
+        except OSError as e:
+            rich.print(f"Could not save collection titles to {path}: {e}")
+
     def get_log(self) -> "list[IngestLogRecord]":
         ingest_records = [
             IngestLogRecordReturned.model_validate(x)
@@ -592,6 +1561,151 @@ class IngestLogRecord(IngestLogRecordWrite):
     count: int
 
 
+AUDIOVISUAL_RESOURCE_TYPES = {
+    ResourceType("moving image"),
+    ResourceType("sound recording"),
+    ResourceType("sound recording-musical"),
+    ResourceType("sound recording-nonmusical"),
+}
+
+
+def needs_thumbnail(record: "UrsusSolrRecord") -> bool:
+    return not record.thumbnail_url_ss and not AUDIOVISUAL_RESOURCE_TYPES.intersection(
+        record.human_readable_resource_type_tesim or []
+    )
+
+
+def validate_row(row: dict[str, typing.Any]) -> "UrsusSolrRecord":
+    """Validate a row prepared by `Importer.prepare_row`.
+
+    Thumbnails are taken from the access copy where possible; anything that needs a
+    network request is left to the caller.
+    """
+
+    from feed_ursus.ursus_solr_record import UrsusSolrRecord
+
+    mapped_record = UrsusSolrRecord.model_validate(row)
+
+    if needs_thumbnail(mapped_record):
+        mapped_record.thumbnail_url_ss = Importer.thumbnail_from_access_copy(
+            mapped_record
+        )
+
+    if not mapped_record.sort_title_tsort:
+        raise ValueError("sort_title not populated")
+
+    return mapped_record
+
+
+def row_label(row: dict[str, typing.Any]) -> str:
+    return str(row.get("Item ARK") or row.get("Item Title") or row)
+
+
+class MappedRow(typing.NamedTuple):
+    """Result of mapping a single row, as passed back from a worker process.
+
+    Errors are passed back as text rather than raised, so that the rest of the batch
+    carries on and errors can be reported in input order.
+    """
+
+    doc: dict[str, typing.Any] | None
+    label: str
+    manifest_url: str | None = None
+    error: str | None = None
+
+
+def map_row_for_solr(row: "dict[str, typing.Any] | MappedRow") -> MappedRow:
+    """Validate and serialize a prepared row. Runs in a worker process."""
+
+    if isinstance(row, MappedRow):
+        # already failed in the parent process
+        return row
+
+    try:
+        record = validate_row(row)
+    except pydantic.ValidationError as e:
+        return MappedRow(doc=None, label=row_label(row), error=str(e))
+
+    doc = record.model_dump(mode="json")
+    manifest_url = record.iiif_manifest_url_ssi if needs_thumbnail(record) else None
+    if not manifest_url:
+        # otherwise hashed once the thumbnail has been resolved
+        doc["content_hash_ssi"] = content_hash(doc)
+    return MappedRow(doc=doc, label=row_label(row), manifest_url=manifest_url)
+
+
+# Fields that change with every ingest, whether or not the record itself has
+VOLATILE_FIELDS = frozenset(
+    {"content_hash_ssi", "ingest_id_ssi", "system_modified_dtsi", "timestamp"}
+)
+
+
+def content_hash(doc: dict[str, typing.Any]) -> str:
+    """Hash of a solr document's content, leaving out `VOLATILE_FIELDS`, so that a
+    record that hasn't changed since it was last loaded can be recognised."""
+
+    content = {key: value for key, value in doc.items() if key not in VOLATILE_FIELDS}
+    return hashlib.sha256(
+        json.dumps(content, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    ).hexdigest()
+
+
+class ReindexedRecord(typing.NamedTuple):
+    """Result of reindexing a single solr record, as passed back from a worker."""
+
+    doc: dict[str, typing.Any] | None
+    label: str
+    diff: str | None = None
+    error: str | None = None
+    update: dict[str, typing.Any] | None = None
+
+
+def reindex_record_or_error(
+    record: dict[str, typing.Any], atomic: bool = False
+) -> ReindexedRecord:
+    """Run `reindex_record`, returning failures instead of raising them, so that they
+    can be reported in order by the parent process. With `atomic`, also work out an
+    atomic update from the original record to the result, if one will do."""
+
+    from feed_ursus.reindex import (
+        UnexplainedChangesError,
+        atomic_update,
+        reindex_record,
+    )
+
+    label = id_for_debugging(record)
+    try:
+        doc = reindex_record(record)
+        return ReindexedRecord(
+            doc=doc,
+            label=label,
+            update=atomic_update(record, doc) if atomic else None,
+        )
+    except UnexplainedChangesError as e:
+        return ReindexedRecord(doc=None, label=label, diff=str(e.args[0]))
+    except pydantic.ValidationError as e:
+        return ReindexedRecord(doc=None, label=label, error=str(e))
+
+
+def reindex_dump_line(line: str) -> ReindexedRecord:
+    """Parse and reindex a line of a dump file, without checking the result against
+    the original, returning parse and validation errors instead of raising them."""
+
+    from feed_ursus.reindex import reindex_record
+
+    try:
+        record = json.loads(line)
+    except json.JSONDecodeError as e:
+        # e.g. a truncated shard; label the line by its start, since it has no id
+        return ReindexedRecord(doc=None, label=repr(line.strip()[:80]), error=str(e))
+
+    label = id_for_debugging(record)
+    try:
+        return ReindexedRecord(doc=reindex_record(record, check=False), label=label)
+    except pydantic.ValidationError as e:
+        return ReindexedRecord(doc=None, label=label, error=str(e))
+
+
 id_validator: pydantic.TypeAdapter[UrsusId] = pydantic.TypeAdapter(UrsusId)
 ark_list_validator: pydantic.TypeAdapter[MARCList[Ark] | Empty] = pydantic.TypeAdapter(
     MARCList[Ark] | Empty
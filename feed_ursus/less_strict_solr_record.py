@@ -1,6 +1,7 @@
 # flake8: noqa: ANN401 (any-type) - pydantic validators need to handle unexpected types
 # pyright: standard
 
+from functools import cache, cached_property
 from typing import Annotated, Any, Self
 
 from pydantic import (
@@ -26,7 +27,7 @@ class _LessStrictBase(UrsusSolrRecord):
     )
 
     @computed_field
-    @property
+    @cached_property
     def date_dtsim(self) -> list[SolrDatetime] | None:
         try:
             return super().date_dtsim
@@ -65,24 +66,33 @@ class _LessStrictBase(UrsusSolrRecord):
         return data
 
 
-new_fields = {}
-
-for f_name, f_info in UrsusSolrRecord.model_fields.items():
-    f_dct = f_info.asdict()
-    new_fields[f_name] = (
-        Annotated[
-            (
-                f_dct["annotation"] | Any,
-                *f_dct["metadata"],
-                Field(**f_dct["attributes"]),
-            )
-        ],
-        None,
+@cache
+def _less_strict_model() -> type[_LessStrictBase]:
+    new_fields: dict[str, Any] = {}
+
+    for f_name, f_info in UrsusSolrRecord.model_fields.items():
+        f_dct = f_info.asdict()
+        new_fields[f_name] = (
+            Annotated[
+                (
+                    f_dct["annotation"] | Any,
+                    *f_dct["metadata"],
+                    Field(**f_dct["attributes"]),
+                )
+            ],
+            None,
+        )
+
+    return create_model(
+        f"{UrsusSolrRecord.__name__}LessStrict",
+        __base__=_LessStrictBase,
+        **new_fields,
     )
 
 
-LessStrictSolrRecord = create_model(
-    f"{UrsusSolrRecord.__name__}LessStrict",
-    __base__=_LessStrictBase,
-    **new_fields,
-)
+def __getattr__(name: str) -> Any:
+    # Building LessStrictSolrRecord over every field of UrsusSolrRecord is slow, so
+    # it is only done when it is first used
+    if name == "LessStrictSolrRecord":
+        return _less_strict_model()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,179 @@
+"""Helpers for spreading work across processes and threads."""
+
+import multiprocessing
+import queue
+import threading
+from collections import deque
+from collections.abc import Callable, Generator, Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing.context import BaseContext
+from types import TracebackType
+from typing import Generic, TypeVar
+
+from feed_ursus.util import chunked
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def _map_chunk(fn: Callable[[T], R], chunk: list[T]) -> list[R]:
+    return [fn(item) for item in chunk]
+
+
+def ordered_map(
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    workers: int = 1,
+    chunksize: int = 16,
+) -> Iterator[R]:
+    """Like the builtin `map`, but runs `fn` in a pool of `workers` processes.
+
+    Unlike `ProcessPoolExecutor.map`, `items` is consumed lazily: only about
+    `2 * workers` chunks are in flight at any time, so memory use stays bounded for
+    long inputs. Results are yielded in input order.
+
+    `fn` must be picklable (i.e. defined at module level), and should return errors
+    rather than raising them if the caller needs to carry on after a failure.
+
+    Workers are started from a fork server (or spawned, where there is none) rather
+    than forked from this process, since other threads, e.g. `prefetch` or
+    `BackgroundWriter`, may be holding locks that a forked worker would inherit.
+    """
+
+    if workers <= 1:
+        yield from map(fn, items)
+        return
+
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context())
+    pending: deque[Future[list[R]]] = deque()
+    try:
+        for chunk in chunked(items, chunksize):
+            pending.append(pool.submit(_map_chunk, fn, chunk))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+
+        while pending:
+            yield from pending.popleft().result()
+
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+def _pool_context() -> BaseContext:
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+_DONE = object()
+
+
+def prefetch(items: Iterable[T], depth: int = 1) -> Generator[T, None, None]:
+    """Iterate over `items` in a background thread, staying up to `depth` items ahead.
+
+    Useful when producing each item waits on the network, e.g. paging through solr
+    results while the previous page is still being processed. Exceptions raised by
+    `items` are re-raised by the consumer. If the consumer stops early, the producer
+    thread is stopped too.
+    """
+
+    buffer: queue.Queue[tuple[object, BaseException | None]] = queue.Queue(depth)
+    stop = threading.Event()
+
+    def put(entry: tuple[object, BaseException | None]) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        iterator = iter(items)
+        try:
+            for item in iterator:
+                if not put((item, None)):
+                    return
+            put((_DONE, None))
+        except BaseException as e:
+            put((_DONE, e))
+        finally:
+            if close := getattr(iterator, "close", None):
+                close()
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, error = buffer.get()
+            if error:
+                raise error
+            if item is _DONE:
+                return
+            yield item  # type: ignore[misc]
+    finally:
+        stop.set()
+        thread.join()
+
+
+class BackgroundWriter(Generic[T]):
+    """Calls `fn` on each submitted item in `workers` background threads.
+
+    With a single worker, items are written in the order they were submitted. At most
+    `max_pending` items wait to be written; `submit` blocks beyond that, so a slow
+    writer holds back the producer instead of piling up memory. If `fn` raises, the
+    error is re-raised by the next `submit` or by `close`. Used as a context manager,
+    everything submitted is written before the block exits.
+    """
+
+    def __init__(
+        self,
+        fn: Callable[[T], object],
+        max_pending: int = 2,
+        workers: int = 1,
+    ):
+        self.fn = fn
+        self._pending: queue.Queue[object] = queue.Queue(max_pending)
+        self._error: BaseException | None = None
+        self._threads = [
+            threading.Thread(target=self._write, daemon=True) for _ in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _write(self) -> None:
+        while (item := self._pending.get()) is not _DONE:
+            if self._error is None:
+                try:
+                    self.fn(item)  # type: ignore[arg-type]
+                except BaseException as e:
+                    # keep draining the queue so that submit() doesn't block
+                    self._error = e
+
+    def submit(self, item: T) -> None:
+        if self._error:
+            raise self._error
+        self._pending.put(item)
+
+    def close(self) -> None:
+        """Wait for everything submitted to be written."""
+
+        alive = [thread for thread in self._threads if thread.is_alive()]
+        for _ in alive:
+            self._pending.put(_DONE)
+        for thread in alive:
+            thread.join()
+        if self._error:
+            raise self._error
+
+    def __enter__(self) -> "BackgroundWriter[T]":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
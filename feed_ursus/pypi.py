@@ -0,0 +1,133 @@
+"""Check PyPI for a newer version of feed_ursus."""
+
+import importlib.metadata
+import json
+import threading
+import time
+import typing
+from pathlib import Path
+
+import click
+from packaging.version import Version
+from pydantic import BaseModel, ConfigDict
+
+from feed_ursus.http_client import HttpClient
+
+
+class PyPIInfo(BaseModel):
+    """Very limited model of a PyPI json response – intended only for retrieving version
+    numbers, everything else is ignored."""
+
+    model_config = ConfigDict(extra="ignore")
+    version: str
+
+
+class PyPIResponse(BaseModel):
+    """Very limited model of a PyPI json response – intended only for retrieving version
+    numbers, everything else is ignored."""
+
+    model_config = ConfigDict(extra="ignore")
+    info: PyPIInfo
+
+
+PYPI_URL = "https://pypi.python.org/pypi/feed_ursus/json"
+PYPI_TIMEOUT = 2
+PYPI_CACHE_TTL = 24 * 60 * 60
+
+
+def latest_version(http: HttpClient | None = None) -> Version:
+    """Ask PyPI for the latest released version of feed_ursus."""
+
+    response = PyPIResponse.model_validate(
+        (http or HttpClient()).get(PYPI_URL, timeout=PYPI_TIMEOUT).json()
+    )
+    return Version(response.info.version)
+
+
+def is_outdated(
+    http: HttpClient | None = None, latest: Version | None = None
+) -> typing.Literal[False] | Version:
+    local_version = Version(importlib.metadata.version("feed_ursus"))
+    latest = latest or latest_version(http)
+
+    if local_version < latest and not local_version.is_devrelease:
+        return latest
+    else:
+        return False
+
+
+class OutdatedCheck:
+    """Checks PyPI for a newer version of feed_ursus without holding up the command.
+
+    The latest version is remembered in `cache_path` for `ttl` seconds. While that is
+    fresh, `result` is known straight away. Otherwise PyPI is asked in a background
+    thread, and the answer (if it arrives before the command finishes) is reported by
+    `warn` and cached for the next run. If PyPI can't be reached, nothing happens.
+
+    Args:
+        http: Client used for the request to PyPI. Its session is used from the
+            background thread, so it shouldn't be shared with anything that remounts
+            adapters on it while the command runs; by default the check has its own.
+        cache_path: JSON file in which to remember the latest version, or None.
+        ttl: Seconds for which the remembered version is used.
+    """
+
+    result: typing.Literal[False] | Version | None
+
+    def __init__(
+        self,
+        http: HttpClient | None = None,
+        cache_path: Path | None = None,
+        ttl: float = PYPI_CACHE_TTL,
+    ):
+        self.http = http or HttpClient(timeout=PYPI_TIMEOUT)
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self.result = None
+
+        if cached := self.read_cache():
+            self.result = is_outdated(latest=cached)
+        else:
+            threading.Thread(target=self.refresh, daemon=True).start()
+
+    def read_cache(self) -> Version | None:
+        if self.cache_path is None:
+            return None
+        try:
+            cached = json.loads(self.cache_path.read_text())
+            if time.time() - cached["checked_at"] < self.ttl:
+                return Version(cached["version"])
+        except Exception:
+            pass
+        return None
+
+    def write_cache(self, version: Version) -> None:
+        if self.cache_path is None:
+            return
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_path.with_suffix(".tmp")
+            tmp_path.write_text(
+                json.dumps({"version": str(version), "checked_at": time.time()})
+            )
+            tmp_path.replace(self.cache_path)
+        except OSError:
+            pass
+
+    def refresh(self) -> None:
+        try:
+            latest = latest_version(self.http)
+        except Exception:
+            return
+        self.write_cache(latest)
+        self.result = is_outdated(latest=latest)
+
+    def warn(self) -> None:
+        """Report a newer version found by the background check, if it has finished."""
+
+        if self.result:
+            click.echo(
+                f"feed_ursus is outdated: please upgrade to version {self.result} "
+                "(e.g. `uv tool upgrade feed_ursus`)",
+                err=True,
+            )
@@ -1,21 +1,24 @@
 # pyright: standard
 
+import importlib.metadata
+import json
 import re
 from collections.abc import Iterable
-from copy import deepcopy
+from copy import copy
 from enum import Enum
 from typing import Any
 
 from deepdiff import DeepDiff
 from deepdiff.helper import COLORED_VIEW
 
+from feed_ursus import less_strict_solr_record
 from feed_ursus.controlled_fields import (
     ResourceType,
     RightsStatement,
     TextDirection,
     ViewingHint,
+    labels_by_id,
 )
-from feed_ursus.less_strict_solr_record import LessStrictSolrRecord
 from feed_ursus.util import deduplicate, parse_marc
 
 
@@ -29,8 +32,12 @@ class UnexplainedChangesError(ValueError):
 
 
 def reindex_record(record: Any, check: bool = True) -> dict[str, Any]:  # noqa: ANN401 (any-type)
-    fixed = fix_for_reindex(deepcopy(record))
-    validated = LessStrictSolrRecord.model_validate(fixed).model_dump(
+    # fixes and validation only replace top-level fields, so a shallow copy is enough
+    # to leave `record` as it was
+    fixed = fix_for_reindex(copy(record))
+    validated = less_strict_solr_record.LessStrictSolrRecord.model_validate(
+        fixed
+    ).model_dump(
         mode="json",
         by_alias=True,
         exclude_none=True,
@@ -39,9 +46,78 @@ def reindex_record(record: Any, check: bool = True) -> dict[str, Any]:  # noqa:
     if check and (normalized_diff := get_record_diff(fixed, validated)):
         raise UnexplainedChangesError(normalized_diff)
 
+    # record which version computed the fields, so that `reindex --incremental` can
+    # leave the record alone until the next upgrade
+    validated["feed_ursus_version_ssi"] = importlib.metadata.version("feed_ursus")
+
     return validated
 
 
+# Fields that reindexing sets whether or not anything else has changed: they are
+# updated along with other changes, but don't count as changes themselves
+UNCOUNTED_CHANGES = frozenset({"timestamp", "feed_ursus_version_ssi"})
+
+
+def atomic_update(
+    original: dict[str, Any], reindexed: dict[str, Any]
+) -> dict[str, Any] | None:
+    """Work out an atomic update that turns `original`, as stored in solr, into
+    `reindexed`: the id, the `_version_` of the original, so that solr rejects the
+    update if the record has changed since, and the new value (or None, to remove it)
+    of each field that differs.
+
+    Fields that aren't in `original` are always included, since solr doesn't return
+    fields that aren't stored and would drop them from the updated record. They only
+    count as changes if `original` was computed by another version of feed_ursus.
+
+    Returns:
+        The update, or None if the whole record should be replaced instead: when
+        `original` has no `_version_` or a different id, or the update would be no
+        smaller than `reindexed`. If nothing but `UNCOUNTED_CHANGES` has changed (see
+        `is_unchanged`), the update has no fields besides id and `_version_`, and
+        `feed_ursus_version_ssi` if that has changed, so that `reindex --incremental`
+        doesn't pick the record again.
+    """
+
+    if "_version_" not in original or original.get("id") != reindexed["id"]:
+        return None
+
+    update: dict[str, Any] = {"id": reindexed["id"], "_version_": original["_version_"]}
+    for field, value in reindexed.items():
+        if field != "id" and original.get(field) != value:
+            update[field] = value
+    for field in original:
+        if field not in reindexed and field not in update:
+            update[field] = None
+
+    # fields that solr doesn't store can't be compared, but they only change when
+    # the version of feed_ursus that computes them does
+    same_version = original.get("feed_ursus_version_ssi") == reindexed.get(
+        "feed_ursus_version_ssi"
+    )
+    if not any(
+        field not in ("id", "_version_", *UNCOUNTED_CHANGES)
+        and (field in original or not same_version)
+        for field in update
+    ):
+        unchanged = {"id": update["id"], "_version_": update["_version_"]}
+        if not same_version and "feed_ursus_version_ssi" in reindexed:
+            unchanged["feed_ursus_version_ssi"] = reindexed["feed_ursus_version_ssi"]
+        return unchanged
+
+    if len(json.dumps(update)) >= len(json.dumps(reindexed)):
+        return None
+
+    return update
+
+
+def is_unchanged(update: dict[str, Any]) -> bool:
+    """Whether an update from `atomic_update` leaves a record's content as it was, at
+    most stamping it with the current version of feed_ursus."""
+
+    return update.keys() <= {"id", "_version_", "feed_ursus_version_ssi"}
+
+
 #
 #   Fixes for existing data issues
 #
@@ -119,14 +195,10 @@ def relocate_computed_field(
     if not enum_cls:
         record[base_field] = cf_value
     elif isinstance(cf_value, str):
-        record[base_field] = (
-            enum_cls[cf_value].value if cf_value in enum_cls.__members__ else cf_value
-        )
+        record[base_field] = labels_by_id(enum_cls).get(cf_value, cf_value)
     elif isinstance(cf_value, list):
-        record[base_field] = [
-            enum_cls[item].value if item in enum_cls.__members__ else item
-            for item in cf_value
-        ]
+        labels = labels_by_id(enum_cls)
+        record[base_field] = [labels.get(item, item) for item in cf_value]
     else:
         record[base_field] = cf_value
 
@@ -138,29 +210,9 @@ def relocate_computed_field(
 #
 
 
-def get_record_diff(
-    original_record: dict[Any, Any],
-    new_record: dict[Any, Any],
-) -> DeepDiff:
-    remove_access = {"registered"}
-    if original_record.get("visibility_ssi") == "sinai":
-        remove_access.add("public")
-
-    for field in original_record:
-        if (
-            isinstance(field, str)
-            and field.endswith(("_access_group_ssim", "_access_person_ssim"))
-            and isinstance(original_record[field], list)
-        ):
-            original_record[field] = list(
-                {
-                    value
-                    for value in original_record[field]
-                    if value not in remove_access
-                }
-            )
-
-    exclude_paths = [
+# Fields whose changes reindexing doesn't report
+UNCHECKED_FIELDS = frozenset(
+    {
         "resource_type_sim",  # computed from human_readable; some bad data
         "accessControl_ssim",  # hyrax stuff
         "admin_set_sim",  # hyrax stuff
@@ -216,7 +268,39 @@ def get_record_diff(
         "title_sim",  # not stored
         "ursus_id_ssi",  # outdated – use just plain 'id'
         "year_isim",  # derived from normalized_date_tesim; past implementation bad
-    ]
+    }
+)
+
+
+def get_record_diff(
+    original_record: dict[Any, Any],
+    new_record: dict[Any, Any],
+) -> DeepDiff | None:
+    """Report fields of `original_record` that are missing or have changed in
+    `new_record`, ignoring the order of values, added fields and values, and
+    `UNCHECKED_FIELDS`.
+
+    Returns:
+        None if nothing has changed, otherwise a colored DeepDiff of the changes.
+    """
+
+    remove_access = {"registered"}
+    if original_record.get("visibility_ssi") == "sinai":
+        remove_access.add("public")
+
+    for field in original_record:
+        if (
+            isinstance(field, str)
+            and field.endswith(("_access_group_ssim", "_access_person_ssim"))
+            and isinstance(original_record[field], list)
+        ):
+            original_record[field] = list(
+                {
+                    value
+                    for value in original_record[field]
+                    if value not in remove_access
+                }
+            )
 
     # if a language code is in language_tesim, it should get deleted from the
     # human_readable_language fields
@@ -224,11 +308,18 @@ def get_record_diff(
         for field in ("human_readable_language_tesim", "human_readable_language_sim"):
             original_record.pop(field, None)
 
+    normalized_original = normalize_record(original_record)
+    normalized_new = normalize_record(new_record)
+    if keeps_fields(normalized_original, normalized_new):
+        return None
+
+    # DeepDiff is slow on large records, so it only runs to decide on and report
+    # changes that the quick check couldn't rule out
     diff = DeepDiff(
-        normalize_record(original_record),
-        normalize_record(new_record),
+        normalized_original,
+        normalized_new,
         ignore_order=True,
-        exclude_paths=exclude_paths,
+        exclude_paths=list(UNCHECKED_FIELDS),
         view=COLORED_VIEW,
     )
 
@@ -237,7 +328,39 @@ def get_record_diff(
     diff.pop("dictionary_item_added", None)
     diff.pop("iterable_item_added", None)
 
-    return diff
+    return diff or None
+
+
+def keeps_fields(original: dict[str, Any], new: dict[str, Any]) -> bool:
+    """Quickly check that `new` has every field of `original` (both normalized) with
+    the same value, or for lists at least the same values in any order.
+
+    Any value that can't be compared this way, e.g. a list of dicts, counts as changed,
+    so that only a True result is conclusive.
+    """
+
+    for field, value in original.items():
+        if field in UNCHECKED_FIELDS:
+            continue
+        if field not in new:
+            return False
+
+        new_value = new[field]
+        if isinstance(value, list) and isinstance(new_value, list):
+            try:
+                if not typed_values(value) <= typed_values(new_value):
+                    return False
+            except TypeError:  # unhashable values
+                return False
+        elif type(value) is not type(new_value) or value != new_value:
+            return False
+
+    return True
+
+
+def typed_values(values: list[Any]) -> set[tuple[type, Any]]:
+    # keep the type with each value, since DeepDiff tells 1 from 1.0 and True
+    return {(type(value), value) for value in values}
 
 
 def normalize_record(record: Any) -> Any:  # noqa: ANN401 (any-type)
@@ -249,9 +372,9 @@ def normalize_record(record: Any) -> Any:  # noqa: ANN401 (any-type)
 
     # remove falsy values and return
     return {
-        key: normalize_value(value, key)
+        key: normalized
         for key, value in record.items()
-        if normalize_value(value, key) not in (None, [], "")
+        if (normalized := normalize_value(value, key)) not in (None, [], "")
     }
 
 
@@ -293,9 +416,9 @@ def normalize_value(value: Any, field_name: str = "") -> Any:  # noqa: ANN401 (a
         case _, Iterable():
             # Make sure to handle Iterable *after* str – strings are also Iterables
             return [
-                normalize_value(item, field_name)
+                normalized
                 for item in value
-                if normalize_value(item, field_name)
+                if (normalized := normalize_value(item, field_name))
             ]
         case _, _:
             return value
@@ -0,0 +1,358 @@
+"""How records are submitted to solr, and when they are committed."""
+
+import functools
+import re
+import typing
+from collections.abc import Callable, Iterable, Iterator
+from enum import Enum
+from typing import Any, NamedTuple
+
+import click
+
+# pysolr, requests and urllib3 are imported where they are used, so that the CLI can
+# import the options defined here without them
+if typing.TYPE_CHECKING:
+    from pysolr import Solr, SolrError  # type: ignore
+    from urllib3.util.retry import Retry
+
+    from feed_ursus.http_client import HttpClient
+
+
+class CommitMode(Enum):
+    HARD = "hard"  # hard commit with every request
+    SOFT = "soft"  # soft commit with every request; solr's autoCommit makes it durable
+    WITHIN = "within"  # ask solr to commit within `within_ms` of each request
+    FINAL = "final"  # a single hard commit once everything has been submitted
+
+
+class CommitPolicy(NamedTuple):
+    """How updates sent to solr are committed.
+
+    Hard commits on every request (the default) make changes visible immediately, but
+    on a large load they churn segments and searcher warmups. The other modes leave
+    it to solr, or to a single commit at the end.
+
+    pysolr can't send commitWithin with a delete, so in `within` mode deletes are soft
+    committed instead.
+    """
+
+    mode: CommitMode = CommitMode.HARD
+    within_ms: int = 10_000
+
+    def update_params(self) -> dict[str, str]:
+        """Query parameters for a request to solr's /update handler."""
+
+        match self.mode:
+            case CommitMode.HARD:
+                return {"commit": "true"}
+            case CommitMode.SOFT:
+                return {"softCommit": "true"}
+            case CommitMode.WITHIN:
+                return {"commitWithin": str(self.within_ms)}
+            case CommitMode.FINAL:
+                return {}
+
+    def add_kwargs(self) -> dict[str, Any]:
+        """Keyword arguments for `pysolr.Solr.add`."""
+
+        match self.mode:
+            case CommitMode.HARD:
+                return {"commit": True}
+            case CommitMode.SOFT:
+                return {"commit": False, "softCommit": True}
+            case CommitMode.WITHIN:
+                return {"commit": False, "commitWithin": self.within_ms}
+            case CommitMode.FINAL:
+                return {"commit": False}
+
+    def delete_kwargs(self) -> dict[str, Any]:
+        """Keyword arguments for `pysolr.Solr.delete`."""
+
+        match self.mode:
+            case CommitMode.HARD:
+                return {"commit": True}
+            case CommitMode.SOFT | CommitMode.WITHIN:
+                return {"commit": False, "softCommit": True}
+            case CommitMode.FINAL:
+                return {"commit": False}
+
+    def finish(self, solr: "Solr") -> None:
+        """Commit anything left uncommitted, once all updates have been sent."""
+
+        if self.mode is CommitMode.FINAL:
+            solr.commit()  # pyright: ignore[reportUnknownMemberType]
+
+
+def commit_options(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Add --commit and --commit-within options to a click command, and pass them to
+    it as a single `commit_policy` argument."""
+
+    @click.option(
+        "--commit",
+        "commit_mode",
+        type=click.Choice([mode.value for mode in CommitMode]),
+        default=CommitMode.HARD.value,
+        show_default=True,
+        help=(
+            "When to commit: with every request (hard or soft), within "
+            "--commit-within milliseconds, or once at the end (final)."
+        ),
+    )
+    @click.option(
+        "--commit-within",
+        type=click.IntRange(1, None),
+        default=CommitPolicy().within_ms,
+        show_default=True,
+        help="Milliseconds within which solr should commit, with --commit within.",
+    )
+    @functools.wraps(fn)
+    def wrapper(
+        *args: object, commit_mode: str, commit_within: int, **kwargs: object
+    ) -> object:
+        return fn(
+            *args,
+            commit_policy=CommitPolicy(CommitMode(commit_mode), commit_within),
+            **kwargs,
+        )
+
+    return wrapper
+
+
+# Responses worth retrying: rate limiting, or solr (or a proxy in front of it) being
+# overloaded or restarting
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Responses with which solr rejects the documents in a request, rather than the
+# request as a whole: bad documents, and version conflicts
+REJECTED_STATUSES = (400, 409)
+
+SOLR_ERROR_STATUS_REGEX = re.compile(r"\(HTTP (\d{3})\)")
+
+
+def solr_error_status(e: "SolrError") -> int | None:
+    """The HTTP status of the response that pysolr raised `e` for, if there was one."""
+
+    match = SOLR_ERROR_STATUS_REGEX.search(str(e))
+    return int(match.group(1)) if match else None
+
+
+def estimated_size(value: object) -> int:
+    """Roughly the length of `value` serialized as JSON, without serializing it.
+
+    pysolr serializes each batch again anyway, so this avoids encoding every document
+    twice. Non-ASCII strings are counted at 6 bytes a character, since pysolr escapes
+    them, so the estimate errs on the large side.
+    """
+
+    if isinstance(value, str):
+        return (len(value) if value.isascii() else 6 * len(value)) + 2
+    if isinstance(value, dict):
+        return 2 + sum(
+            estimated_size(key) + estimated_size(item) + 4
+            for key, item in typing.cast(dict[object, object], value).items()
+        )
+    if isinstance(value, (list, tuple)):
+        return 2 + sum(
+            estimated_size(item) + 2 for item in typing.cast(Iterable[object], value)
+        )
+    return len(str(value))
+
+
+class SubmissionSettings(NamedTuple):
+    """How updates are sent to solr.
+
+    Attributes:
+        batch_docs: Maximum number of documents per update request.
+        batch_bytes: Maximum size of an update request, as serialized JSON (as
+            estimated by `estimated_size`).
+        max_concurrent: Maximum number of update requests in flight at once.
+        retries: Number of times a request is retried after a 429 or 5xx response.
+        backoff: Seconds to wait before the first retry, doubling for each one after.
+    """
+
+    batch_docs: int = 1000
+    batch_bytes: int = 10_000_000
+    max_concurrent: int = 2
+    retries: int = 3
+    backoff: float = 0.5
+
+    def retry(self) -> "Retry":
+        from urllib3.util.retry import Retry
+
+        return Retry(
+            total=self.retries,
+            backoff_factor=self.backoff,
+            status_forcelist=RETRY_STATUSES,
+            # solr updates are idempotent, since documents are replaced by id
+            allowed_methods=None,
+            raise_on_status=False,
+        )
+
+    def backoff_seconds(self, attempt: int) -> float:
+        """Seconds to wait before retry number `attempt` (zero-based)."""
+        return self.backoff * 2**attempt
+
+    def mount(self, http: "HttpClient", solr_url: str) -> None:
+        """Configure requests to `solr_url` with retries, and enough pooled
+        connections for `max_concurrent` requests."""
+
+        http.mount(solr_url, max_retries=self.retry(), pool_maxsize=self.max_concurrent)
+
+    def batches(self, docs: Iterable[dict[str, Any]]) -> Iterator[list[dict[str, Any]]]:
+        """Group `docs` into batches within `batch_docs` and `batch_bytes`. A single
+        document larger than `batch_bytes` gets a batch of its own."""
+
+        batch: list[dict[str, Any]] = []
+        batch_size = 0
+        for doc in docs:
+            doc_size = estimated_size(doc)
+            if batch and (
+                len(batch) >= self.batch_docs
+                or batch_size + doc_size > self.batch_bytes
+            ):
+                yield batch
+                batch = []
+                batch_size = 0
+
+            batch.append(doc)
+            batch_size += doc_size
+
+        if batch:
+            yield batch
+
+
+def submission_options(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Add options for `SubmissionSettings` to a click command, and pass them to it as
+    a single `submission` argument. Each can also be set in an environment variable."""
+
+    defaults = SubmissionSettings()
+
+    @click.option(
+        "--batch-docs",
+        type=click.IntRange(1, None),
+        default=defaults.batch_docs,
+        show_default=True,
+        envvar="FEED_URSUS_BATCH_DOCS",
+        help="Maximum number of documents per solr update request.",
+    )
+    @click.option(
+        "--batch-bytes",
+        type=click.IntRange(1, None),
+        default=defaults.batch_bytes,
+        show_default=True,
+        envvar="FEED_URSUS_BATCH_BYTES",
+        help="Maximum size in bytes of a solr update request.",
+    )
+    @click.option(
+        "--max-concurrent-requests",
+        type=click.IntRange(1, None),
+        default=defaults.max_concurrent,
+        show_default=True,
+        envvar="FEED_URSUS_MAX_CONCURRENT_REQUESTS",
+        help="Maximum number of solr update requests in flight at once.",
+    )
+    @click.option(
+        "--retries",
+        type=click.IntRange(0, None),
+        default=defaults.retries,
+        show_default=True,
+        envvar="FEED_URSUS_RETRIES",
+        help="Number of retries after a 429 or 5xx response from solr.",
+    )
+    @click.option(
+        "--backoff",
+        type=click.FloatRange(0, None),
+        default=defaults.backoff,
+        show_default=True,
+        envvar="FEED_URSUS_BACKOFF",
+        help="Seconds to wait before the first retry, doubling for each one after.",
+    )
+    @functools.wraps(fn)
+    def wrapper(
+        *args: object,
+        batch_docs: int,
+        batch_bytes: int,
+        max_concurrent_requests: int,
+        retries: int,
+        backoff: float,
+        **kwargs: object,
+    ) -> object:
+        return fn(
+            *args,
+            submission=SubmissionSettings(
+                batch_docs=batch_docs,
+                batch_bytes=batch_bytes,
+                max_concurrent=max_concurrent_requests,
+                retries=retries,
+                backoff=backoff,
+            ),
+            **kwargs,
+        )
+
+    return wrapper
+
+
+def add_bisecting(
+    solr: "Solr",
+    docs: list[dict[str, Any]],
+    commit_policy: CommitPolicy = CommitPolicy(),
+    on_error: Callable[[dict[str, Any], "SolrError"], object] = lambda doc, e: None,
+    field_updates: dict[str, str] | None = None,
+    unapplied: Callable[[list[dict[str, Any]]], list[dict[str, Any]]] | None = None,
+) -> int:
+    """Add `docs` to solr. If solr rejects the batch, split it in half and retry each
+    half, so that only the offending documents are left out.
+
+    Only rejections of the documents themselves (`REJECTED_STATUSES`) are bisected.
+    Anything else, e.g. a connection error or a 5xx response that is still failing
+    after the retries, is raised, since it would affect every half just the same.
+
+    Args:
+        solr: The solr client.
+        docs: Documents to add.
+        commit_policy: When the documents are committed.
+        on_error: Called with each rejected document and solr's error.
+        field_updates: For atomic updates, the modifier (e.g. "set") for each field
+            to update, as for `pysolr.Solr.add`.
+        unapplied: Called with the documents of a rejected batch before it is split,
+            returning those still to be sent. Solr applies the documents before the
+            one it rejects, so atomic updates guarded by `_version_` can't simply be
+            sent again.
+
+    Returns:
+        The number of rejected documents.
+    """
+
+    if not docs:
+        return 0
+
+    from pysolr import SolrError  # type: ignore
+
+    kwargs = commit_policy.add_kwargs()
+    if field_updates:
+        kwargs["fieldUpdates"] = field_updates
+
+    try:
+        solr.add(docs, **kwargs)  # pyright: ignore[reportUnknownMemberType]
+        return 0
+
+    except SolrError as e:
+        if solr_error_status(e) not in REJECTED_STATUSES:
+            raise
+
+        if len(docs) == 1:
+            on_error(docs[0], e)
+            return 1
+
+        if unapplied is not None:
+            docs = unapplied(docs)
+            if len(docs) <= 1:
+                return add_bisecting(solr, docs, commit_policy, on_error, field_updates)
+
+        mid = len(docs) // 2
+        rejected = add_bisecting(
+            solr, docs[:mid], commit_policy, on_error, field_updates, unapplied
+        )
+        return rejected + add_bisecting(
+            solr, docs[mid:], commit_policy, on_error, field_updates, unapplied
+        )
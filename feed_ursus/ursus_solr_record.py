@@ -4,6 +4,7 @@ import re
 from collections.abc import Callable, Generator
 from datetime import UTC, datetime
 from enum import Enum
+from functools import cache, cached_property
 from typing import Annotated, Any, Literal, Self, TypeVar, cast
 from urllib.parse import urlparse
 
@@ -22,7 +23,6 @@ from pydantic import (
 )
 from pydantic.functional_serializers import field_serializer
 from pydantic.types import StringConstraints
-from pysolr import Solr  # pyright: ignore[reportMissingTypeStubs]
 
 from feed_ursus import date_parser, year_parser
 from feed_ursus.controlled_fields import (
@@ -48,10 +48,21 @@ from feed_ursus.util import (
     serialize_term,
 )
 
-solr_date_from_python = cast(
-    Callable[[datetime], str],
-    Solr("http://nowhere")._from_python,  # pyright: ignore[reportPrivateUsage, reportUnknownMemberType]
-)
+
+@cache
+def _solr_converter() -> Callable[[datetime], str]:
+    # pysolr is only imported, and a client created, once a date is first formatted
+    from pysolr import Solr  # pyright: ignore[reportMissingTypeStubs]
+
+    return cast(
+        Callable[[datetime], str],
+        Solr("http://nowhere")._from_python,  # pyright: ignore[reportPrivateUsage, reportUnknownMemberType]
+    )
+
+
+def solr_date_from_python(value: datetime) -> str:
+    """Format a datetime the way pysolr does when sending it to solr."""
+    return _solr_converter()(value)
 
 
 T = TypeVar("T")
@@ -128,7 +139,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field(alias="id")
-    @property
+    @cached_property
     def solr_id(self) -> str:
         return make_ursus_id(self.ark_ssi)
 
@@ -144,7 +155,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def iiif_text_direction_ssi(self) -> str | None:
         return serialize_term(
             self.human_readable_iiif_text_direction_ssi,
@@ -160,7 +171,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def iiif_viewing_hint_ssi(self) -> str | None:
         return serialize_term(
             self.human_readable_iiif_viewing_hint_ssi,
@@ -176,12 +187,12 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def language_sim(self) -> list[str] | None:
         return self.language_tesim
 
     @computed_field
-    @property
+    @cached_property
     def human_readable_language_tesim(self) -> list[str] | None:
         return [
             language_names[language_code]
@@ -190,7 +201,7 @@ class UrsusSolrRecord(BaseModel):
         ] or None
 
     @computed_field
-    @property
+    @cached_property
     def human_readable_language_sim(self) -> list[str] | None:
         return self.human_readable_language_tesim
 
@@ -200,7 +211,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def human_readable_resource_type_sim(self) -> list[str] | None:
         return serialize_term(
             self.human_readable_resource_type_tesim,
@@ -209,7 +220,7 @@ class UrsusSolrRecord(BaseModel):
         )
 
     @computed_field
-    @property
+    @cached_property
     def resource_type_sim(self) -> list[str] | None:
         return serialize_term(
             self.human_readable_resource_type_tesim,
@@ -218,7 +229,7 @@ class UrsusSolrRecord(BaseModel):
         )
 
     @computed_field
-    @property
+    @cached_property
     def resource_type_ssim(self) -> list[str] | None:
         return serialize_term(
             self.human_readable_resource_type_tesim,
@@ -227,7 +238,7 @@ class UrsusSolrRecord(BaseModel):
         )
 
     @computed_field
-    @property
+    @cached_property
     def resource_type_tesim(self) -> list[str] | None:
         return serialize_term(
             self.human_readable_resource_type_tesim,
@@ -253,7 +264,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def rights_statement_tesim(self) -> list[str] | None:
         return serialize_term(
             self.human_readable_rights_statement_tesim,
@@ -353,7 +364,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def architect_sim(self) -> list[str] | None:
         return self.architect_tesim or None
 
@@ -381,7 +392,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def archival_collection_tesi(self) -> str | None:
         result: str = ""
         match self.archival_collection_title_ssi, self.archival_collection_number_ssi:
@@ -423,12 +434,12 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def arranger_sim(self) -> list[str] | None:
         return self.arranger_tesim or None
 
     @computed_field
-    @property
+    @cached_property
     def artist_sim(self) -> list[str] | None:
         return self.artist_tesim or None
 
@@ -438,7 +449,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def associated_name_sim(self) -> list[str] | None:
         return self.associated_name_tesim or None
 
@@ -448,7 +459,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def author_sim(self) -> list[str] | None:
         return self.author_tesim or None
 
@@ -463,7 +474,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def binding_note_tesim(self) -> list[str] | None:
         return [self.binding_note_ssi] if self.binding_note_ssi else None
 
@@ -473,7 +484,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def calligrapher_sim(self) -> list[str] | None:
         return self.calligrapher_tesim
 
@@ -488,7 +499,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def cartographer_sim(self) -> list[str] | None:
         return self.cartographer_tesim or None
 
@@ -512,7 +523,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def combined_names_ssim(self) -> list[str] | None:
         return list(dict.fromkeys(self._combine_names())) or None
 
@@ -554,7 +565,7 @@ class UrsusSolrRecord(BaseModel):
                 yield from field
 
     @computed_field
-    @property
+    @cached_property
     def combined_subject_ssim(self) -> list[str] | None:
         return (
             (self.named_subject_tesim or [])
@@ -565,7 +576,7 @@ class UrsusSolrRecord(BaseModel):
         ) or None
 
     @computed_field
-    @property
+    @cached_property
     def commentator_sim(self) -> list[str] | None:
         return self.commentator_tesim or None
 
@@ -575,7 +586,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def composer_sim(self) -> list[str] | None:
         return self.composer_tesim or None
 
@@ -590,7 +601,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def condition_note_ssi(self) -> str | None:
         return (
             self.condition_note_tesim[0]
@@ -619,7 +630,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def creator_sim(self) -> list[str] | None:
         return self.creator_tesim or None
 
@@ -634,7 +645,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def date_dtsim(self) -> list[SolrDatetime] | None:
         match self.normalized_date_tesim:
             case list(dates):
@@ -645,7 +656,7 @@ class UrsusSolrRecord(BaseModel):
                 return None
 
     @computed_field
-    @property
+    @cached_property
     def date_dtsort(self) -> SolrDatetime | None:
         match self.date_dtsim:
             case [] | None:
@@ -671,7 +682,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def dimensions_sim(self) -> list[str] | None:
         return self.dimensions_tesim or None
 
@@ -681,7 +692,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def director_sim(self) -> list[str] | None:
         return self.director_tesim or None
 
@@ -691,7 +702,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def dlcs_collection_name_tesim(self) -> list[str] | None:
         return self.member_of_collections_ssim
 
@@ -701,7 +712,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def editor_sim(self) -> list[str] | None:
         return self.editor_tesim
 
@@ -716,7 +727,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def engraver_sim(self) -> list[str] | None:
         return self.engraver_tesim or None
 
@@ -731,7 +742,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def extent_sim(self) -> list[str] | None:
         return self.extent_tesim or None
 
@@ -746,7 +757,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def features_sim(self) -> list[str] | None:
         return self.features_tesim or None
 
@@ -773,7 +784,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def form_sim(self) -> list[str] | None:
         return self.form_tesim or None
 
@@ -793,7 +804,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def genre_sim(self) -> list[str] | None:
         return self.genre_tesim or None
 
@@ -803,7 +814,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def geographic_coordinates_ssim(self) -> list[str] | None:
         return [
             ", ".join([lat, long])
@@ -879,7 +890,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def host_sim(self) -> list[str] | None:
         return self.host_tesim
 
@@ -909,7 +920,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def illuminator_sim(self) -> list[str] | None:
         return self.illuminator_tesim
 
@@ -926,7 +937,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def illustrator_sim(self) -> list[str] | None:
         return self.illustrator_tesim or None
 
@@ -953,7 +964,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def interviewee_sim(self) -> list[str] | None:
         return self.interviewee_tesim or None
 
@@ -963,7 +974,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def interviewer_sim(self) -> list[str] | None:
         return self.interviewer_tesim or None
 
@@ -978,7 +989,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def librettist_sim(self) -> list[str] | None:
         return self.librettist_tesim
 
@@ -988,7 +999,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def collector_sim(self) -> list[str] | None:
         return self.collector_tesim
 
@@ -1018,7 +1029,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def location_sim(self) -> list[str] | None:
         return self.location_tesim
 
@@ -1033,7 +1044,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def lyricist_sim(self) -> list[str] | None:
         return self.lyricist_tesim or None
 
@@ -1043,7 +1054,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def medium_sim(self) -> list[str] | None:
         return self.medium_tesim or None
 
@@ -1078,7 +1089,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def musician_sim(self) -> list[str] | None:
         return self.musician_tesim
 
@@ -1093,7 +1104,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def named_subject_sim(self) -> list[str] | None:
         return self.named_subject_tesim
 
@@ -1103,7 +1114,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def normalized_date_sim(self) -> list[str] | None:
         return self.normalized_date_tesim or None
 
@@ -1150,7 +1161,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def photographer_sim(self) -> list[str] | None:
         return self.photographer_tesim or None
 
@@ -1160,7 +1171,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def place_of_origin_sim(self) -> list[str] | None:
         return self.place_of_origin_tesim or None
 
@@ -1183,7 +1194,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def printer_sim(self) -> list[str] | None:
         return self.printer_tesim or None
 
@@ -1193,7 +1204,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def printmaker_sim(self) -> list[str] | None:
         return self.printmaker_tesim or None
 
@@ -1203,7 +1214,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def producer_sim(self) -> list[str] | None:
         return self.producer_tesim or None
 
@@ -1213,7 +1224,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def program_sim(self) -> list[str] | None:
         return self.program_tesim or None
 
@@ -1228,7 +1239,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def publisher_sim(self) -> list[str] | None:
         return self.publisher_tesim or None
 
@@ -1238,7 +1249,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def recipient_sim(self) -> list[str] | None:
         return self.recipient_tesim or None
 
@@ -1282,7 +1293,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def repository_sim(self) -> list[str] | None:
         return self.repository_tesim or None
 
@@ -1307,7 +1318,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def researcher_sim(self) -> list[str] | None:
         return self.researcher_tesim or None
 
@@ -1330,7 +1341,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def rubricator_sim(self) -> list[str] | None:
         return self.rubricator_tesim or None
 
@@ -1340,7 +1351,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def scribe_sim(self) -> list[str] | None:
         return self.scribe_tesim or None
 
@@ -1355,7 +1366,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def script_sim(self) -> list[str] | None:
         return self.script_tesim or None
 
@@ -1365,7 +1376,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def series_sim(self) -> list[str] | None:
         return self.series_tesim or None
 
@@ -1390,17 +1401,17 @@ class UrsusSolrRecord(BaseModel):
     # shelfmark_aplha_numeric_ssort - don't create, we're using a solr copy field
 
     @computed_field
-    @property
+    @cached_property
     def sort_title_ssort(self) -> str | None:
         return self.sort_title_tsort
 
     @computed_field
-    @property
+    @cached_property
     def sort_title_tsort(self) -> str | None:
         return self.title_tesim[0]
 
     @computed_field
-    @property
+    @cached_property
     def subject_cultural_object_sim(self) -> list[str] | None:
         return self.subject_cultural_object_tesim or None
 
@@ -1410,7 +1421,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def subject_domain_topic_sim(self) -> list[str] | None:
         return self.subject_domain_topic_tesim or None
 
@@ -1420,7 +1431,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def subject_geographic_sim(self) -> list[str] | None:
         return self.subject_geographic_tesim or None
 
@@ -1435,12 +1446,12 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def subject_sim(self) -> list[str] | None:
         return self.subject_tesim or None
 
     @computed_field
-    @property
+    @cached_property
     def subject_temporal_sim(self) -> list[str] | None:
         return self.subject_temporal_tesim or None
 
@@ -1450,7 +1461,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def subject_topic_sim(self) -> list[str] | None:
         return self.subject_topic_tesim or None
 
@@ -1469,7 +1480,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def support_sim(self) -> list[str] | None:
         return self.support_tesim or None
 
@@ -1495,6 +1506,7 @@ class UrsusSolrRecord(BaseModel):
 
         return data  # pyright: ignore[reportUnknownVariableType]
 
+    # not cached, so that it reflects when the record is serialized
     @computed_field
     @property
     def timestamp(self) -> SolrDatetime:
@@ -1521,7 +1533,7 @@ class UrsusSolrRecord(BaseModel):
         return thumb
 
     @computed_field
-    @property
+    @cached_property
     def title_sim(self) -> list[str]:
         return self.title_tesim
 
@@ -1534,7 +1546,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def translator_sim(self) -> list[str] | None:
         return self.translator_tesim or None
 
@@ -1544,7 +1556,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def uniform_title_sim(self) -> list[str] | None:
         return self.uniform_title_tesim or None
 
@@ -1554,7 +1566,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def writing_system_sim(self) -> list[str] | None:
         return self.writing_system_tesim or None
 
@@ -1564,7 +1576,7 @@ class UrsusSolrRecord(BaseModel):
     )
 
     @computed_field
-    @property
+    @cached_property
     def year_isim(self) -> list[int] | None:
         if self.normalized_date_tesim:
             return year_parser.integer_years(self.normalized_date_tesim)
@@ -1574,7 +1586,7 @@ class UrsusSolrRecord(BaseModel):
     # groups for blacklight_access_control permissions
 
     @computed_field
-    @property
+    @cached_property
     def discover_access_group_ssim(self) -> list[Literal["public"]]:
         match self.visibility_ssi:
             case Visibility.UCLA | Visibility.OPEN | "ucla" | "open":  # pyright: ignore[reportUnnecessaryComparison]
@@ -1583,12 +1595,12 @@ class UrsusSolrRecord(BaseModel):
                 return []
 
     @computed_field
-    @property
+    @cached_property
     def read_access_group_ssim(self) -> list[Literal["public"]]:
         return self.discover_access_group_ssim
 
     @computed_field
-    @property
+    @cached_property
     def download_access_group_ssim(self) -> list[Literal["public"]]:
         return self.discover_access_group_ssim
 
@@ -1612,7 +1624,15 @@ class UrsusSolrRecord(BaseModel):
 
             # validate / ingest / map as normal
             validated = handler(data)
-            modeldump = validated.model_dump(mode="json")
+
+            # CSV rows have no computed fields, so there is nothing to compare
+            if not input_data:
+                return validated
+
+            # serialize only the computed fields we were given, keyed by name
+            modeldump = validated.model_dump(
+                mode="json", include=set(input_data), by_alias=False
+            )
 
             # check that computed fields match the saved inputs
             errors: list[str] = []
@@ -1637,6 +1657,18 @@ class UrsusSolrRecord(BaseModel):
         else:
             return handler(data)
 
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+
+        # Computed fields are cached_properties, stored in the instance __dict__
+        # alongside field values. Any of them may depend on the field that changed.
+        # (vars() is that same dict, typed as one, where self.__dict__ is typed as
+        # the class's read-only mapping proxy.)
+        if name in type(self).model_fields:
+            instance_dict = vars(self)
+            for computed_name in type(self).model_computed_fields:
+                instance_dict.pop(computed_name, None)
+
     @classmethod
     def _now(cls) -> datetime:
         """Easy-to-mock proxy for datetime.now()"""
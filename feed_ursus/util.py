@@ -1,9 +1,20 @@
 import itertools
+import os
 import re
 from collections.abc import Collection, Hashable
 from datetime import datetime
 from enum import Enum
-from typing import Annotated, Any, Iterable, Literal, TypeVar, assert_never, overload
+from pathlib import Path
+from typing import (
+    Annotated,
+    Any,
+    Iterable,
+    Iterator,
+    Literal,
+    TypeVar,
+    assert_never,
+    overload,
+)
 
 from pydantic import (
     BeforeValidator,
@@ -13,6 +24,7 @@ from pydantic import (
     ValidationError,
 )
 
+from feed_ursus.controlled_fields import ids_by_label
 from feed_ursus.date_parser import parse_normalized_date
 
 
@@ -287,10 +299,7 @@ def serialize_term(
         case Enum(), "label":
             return item.value
         case str(), "id" if enum_cls:
-            for member in enum_cls:
-                if member.value == item:
-                    return member.name
-            return item
+            return ids_by_label(enum_cls).get(item, item)
         case str(), _:
             return item
         case Collection(), _:
@@ -305,6 +314,46 @@ def deduplicate(*iterables: Iterable[Hashable]) -> list[Hashable]:
     return list(dict.fromkeys(itertools.chain(*iterables)).keys())
 
 
+U = TypeVar("U")
+
+
+def chunked(iterable: Iterable[U], size: int) -> Iterator[list[U]]:
+    """Yield lists of up to `size` items from an iterable, without consuming it all.
+
+    Example:
+        >>> list(chunked(range(5), 2))
+        [[0, 1], [2, 3], [4]]
+    """
+
+    iterator = iter(iterable)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+def solr_quote(value: str) -> str:
+    """Quote a value for use as a term in a lucene query, e.g. an ARK or an id.
+
+    Example:
+        >>> solr_quote("ark:/21198/z1")
+        '"ark:/21198/z1"'
+    """
+
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def default_cache_dir() -> Path:
+    """Directory for files that feed_ursus keeps between runs.
+
+    Uses $FEED_URSUS_CACHE_DIR if set, otherwise `feed_ursus` in $XDG_CACHE_HOME or
+    ~/.cache.
+    """
+
+    if cache_dir := os.getenv("FEED_URSUS_CACHE_DIR"):
+        return Path(cache_dir)
+
+    return Path(os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache") / "feed_ursus"
+
+
 def id_for_debugging(record: Any) -> str:  # noqa: ANN401 (any-type)
     """
     Return a label suitable for use as a header for error messages.
@@ -1,4 +1,6 @@
+from collections.abc import Callable
 from datetime import datetime
+from pathlib import Path
 
 import pytest
 from dateutil.parser import isoparse
@@ -8,8 +10,17 @@ from feed_ursus.ursus_solr_record import UrsusSolrRecord
 MOCK_NOW = "2026-05-19T19:20:00Z"
 
 
+def pytest_configure(config: pytest.Config) -> None:
+    config.addinivalue_line(
+        "markers", "real_clock: don't freeze the time used in computed fields"
+    )
+
+
 @pytest.fixture(autouse=True)
-def patch_now(monkeypatch: pytest.MonkeyPatch):
+def patch_now(monkeypatch: pytest.MonkeyPatch, request: pytest.FixtureRequest):
+    if "real_clock" in request.keywords:
+        return
+
     @classmethod
     def mock_now(cls: type[UrsusSolrRecord]) -> datetime:
         return isoparse(MOCK_NOW)
@@ -31,3 +42,21 @@ def minimal_solr_record() -> dict[str, str]:
         "ark_ssi": "ark:/123/test",
         "title_tesim": "Test Item",
     }
+
+
+@pytest.fixture
+def works_csv(tmp_path: Path) -> Callable[..., Path]:
+    """Write works.csv with `n` works, z0 to z{n-1} titled "Title {n}", followed by
+    any `extra_rows`, and return its path."""
+
+    def write(n: int, extra_rows: str = "") -> Path:
+        path = tmp_path / "works.csv"
+        path.write_text(
+            "Item ARK,Title\n"
+            + "".join(f"ark:/21198/z{i},Title {i}\n" for i in range(n))
+            + extra_rows,
+            encoding="utf-8",
+        )
+        return path
+
+    return write
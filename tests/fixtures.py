@@ -2,9 +2,15 @@ from typing import Any
 
 
 class MockResponse:
-    def __init__(self, status_code: int | None, json_data: Any):
+    def __init__(
+        self,
+        status_code: int | None,
+        json_data: Any,
+        headers: dict[str, str] | None = None,
+    ):
         self.json_data = json_data
         self.status_code = status_code
+        self.headers = headers or {}
 
     def json(self):
         return self.json_data
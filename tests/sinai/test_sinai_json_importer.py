@@ -2,11 +2,14 @@
 
 import json
 
+import httpx
 import pytest
+from pysolr import SolrError  # type: ignore
 
 import feed_sinai.sinai_types as st
 from feed_sinai.sinai_json_importer import SinaiJsonImporter
 from feed_sinai.solr_record import ManuscriptSolrRecord
+from feed_ursus.submission import CommitMode, CommitPolicy, SubmissionSettings
 from tests.sinai import test_sinai_types
 
 # feed_sinai.mapper = importlib.import_module("feed_sinai.mapper.dlp")
@@ -634,3 +637,136 @@ def test_solr_record_works_on_all(importer: SinaiJsonImporter) -> None:
             getattr(solr, field)
 
         assert isinstance(importer.solr_record(ms_obj=ms_obj), dict)
+
+
+class TestPostUpdate:
+    @pytest.mark.asyncio
+    async def test_retries_on_server_errors(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        importer = SinaiJsonImporter(
+            base_path=BASE_PATH,
+            solr_url="http://mock.url/solr/sinai",
+            submission=SubmissionSettings(retries=2, backoff=0),
+        )
+        statuses = iter([503, 429, 200])
+        requests: list[httpx.URL] = []
+
+        async def post(url: str, **kwargs) -> httpx.Response:
+            requests.append(httpx.URL(url, params=kwargs["params"]))
+            return httpx.Response(next(statuses))
+
+        monkeypatch.setattr(importer.async_client, "post", post)
+
+        response = await importer.post_update([{"id": "1"}])
+
+        assert response.status_code == 200
+        assert len(requests) == 3
+        assert requests[0].params["commit"] == "true"
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_retries(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        importer = SinaiJsonImporter(
+            base_path=BASE_PATH,
+            solr_url="http://mock.url/solr/sinai",
+            submission=SubmissionSettings(retries=1, backoff=0),
+        )
+        calls: list[str] = []
+
+        async def post(url: str, **kwargs) -> httpx.Response:
+            calls.append(url)
+            return httpx.Response(503)
+
+        monkeypatch.setattr(importer.async_client, "post", post)
+
+        response = await importer.post_update([{"id": "1"}])
+
+        assert response.status_code == 503
+        assert len(calls) == 2
+
+
+class TestAddBatch:
+    @staticmethod
+    def make_importer(
+        monkeypatch: pytest.MonkeyPatch,
+        post,
+        commit_policy: CommitPolicy = CommitPolicy(),
+    ) -> SinaiJsonImporter:
+        importer = SinaiJsonImporter(
+            base_path=BASE_PATH,
+            solr_url="http://mock.url/solr/sinai",
+            commit_policy=commit_policy,
+            submission=SubmissionSettings(retries=0, backoff=0),
+        )
+        monkeypatch.setattr(importer.async_client, "post", post)
+        return importer
+
+    @pytest.mark.asyncio
+    async def test_bisects_rejected_documents(
+        self, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        posted: list[list[dict]] = []
+
+        async def post(url: str, **kwargs) -> httpx.Response:
+            posted.append(kwargs["json"])
+            if any(doc["id"] == "bad" for doc in kwargs["json"]):
+                return httpx.Response(400, json={"error": {"msg": "bad document"}})
+            return httpx.Response(200)
+
+        importer = self.make_importer(monkeypatch, post)
+        await importer.add_batch([{"id": "1"}, {"id": "bad"}])
+
+        assert posted == [[{"id": "1"}, {"id": "bad"}], [{"id": "1"}], [{"id": "bad"}]]
+        assert "Error adding record bad: bad document" in capsys.readouterr().out
+
+    @pytest.mark.asyncio
+    async def test_raises_server_errors(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        posted: list[list[dict]] = []
+
+        async def post(url: str, **kwargs) -> httpx.Response:
+            posted.append(kwargs["json"])
+            return httpx.Response(503, text="Service Unavailable")
+
+        importer = self.make_importer(monkeypatch, post)
+        with pytest.raises(SolrError, match="HTTP 503"):
+            await importer.add_batch([{"id": str(n)} for n in range(10)])
+        assert len(posted) == 1
+
+    @pytest.mark.asyncio
+    async def test_raises_failed_final_commit(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        async def post(url: str, **kwargs) -> httpx.Response:
+            if kwargs["params"] == {"commit": "true"}:
+                return httpx.Response(500, json={"error": {"msg": "disk full"}})
+            return httpx.Response(200)
+
+        importer = self.make_importer(
+            monkeypatch, post, commit_policy=CommitPolicy(CommitMode.FINAL)
+        )
+        monkeypatch.setattr(
+            importer, "iterate_solr_records", lambda: iter([{"id": "1"}])
+        )
+        with pytest.raises(SolrError, match="HTTP 500.*disk full"):
+            await importer.load_to_solr()
+
+
+def test_wipe_commits_by_policy(monkeypatch: pytest.MonkeyPatch) -> None:
+    importer = SinaiJsonImporter(
+        solr_url="http://mock.url/solr/sinai",
+        commit_policy=CommitPolicy(CommitMode.FINAL),
+    )
+    calls: list[tuple[str, dict]] = []
+    monkeypatch.setattr(
+        importer.solr, "delete", lambda **kwargs: calls.append(("delete", kwargs))
+    )
+    monkeypatch.setattr(
+        importer.solr, "commit", lambda **kwargs: calls.append(("commit", kwargs))
+    )
+
+    importer.wipe_solr_records()
+
+    assert not importer.solr.always_commit
+    assert calls == [("delete", {"q": "*:*", "commit": False}), ("commit", {})]
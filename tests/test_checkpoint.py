@@ -0,0 +1,72 @@
+"""Tests for checkpoint.py"""
+
+from collections import deque
+from collections.abc import Iterator
+from pathlib import Path
+
+import click
+import pytest
+
+from feed_ursus.checkpoint import Checkpoint, with_marks
+
+
+def test_only_advances_past_contiguous_batches(tmp_path: Path) -> None:
+    checkpoint = Checkpoint(tmp_path, "test", {"query": "*:*"}, interval=0)
+    tickets = [checkpoint.add({"after": n}) for n in range(3)]
+
+    checkpoint.written(tickets[1])
+    assert checkpoint.state is None
+
+    checkpoint.written(tickets[0])
+    assert checkpoint.state == {"after": 1}
+
+    resumed = Checkpoint(tmp_path, "test", {"query": "*:*"}, resume=True)
+    assert resumed.resumed == {"after": 1}
+
+
+def test_other_inputs_do_not_resume(tmp_path: Path) -> None:
+    checkpoint = Checkpoint(tmp_path, "test", {"query": "a"}, interval=0)
+    checkpoint.written(checkpoint.add({"after": 0}))
+
+    with pytest.raises(click.ClickException, match="No checkpoint"):
+        Checkpoint(tmp_path, "test", {"query": "b"}, resume=True)
+
+
+def test_saved_on_error_and_cleared_on_success(tmp_path: Path) -> None:
+    with pytest.raises(RuntimeError):
+        with Checkpoint(tmp_path, "test", {}) as checkpoint:
+            checkpoint.written(checkpoint.add({"after": 0}))
+            raise RuntimeError
+
+    with Checkpoint(tmp_path, "test", {}, resume=True) as checkpoint:
+        assert checkpoint.resumed == {"after": 0}
+
+    assert not list(tmp_path.glob("checkpoints/*.json"))
+
+
+def test_without_cache_dir(tmp_path: Path) -> None:
+    with Checkpoint(None, "test", {}) as checkpoint:
+        checkpoint.written(checkpoint.add({"after": 0}))
+
+    with pytest.raises(click.ClickException, match="cache dir"):
+        Checkpoint(None, "test", {}, resume=True)
+
+
+def test_with_marks() -> None:
+    marks: deque[int] = deque()
+
+    def items() -> Iterator[int]:
+        for n in range(5):
+            marks.append(n)
+            yield n
+
+    def batches() -> Iterator[list[int]]:
+        batch: list[int] = []
+        for item in items():
+            if len(batch) == 2:
+                yield batch
+                batch = []
+            batch.append(item)
+        yield batch
+
+    assert list(with_marks(batches(), marks)) == [([0, 1], 1), ([2, 3], 3), ([4], 4)]
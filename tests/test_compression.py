@@ -0,0 +1,40 @@
+"""Tests for compression.py"""
+
+import gzip
+import sys
+from pathlib import Path
+
+import click
+import pytest
+
+from feed_ursus.compression import Compression, open_text
+
+
+def test_gzip_is_reproducible() -> None:
+    data = b'{"id": "1"}\n' * 100
+    compressed = Compression.GZIP.compress(data)
+
+    assert gzip.decompress(compressed) == data
+    assert Compression.GZIP.compress(data) == compressed
+
+
+def test_none() -> None:
+    assert Compression.NONE.compress(b"data") == b"data"
+    assert Compression.NONE.extension == ""
+
+
+def test_zstd_needs_zstandard(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setitem(sys.modules, "zstandard", None)
+
+    with pytest.raises(click.ClickException, match="zstandard"):
+        Compression.ZSTD.check_available()
+
+
+@pytest.mark.parametrize("compression", [Compression.NONE, Compression.GZIP])
+def test_open_text_detects_compression(tmp_path: Path, compression: Compression):
+    path = tmp_path / "data.jsonl"
+    path.write_bytes(compression.compress("é\n".encode("utf-8")))
+
+    assert Compression.of_file(path) is compression
+    with open_text(path) as file:
+        assert file.read() == "é\n"
@@ -1,3 +1,5 @@
+from enum import Enum
+
 import pytest
 from pydantic import BaseModel
 
@@ -60,3 +62,20 @@ def test_resource_type_in_pydantic_model() -> None:
     record = Record.model_validate({"resource_type": "notated music"})
     expected = cf.ResourceType["http://id.loc.gov/vocabulary/resourceTypes/not"]
     assert record.resource_type == expected
+
+
+@pytest.mark.parametrize(
+    "enum_cls",
+    [cf.License, cf.ResourceType, cf.RightsStatement, cf.TextDirection, cf.Visibility],
+)
+def test_lookup_maps_match_enum(enum_cls: type[Enum]) -> None:
+    ids = cf.ids_by_label(enum_cls)
+    labels = cf.labels_by_id(enum_cls)
+    for member in enum_cls:
+        assert ids[member.value] == member.name
+        assert labels[member.name] == member.value
+    assert len(ids) == len(labels) == len(enum_cls)
+
+
+def test_lookup_maps_are_built_once() -> None:
+    assert cf.ids_by_label(cf.ResourceType) is cf.ids_by_label(cf.ResourceType)
@@ -1,11 +1,26 @@
 # pyright: standard
 
+import json
+import subprocess
+import sys
+import threading
+import time
 from pathlib import Path
 
 import pytest
+from click.testing import CliRunner
 from packaging.version import Version
 
-from feed_ursus.feed_ursus import PyPIResponse, importlib, is_outdated, requests
+from feed_ursus.feed_ursus import feed_ursus
+from feed_ursus.importer import Importer
+from feed_ursus.pypi import (
+    HttpClient,
+    OutdatedCheck,
+    PyPIResponse,
+    importlib,
+    is_outdated,
+)
+from feed_ursus.submission import CommitMode, CommitPolicy, SubmissionSettings
 
 
 def test_pypi_response() -> None:
@@ -35,9 +50,9 @@ class TestIsOutdated:
                 return {"info": {"version": latest_version}}
 
         monkeypatch.setattr(
-            requests,
+            HttpClient,
             "get",
-            lambda _url: FakePyPIResponse(),
+            lambda _self, _url, **_kwargs: FakePyPIResponse(),
         )
         monkeypatch.setattr(
             importlib.metadata,
@@ -72,9 +87,9 @@ class TestIsOutdated:
                 return {"info": {"version": latest_version}}
 
         monkeypatch.setattr(
-            requests,
+            HttpClient,
             "get",
-            lambda _url: FakePyPIResponse(),
+            lambda _self, _url, **_kwargs: FakePyPIResponse(),
         )
         monkeypatch.setattr(
             importlib.metadata,
@@ -85,3 +100,155 @@ class TestIsOutdated:
         result = is_outdated()
         assert result == False
         assert not result  # result is not truthy (should be obvious here)
+
+
+class TestOutdatedCheck:
+    @pytest.fixture(autouse=True)
+    def local_version(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(importlib.metadata, "version", lambda _package: "1.0.0")
+
+    def test_fresh_cache_skips_pypi(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        cache_path = tmp_path / "pypi_version.json"
+        cache_path.write_text(
+            json.dumps({"version": "1.1.0", "checked_at": time.time()})
+        )
+
+        def get(_self, _url, **_kwargs):
+            raise AssertionError("should not ask pypi")
+
+        monkeypatch.setattr(HttpClient, "get", get)
+
+        assert OutdatedCheck(HttpClient(), cache_path).result == Version("1.1.0")
+
+    def test_stale_cache_refreshed_in_background(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        cache_path = tmp_path / "pypi_version.json"
+        cache_path.write_text(json.dumps({"version": "1.1.0", "checked_at": 0}))
+        requested = threading.Event()
+        respond = threading.Event()
+
+        class FakePyPIResponse:
+            def json(self):
+                return {"info": {"version": "1.2.0"}}
+
+        def get(_self, _url, **_kwargs):
+            requested.set()
+            respond.wait()
+            return FakePyPIResponse()
+
+        monkeypatch.setattr(HttpClient, "get", get)
+
+        check = OutdatedCheck(HttpClient(), cache_path)
+        assert requested.wait(timeout=5)
+        assert check.result is None  # not known until pypi responds
+
+        respond.set()
+        for _ in range(100):
+            if check.result is not None:
+                break
+            time.sleep(0.01)
+
+        assert check.result == Version("1.2.0")
+        assert json.loads(cache_path.read_text())["version"] == "1.2.0"
+
+    def test_offline_does_not_block(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        def get(_self, _url, **_kwargs):
+            raise ConnectionError("offline")
+
+        monkeypatch.setattr(HttpClient, "get", get)
+
+        check = OutdatedCheck(HttpClient(), tmp_path / "pypi_version.json")
+        check.refresh()
+        assert check.result is None
+        assert not (tmp_path / "pypi_version.json").exists()
+
+
+def test_outdated_check_has_its_own_session(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """the background check doesn't share the session the importer remounts"""
+
+    checks: list[OutdatedCheck] = []
+    monkeypatch.setattr(OutdatedCheck, "read_cache", lambda self: checks.append(self))
+    monkeypatch.setattr(OutdatedCheck, "refresh", lambda self: None)
+    sessions: list[object] = []
+
+    def count(self: Importer, query: str) -> None:
+        sessions.append(self.http.session)
+
+    monkeypatch.setattr(Importer, "count", count)
+
+    result = CliRunner().invoke(feed_ursus, ["--cache-dir", str(tmp_path), "count"])
+
+    assert result.exit_code == 0, result.output
+    assert len(checks) == 1
+    assert checks[0].http.session is not sessions[0]
+
+
+def test_timeout_applies_to_solr_and_iiif(monkeypatch: pytest.MonkeyPatch) -> None:
+    timeouts: list[tuple[float, float]] = []
+
+    def count(self: Importer, query: str) -> None:
+        timeouts.append((self.solr_client.timeout, self.manifests.timeout))
+
+    monkeypatch.setattr(Importer, "count", count)
+
+    result = CliRunner().invoke(
+        feed_ursus, ["--ignore-outdated", "--no-cache", "--timeout", "3", "count"]
+    )
+
+    assert result.exit_code == 0, result.output
+    assert timeouts == [(3, 3)]
+
+
+def test_submission_options_follow_subcommand(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    received: list[tuple[SubmissionSettings, CommitPolicy]] = []
+
+    def load_csv(self: Importer, commit_policy: CommitPolicy, **kwargs) -> None:
+        received.append((self.submission, commit_policy))
+
+    monkeypatch.setattr(Importer, "load_csv", load_csv)
+    csv_file = tmp_path / "works.csv"
+    csv_file.write_text("Item ARK,Title\n", encoding="utf-8")
+
+    result = CliRunner().invoke(
+        feed_ursus,
+        [
+            "--ignore-outdated",
+            "--no-cache",
+            "load",
+            "--batch-docs",
+            "500",
+            "--retries",
+            "1",
+            "--commit",
+            "final",
+            str(csv_file),
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert received == [
+        (
+            SubmissionSettings(batch_docs=500, retries=1),
+            CommitPolicy(CommitMode.FINAL),
+        )
+    ]
+
+
+def test_cli_import_is_light() -> None:
+    code = (
+        "import sys, feed_ursus.feed_ursus; "
+        "print(sorted({'pydantic', 'pysolr', 'requests', 'urllib3'} & set(sys.modules)))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "[]"
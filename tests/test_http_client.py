@@ -0,0 +1,68 @@
+"""Tests for http_client.py"""
+
+import http.server
+import threading
+from collections.abc import Iterator
+
+import pytest
+
+from feed_ursus.http_client import HttpClient
+
+
+class OkHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def server_url() -> Iterator[str]:
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), OkHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_connections_are_reused(server_url: str) -> None:
+    http = HttpClient()
+    for _ in range(3):
+        assert http.get(f"{server_url}/").text == "ok"
+
+    assert http.connections_opened() == 1
+
+
+def test_count_survives_pool_resize(server_url: str) -> None:
+    http = HttpClient(pool_maxsize=2)
+    http.get(f"{server_url}/")
+    http.ensure_pool_size(8)
+    http.get(f"{server_url}/")
+
+    assert http.connections_opened() == 2
+
+
+def test_default_timeout(monkeypatch: pytest.MonkeyPatch) -> None:
+    http = HttpClient(timeout=3)
+    calls: list[dict[str, object]] = []
+
+    def get(url: str, **kwargs: object) -> None:
+        calls.append(kwargs)
+
+    monkeypatch.setattr(http.session, "get", get)
+
+    http.get("http://example.com")
+    http.get("http://example.com", timeout=30)
+
+    assert [call["timeout"] for call in calls] == [3, 30]
+
+
+def test_requests_gzip() -> None:
+    assert "gzip" in HttpClient().session.headers["Accept-Encoding"]
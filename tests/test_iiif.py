@@ -0,0 +1,235 @@
+# pyright: standard
+
+"""Tests for feed_ursus.iiif"""
+
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from feed_ursus.iiif import ManifestFetcher, ThumbnailCache
+
+from . import fixtures
+
+
+class TestManifestFetcher:
+    def test_thumbnails(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        fetcher = ManifestFetcher()
+        requested: list[str] = []
+
+        def get(url: str, **kwargs: Any) -> fixtures.MockResponse:
+            requested.append(url)
+            return (
+                fixtures.GOOD_MANIFEST
+                if url.endswith("good")
+                else fixtures.MANIFEST_WITHOUT_IMAGES
+            )
+
+        monkeypatch.setattr(fetcher.session, "get", get)
+
+        result = fetcher.thumbnails(["http://x/good", "http://x/bad", "http://x/good"])
+
+        assert result == {
+            "http://x/good": "https://iiif.sinaimanuscripts.library.ucla.edu/iiif/2/ark%3A%2F21198%2Fz14b44n8%2Fzw07hs0c/full/!200,200/0/default.jpg",
+            "http://x/bad": None,
+        }
+        assert sorted(requested) == ["http://x/bad", "http://x/good"]  # deduplicated
+
+    def test_bounded_concurrency(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        fetcher = ManifestFetcher(max_concurrency=3)
+        lock = threading.Lock()
+        in_flight = 0
+        max_in_flight = 0
+
+        def get(url: str, **kwargs: Any) -> fixtures.MockResponse:
+            nonlocal in_flight, max_in_flight
+            with lock:
+                in_flight += 1
+                max_in_flight = max(max_in_flight, in_flight)
+            time.sleep(0.01)
+            with lock:
+                in_flight -= 1
+            return fixtures.GOOD_MANIFEST
+
+        monkeypatch.setattr(fetcher.session, "get", get)
+
+        fetcher.thumbnails(f"http://x/{n}" for n in range(12))
+
+        assert 1 < max_in_flight <= 3
+
+    def test_passes_timeout(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        fetcher = ManifestFetcher(timeout=2.5)
+        kwargs_seen: dict[str, Any] = {}
+
+        def get(url: str, **kwargs: Any) -> fixtures.MockResponse:
+            kwargs_seen.update(kwargs)
+            return fixtures.GOOD_MANIFEST
+
+        monkeypatch.setattr(fetcher.session, "get", get)
+        fetcher.thumbnail("http://x/good")
+
+        assert kwargs_seen["timeout"] == 2.5
+
+
+class TestThumbnailCache:
+    def test_opened_when_first_used(self, tmp_path: Path) -> None:
+        cache = ThumbnailCache(tmp_path / "cache.sqlite")
+        assert not (tmp_path / "cache.sqlite").exists()
+
+        cache.get("http://x/1")
+        assert (tmp_path / "cache.sqlite").exists()
+
+    def test_round_trip(self, tmp_path: Path) -> None:
+        cache = ThumbnailCache(tmp_path / "cache.sqlite")
+        cache.put("http://x/1", "http://x/1/thumb.jpg", etag='"abc"')
+        cache.commit()
+
+        reopened = ThumbnailCache(tmp_path / "cache.sqlite")
+        entry = reopened.get("http://x/1")
+
+        assert entry and entry.thumbnail == "http://x/1/thumb.jpg"
+        assert entry.etag == '"abc"'
+        assert reopened.is_fresh(entry)
+        assert reopened.get("http://x/2") is None
+
+    def test_ttl(self, tmp_path: Path) -> None:
+        cache = ThumbnailCache(tmp_path / "cache.sqlite", ttl=0)
+        cache.put("http://x/1", "http://x/1/thumb.jpg")
+        entry = cache.get("http://x/1")
+
+        assert entry and not cache.is_fresh(entry)
+
+    def test_evicts_least_recently_used(self, tmp_path: Path) -> None:
+        cache = ThumbnailCache(tmp_path / "cache.sqlite", max_entries=2)
+        for n in range(3):
+            cache.put(f"http://x/{n}", None)
+            time.sleep(0.001)
+        cache.get("http://x/0")  # now more recently used than 1 and 2
+        cache.evict()
+
+        assert cache.get("http://x/0") is not None
+        assert cache.get("http://x/1") is None
+        assert cache.get("http://x/2") is not None
+
+    def test_evicts_while_in_use(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(ThumbnailCache, "EVICT_INTERVAL", 2)
+        cache = ThumbnailCache(tmp_path / "cache.sqlite", max_entries=2)
+        for n in range(4):
+            cache.put(f"http://x/{n}", None)
+            time.sleep(0.001)
+
+        assert cache.get("http://x/0") is None
+        assert cache.get("http://x/1") is None
+        assert cache.get("http://x/3") is not None
+
+
+class TestManifestFetcherWithCache:
+    @pytest.fixture
+    def requests_made(self) -> list[dict[str, Any]]:
+        return []
+
+    def fetcher(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        requests_made: list[dict[str, Any]],
+        cache: ThumbnailCache,
+        response: fixtures.MockResponse,
+        **kwargs: Any,
+    ) -> ManifestFetcher:
+        fetcher = ManifestFetcher(cache=cache, **kwargs)
+
+        def get(url: str, **kwargs: Any) -> fixtures.MockResponse:
+            requests_made.append({"url": url, **kwargs})
+            return response
+
+        monkeypatch.setattr(fetcher.session, "get", get)
+        return fetcher
+
+    def test_single_thumbnail_is_committed(
+        self, monkeypatch: pytest.MonkeyPatch, requests_made, tmp_path: Path
+    ) -> None:
+        cache = ThumbnailCache(tmp_path / "cache.sqlite")
+        fetcher = self.fetcher(
+            monkeypatch, requests_made, cache, fixtures.GOOD_MANIFEST
+        )
+
+        thumbnail = fetcher.thumbnail("http://x/1")
+
+        entry = ThumbnailCache(tmp_path / "cache.sqlite").get("http://x/1")
+        assert entry and entry.thumbnail == thumbnail
+
+    def test_fresh_entries_make_no_requests(
+        self, monkeypatch: pytest.MonkeyPatch, requests_made, tmp_path: Path
+    ) -> None:
+        cache = ThumbnailCache(tmp_path / "cache.sqlite")
+        cache.put("http://x/1", "cached.jpg")
+        fetcher = self.fetcher(
+            monkeypatch, requests_made, cache, fixtures.GOOD_MANIFEST
+        )
+
+        assert fetcher.thumbnails(["http://x/1"]) == {"http://x/1": "cached.jpg"}
+        assert requests_made == []
+
+    def test_stale_entries_are_revalidated(
+        self, monkeypatch: pytest.MonkeyPatch, requests_made, tmp_path: Path
+    ) -> None:
+        cache = ThumbnailCache(tmp_path / "cache.sqlite", ttl=0)
+        cache.put("http://x/1", "cached.jpg", etag='"v1"', last_modified="yesterday")
+        fetcher = self.fetcher(
+            monkeypatch, requests_made, cache, fixtures.MockResponse(304, None)
+        )
+
+        assert fetcher.thumbnail("http://x/1") == "cached.jpg"
+        assert requests_made[0]["headers"] == {
+            "If-None-Match": '"v1"',
+            "If-Modified-Since": "yesterday",
+        }
+        entry = cache.get("http://x/1")
+        assert entry and entry.etag == '"v1"'
+
+    def test_changed_manifests_are_updated(
+        self, monkeypatch: pytest.MonkeyPatch, requests_made, tmp_path: Path
+    ) -> None:
+        cache = ThumbnailCache(tmp_path / "cache.sqlite", ttl=0)
+        cache.put("http://x/1", "cached.jpg", etag='"v1"')
+        response = fixtures.MockResponse(
+            200, fixtures.GOOD_MANIFEST.json_data, headers={"ETag": '"v2"'}
+        )
+        fetcher = self.fetcher(monkeypatch, requests_made, cache, response)
+
+        result = fetcher.thumbnail("http://x/1")
+
+        assert result and result.endswith("zw07hs0c/full/!200,200/0/default.jpg")
+        entry = cache.get("http://x/1")
+        assert entry and entry.etag == '"v2"' and entry.thumbnail == result
+
+    def test_refresh_ignores_cache(
+        self, monkeypatch: pytest.MonkeyPatch, requests_made, tmp_path: Path
+    ) -> None:
+        cache = ThumbnailCache(tmp_path / "cache.sqlite")
+        cache.put("http://x/1", "cached.jpg", etag='"v1"')
+        fetcher = self.fetcher(
+            monkeypatch,
+            requests_made,
+            cache,
+            fixtures.GOOD_MANIFEST,
+            refresh=True,
+        )
+
+        assert fetcher.thumbnail("http://x/1") != "cached.jpg"
+        assert requests_made[0]["headers"] == {}
+
+    def test_failed_requests_are_not_cached(
+        self, monkeypatch: pytest.MonkeyPatch, requests_made, tmp_path: Path
+    ) -> None:
+        cache = ThumbnailCache(tmp_path / "cache.sqlite")
+        fetcher = self.fetcher(
+            monkeypatch, requests_made, cache, fixtures.MockResponse(404, None)
+        )
+
+        assert fetcher.thumbnail("http://x/1") is None
+        assert cache.get("http://x/1") is None
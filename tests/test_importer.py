@@ -2,16 +2,30 @@
 
 """Tests for feed_ursus.py"""
 
+import gzip
+import hashlib
+import importlib.metadata
+import io
+import json
+import subprocess
+import sys
 import tempfile
+from collections.abc import Callable
+from datetime import datetime
 from pathlib import Path
 from typing import cast
 from unittest.mock import Mock
 
+import click
 import pytest
-from pysolr import Solr  # type: ignore
+import requests
+from pysolr import Solr, SolrError  # type: ignore
 
 import feed_ursus.importer
-from feed_ursus.importer import Importer
+from feed_ursus.compression import Compression
+from feed_ursus.importer import Importer, content_hash
+from feed_ursus.reindex import reindex_record
+from feed_ursus.submission import CommitMode, CommitPolicy, SubmissionSettings
 from feed_ursus.ursus_solr_record import UrsusSolrRecord
 from feed_ursus.util import UnknownItemError
 
@@ -44,6 +58,304 @@ class TestLoadCsv:
         with pytest.raises(FileNotFoundError):
             importer.load_csv(filenames=["tests/fixtures/nonexistent.csv"], batch=True)
 
+    def test_submits_in_chunks(
+        self, importer: Importer, works_csv: Callable[..., Path]
+    ) -> None:
+        """streams records to solr `batch_docs` at a time"""
+
+        importer.submission = SubmissionSettings(batch_docs=2)
+        csv_file = works_csv(5)
+
+        importer.load_csv(filenames=[str(csv_file)], batch=True)
+
+        calls = cast(Mock, importer.solr_client.add).call_args_list
+        # ingest record + 5 works, 2 at a time
+        assert [len(call.args[0]) for call in calls] == [2, 2, 2]
+
+    def test_resume(
+        self, importer: Importer, tmp_path: Path, works_csv: Callable[..., Path]
+    ) -> None:
+        """a resumed load carries on after the last batch saved, in the same ingest"""
+
+        importer.cache_dir = tmp_path / "cache"
+        importer.submission = SubmissionSettings(batch_docs=2, max_concurrent=1)
+        csv_file = works_csv(5)
+        add = cast(Mock, importer.solr_client.add)
+        add.side_effect = [None, requests.ConnectionError()]
+
+        with pytest.raises(requests.ConnectionError):
+            importer.load_csv(filenames=[str(csv_file)], batch=True)
+        ingest_id = importer.ingest_id
+
+        add.side_effect = None
+        add.reset_mock()
+        importer.load_csv(filenames=[str(csv_file)], batch=True, resume=True)
+
+        docs = [doc for call in add.call_args_list for doc in call.args[0]]
+        assert [doc["id"] for doc in docs] == [f"{n}z-89112" for n in range(1, 5)]
+        assert importer.ingest_id == ingest_id
+
+    def test_resume_keeps_error_count(
+        self,
+        importer: Importer,
+        tmp_path: Path,
+        capsys: pytest.CaptureFixture[str],
+    ) -> None:
+        """errors from before a resumed load are still counted in its summary"""
+
+        importer.cache_dir = tmp_path / "cache"
+        importer.submission = SubmissionSettings(batch_docs=2, max_concurrent=1)
+        csv_file = tmp_path / "works.csv"
+        csv_file.write_text(
+            "Item ARK,Title,Parent ARK\n"
+            "ark:/21198/z0,Bad,not an ark\n"
+            + "".join(f"ark:/21198/z{n},Title {n},\n" for n in range(1, 5)),
+            encoding="utf-8",
+        )
+        add = cast(Mock, importer.solr_client.add)
+        add.side_effect = [None, requests.ConnectionError()]
+
+        with pytest.raises(requests.ConnectionError):
+            importer.load_csv(filenames=[str(csv_file)], batch=True)
+
+        add.side_effect = None
+        capsys.readouterr()
+        importer.load_csv(filenames=[str(csv_file)], batch=True, resume=True)
+
+        out = capsys.readouterr().out
+        assert "Could not import row" not in out
+        assert "1 rows could not be imported" in out
+
+    @staticmethod
+    def serve_hashes(
+        importer: Importer, monkeypatch: pytest.MonkeyPatch, loaded: list[dict]
+    ) -> list[str]:
+        """Answer requests for stored content hashes with those of `loaded`, and
+        return the list of URLs requested."""
+
+        requested: list[str] = []
+
+        def get(url: str) -> fixtures.MockResponse:
+            requested.append(url)
+            return fixtures.MockResponse(
+                200,
+                {
+                    "response": {
+                        "docs": [
+                            {
+                                "id": doc["id"],
+                                "content_hash_ssi": doc.get("content_hash_ssi"),
+                            }
+                            for doc in loaded
+                        ]
+                    }
+                },
+            )
+
+        monkeypatch.setattr(importer.http, "get", get)
+        return requested
+
+    def test_skip_unchanged(
+        self,
+        importer: Importer,
+        works_csv: Callable[..., Path],
+        monkeypatch: pytest.MonkeyPatch,
+        capsys: pytest.CaptureFixture[str],
+    ) -> None:
+        """records whose content hash is already in solr aren't submitted again"""
+
+        csv_file = works_csv(3)
+        importer.load_csv(filenames=[str(csv_file)], batch=True)
+        add = cast(Mock, importer.solr_client.add)
+        requested = self.serve_hashes(importer, monkeypatch, add.call_args.args[0])
+
+        works_csv(2, "ark:/21198/z2,New title\n")
+        add.reset_mock()
+        importer.load_csv(filenames=[str(csv_file)], batch=True, skip_unchanged=True)
+
+        submitted = [doc["id"] for doc in add.call_args.args[0]]
+        assert submitted[1:] == ["2z-89112"]  # after the ingest record
+        assert len(requested) == 1
+        assert "2 unchanged records were skipped" in capsys.readouterr().out
+
+    @pytest.mark.real_clock
+    def test_skip_unchanged_loaded_earlier(
+        self,
+        importer: Importer,
+        works_csv: Callable[..., Path],
+        monkeypatch: pytest.MonkeyPatch,
+        capsys: pytest.CaptureFixture[str],
+    ) -> None:
+        """records loaded at another time are still recognised as unchanged"""
+
+        csv_file = works_csv(3)
+        with monkeypatch.context() as earlier:
+            earlier.setattr(
+                UrsusSolrRecord, "_now", classmethod(lambda cls: datetime(2020, 1, 1))
+            )
+            importer.load_csv(filenames=[str(csv_file)], batch=True)
+        add = cast(Mock, importer.solr_client.add)
+        self.serve_hashes(importer, monkeypatch, add.call_args.args[0])
+
+        add.reset_mock()
+        importer.load_csv(filenames=[str(csv_file)], batch=True, skip_unchanged=True)
+
+        submitted = [doc["id"] for doc in add.call_args.args[0]]
+        assert not any(id.endswith("z-89112") for id in submitted)
+        assert "3 unchanged records were skipped" in capsys.readouterr().out
+
+    def test_skip_unchanged_resends_new_thumbnail(
+        self,
+        importer: Importer,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+        capsys: pytest.CaptureFixture[str],
+    ) -> None:
+        """a thumbnail that changed in the IIIF manifest counts as a change"""
+
+        csv_file = tmp_path / "works.csv"
+        csv_file.write_text(
+            "Item ARK,Title,IIIF Manifest URL\n"
+            + "".join(
+                f"ark:/21198/z{n},Title {n},https://test.manifest/{n}\n"
+                for n in range(2)
+            ),
+            encoding="utf-8",
+        )
+        thumbnails = {
+            "https://test.manifest/0": "https://test.iiif/0/old.jpg",
+            "https://test.manifest/1": "https://test.iiif/1/old.jpg",
+        }
+        monkeypatch.setattr(
+            importer.manifests,
+            "thumbnails",
+            lambda urls: {url: thumbnails[url] for url in urls},
+        )
+        importer.load_csv(filenames=[str(csv_file)], batch=True)
+        add = cast(Mock, importer.solr_client.add)
+        self.serve_hashes(importer, monkeypatch, add.call_args.args[0])
+
+        thumbnails["https://test.manifest/1"] = "https://test.iiif/1/new.jpg"
+        add.reset_mock()
+        importer.load_csv(filenames=[str(csv_file)], batch=True, skip_unchanged=True)
+
+        submitted = add.call_args.args[0][1:]  # after the ingest record
+        assert [doc["id"] for doc in submitted] == ["1z-89112"]
+        assert submitted[0]["thumbnail_url_ss"] == "https://test.iiif/1/new.jpg"
+        assert "1 unchanged records were skipped" in capsys.readouterr().out
+
+    def test_bad_documents_do_not_sink_batch(
+        self, importer: Importer, works_csv: Callable[..., Path]
+    ) -> None:
+        """only the records solr rejects are left out of a batch"""
+
+        csv_file = works_csv(5)
+        added: list[str] = []
+
+        def add(docs: list[dict], **kwargs) -> None:
+            if any(doc["id"] == "2z-89112" for doc in docs):
+                raise SolrError("Solr responded with an error (HTTP 400): bad document")
+            added.extend(doc["id"] for doc in docs)
+
+        cast(Mock, importer.solr_client.add).side_effect = add
+        importer.load_csv(filenames=[str(csv_file)], batch=True)
+
+        works = sorted(id for id in added if id.endswith("-89112"))
+        assert works == ["0z-89112", "1z-89112", "3z-89112", "4z-89112"]
+
+    def test_final_commit(self, importer: Importer) -> None:
+        """with a final commit policy, only one commit is sent, at the end"""
+
+        importer.load_csv(
+            filenames=["tests/fixtures/anais_collection.csv"],
+            batch=True,
+            commit_policy=CommitPolicy(CommitMode.FINAL),
+        )
+        assert cast(Mock, importer.solr_client.add).call_args.kwargs == {
+            "commit": False
+        }
+        cast(Mock, importer.solr_client.commit).assert_called_once()
+
+    def test_invalid_ark_does_not_stop_load(
+        self,
+        importer: Importer,
+        tmp_path: Path,
+        capsys: pytest.CaptureFixture[str],
+    ) -> None:
+        """a row with a malformed ARK is reported, and the rest are still loaded"""
+
+        csv_file = tmp_path / "works.csv"
+        csv_file.write_text(
+            "Item ARK,Title,Parent ARK\n"
+            "ark:/21198/z0,First,\n"
+            "ark:/21198/z1,Second,not an ark\n"
+            "ark:/21198/z2,Third,\n",
+            encoding="utf-8",
+        )
+
+        importer.load_csv(filenames=[str(csv_file)], batch=True)
+
+        added = [
+            doc["id"] for doc in cast(Mock, importer.solr_client.add).call_args.args[0]
+        ]
+        assert added[1:] == ["0z-89112", "2z-89112"]  # after the ingest record
+        assert "Could not import row ark:/21198/z1" in capsys.readouterr().out
+
+    def test_duplicate_arks_last_row_wins(
+        self, importer: Importer, tmp_path: Path
+    ) -> None:
+        csv_file = tmp_path / "works.csv"
+        csv_file.write_text(
+            "Item ARK,Title\n"
+            "ark:/21198/z1,First\n"
+            "ark:/21198/z2,Other\n"
+            "ark:/21198/z1,Second\n",
+            encoding="utf-8",
+        )
+
+        importer.load_csv(filenames=[str(csv_file)], batch=True)
+
+        added = cast(Mock, importer.solr_client.add).call_args.args[0]
+        assert [doc.get("title_tesim") for doc in added[1:]] == [
+            ["Other"],
+            ["Second"],
+        ]
+
+    def test_workers_match_single_process(
+        self, importer: Importer, tmp_path: Path
+    ) -> None:
+        """mapping in a process pool gives the same documents, in the same order"""
+
+        csv_file = tmp_path / "works.csv"
+        csv_file.write_text(
+            "Item ARK,Title,Type.typeOfResource\n"
+            + "".join(f"ark:/21198/z{n},Title {n},still image\n" for n in range(40))
+            + "ark:/21198/bad,Bad,not a resource type\n",
+            encoding="utf-8",
+        )
+
+        importer.load_csv(filenames=[str(csv_file)], batch=True)
+        single = cast(Mock, importer.solr_client.add).call_args.args[0]
+
+        cast(Mock, importer.solr_client.add).reset_mock()
+        importer.load_csv(filenames=[str(csv_file)], batch=True, workers=2)
+        pooled = cast(Mock, importer.solr_client.add).call_args.args[0]
+
+        assert len(pooled) == 41  # ingest record + 40 works, bad row skipped
+        assert [doc["id"] for doc in pooled[1:]] == [doc["id"] for doc in single[1:]]
+
+        # worker processes may not see the mocked clock, depending on start method
+        def comparable(doc: dict) -> dict:
+            return {
+                key: value
+                for key, value in doc.items()
+                if key not in ("ingest_id_ssi", "system_modified_dtsi", "timestamp")
+            }
+
+        assert [comparable(doc) for doc in pooled[1:]] == [
+            comparable(doc) for doc in single[1:]
+        ]
+
 
 class TestMapRecord:
     class TestThumbnailUrl:
@@ -134,7 +446,9 @@ class TestThumbnailFromManifest:
     ) -> None:
         "uses the page titled 'f. 001r', if found"
         monkeypatch.setattr(
-            feed_ursus.importer.requests, "get", lambda x: fixtures.GOOD_MANIFEST
+            importer.manifests.session,
+            "get",
+            lambda x, **kwargs: fixtures.GOOD_MANIFEST,
         )
 
         result = importer.thumbnail_from_manifest(record)
@@ -151,9 +465,9 @@ class TestThumbnailFromManifest:
     ) -> None:
         "uses the first image if 'f. 001r' is not found"
         monkeypatch.setattr(
-            feed_ursus.importer.requests,
+            importer.manifests.session,
             "get",
-            lambda x: fixtures.MANIFEST_WITHOUT_F001R,
+            lambda x, **kwargs: fixtures.MANIFEST_WITHOUT_F001R,
         )
 
         result = importer.thumbnail_from_manifest(record)
@@ -171,9 +485,9 @@ class TestThumbnailFromManifest:
         "returns None if HTTP request fails"
 
         monkeypatch.setattr(
-            feed_ursus.importer.requests,
+            importer.manifests.session,
             "get",
-            lambda x: fixtures.MockResponse(None, 404),
+            lambda x, **kwargs: fixtures.MockResponse(None, 404),
         )
 
         result = importer.thumbnail_from_manifest(record)
@@ -188,9 +502,9 @@ class TestThumbnailFromManifest:
         "returns None if manifest contains no images"
 
         monkeypatch.setattr(
-            feed_ursus.importer.requests,
+            importer.manifests.session,
             "get",
-            lambda x: fixtures.MANIFEST_WITHOUT_IMAGES,
+            lambda x, **kwargs: fixtures.MANIFEST_WITHOUT_IMAGES,
         )
 
         result = importer.thumbnail_from_manifest(record)
@@ -205,12 +519,44 @@ class TestThumbnailFromManifest:
         "returns None if manifest isn't parsable"
 
         monkeypatch.setattr(
-            feed_ursus.importer.requests, "get", lambda x: fixtures.BAD_MANIFEST
+            importer.manifests.session,
+            "get",
+            lambda x, **kwargs: fixtures.BAD_MANIFEST,
         )
 
         result = importer.thumbnail_from_manifest(record)
         assert result is None
 
+    def test_load_csv_fetches_manifests_per_window(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        importer: Importer,
+        tmp_path: Path,
+    ) -> None:
+        "downloads the manifests for a whole window of records in one go"
+
+        csv_file = tmp_path / "works.csv"
+        csv_file.write_text(
+            "Item ARK,Title,IIIF Manifest URL\n"
+            + "".join(
+                f"ark:/21198/z{n},Title {n},https://test.manifest/{n}\n"
+                for n in range(5)
+            ),
+            encoding="utf-8",
+        )
+        thumbnails = Mock(
+            side_effect=lambda urls: {url: f"{url}/thumb.jpg" for url in urls}
+        )
+        monkeypatch.setattr(importer.manifests, "thumbnails", thumbnails)
+
+        importer.load_csv(filenames=[str(csv_file)], batch=True)
+
+        thumbnails.assert_called_once()
+        added = cast(Mock, importer.solr_client.add).call_args.args[0]
+        assert [doc["thumbnail_url_ss"] for doc in added[1:]] == [
+            f"https://test.manifest/{n}/thumb.jpg" for n in range(5)
+        ]
+
     def test_no_manifest_url(self, importer: Importer, record: UrsusSolrRecord) -> None:
         "returns None if the record doesn't include field 'iiif_manifest_url_ssi'"
 
@@ -219,9 +565,602 @@ class TestThumbnailFromManifest:
         assert result is None
 
 
-@pytest.mark.xfail
-def test_titles_from_solr() -> None:
-    raise NotImplementedError
+def solr_page(docs: list[dict], hits: int, next_cursor_mark: str) -> Mock:
+    page = Mock()
+    page.__iter__ = Mock(return_value=iter(docs))
+    page.docs = docs
+    page.hits = hits
+    page.nextCursorMark = next_cursor_mark
+    return page
+
+
+class TestIterateSolrRecords:
+    def test_pages_with_cursor_mark(self, importer: Importer) -> None:
+        docs = [{"id": str(n), "ark_ssi": f"ark:/21198/z{n}"} for n in range(3)]
+        search = cast(Mock, importer.solr_client).search
+        search.side_effect = [
+            solr_page(docs[:2], 3, "AoE1"),
+            solr_page(docs[2:], 3, "AoE2"),
+            solr_page([], 3, "AoE2"),
+        ]
+
+        result = list(importer.iterate_solr_records("testing", page_size=2, query="q"))
+
+        assert result == docs
+        assert [call.kwargs["cursorMark"] for call in search.call_args_list] == [
+            "*",
+            "AoE1",
+            "AoE2",
+        ]
+        assert all(
+            call.kwargs["sort"] == "ark_ssi asc, id asc" and "start" not in call.kwargs
+            for call in search.call_args_list
+        )
+
+    def test_start_becomes_filter_query(self, importer: Importer) -> None:
+        search = cast(Mock, importer.solr_client).search
+        search.side_effect = [
+            solr_page([{"id": "9z-89112", "ark_ssi": "ark:/21198/z9"}], 20, "-"),
+            solr_page([{"id": "01z-89112", "ark_ssi": "ark:/21198/z10"}], 1, "AoE1"),
+            solr_page([], 1, "AoE1"),
+        ]
+
+        result = list(importer.iterate_solr_records("testing", start=10))
+
+        assert result == [{"id": "01z-89112", "ark_ssi": "ark:/21198/z10"}]
+        offset_call, first_page, _ = search.call_args_list
+        assert offset_call.kwargs["start"] == 9
+        assert first_page.kwargs["fq"] == [
+            'ark_ssi:{"ark:/21198/z9" TO *] OR (ark_ssi:"ark:/21198/z9" AND id:{"9z-89112" TO *])'
+        ]
+        assert first_page.kwargs["cursorMark"] == "*"
+
+
+class TestReindex:
+    @staticmethod
+    def solr_doc(n: int) -> dict:
+        return reindex_record(
+            {"ark_ssi": f"ark:/21198/z{n}", "title_tesim": [f"Title {n}"]},
+            check=False,
+        )
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_submits_pages_in_order(self, importer: Importer, workers: int) -> None:
+        docs = [self.solr_doc(n) for n in range(5)]
+        cast(Mock, importer.solr_client.search).return_value = solr_page(docs, 5, "*")
+        importer.submission = SubmissionSettings(batch_docs=2, max_concurrent=1)
+
+        importer.reindex(page_size=2, workers=workers)
+
+        add = cast(Mock, importer.solr_client.add)
+        batches = [call.args[0] for call in add.call_args_list]
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+        assert [doc["id"] for batch in batches for doc in batch] == [
+            doc["id"] for doc in docs
+        ]
+
+    def test_errors_are_reported_and_skipped(
+        self, importer: Importer, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        docs = [self.solr_doc(0), {"ark_ssi": "bad", "title_tesim": ["Bad"]}]
+        cast(Mock, importer.solr_client.search).return_value = solr_page(docs, 2, "*")
+
+        importer.reindex()
+
+        add = cast(Mock, importer.solr_client.add)
+        assert [doc["id"] for doc in add.call_args.args[0]] == [docs[0]["id"]]
+        assert "1 records could not be reindexed" in capsys.readouterr().out
+
+    def test_max_errors_saves_earlier_records(self, importer: Importer) -> None:
+        docs = [self.solr_doc(0), {"ark_ssi": "bad", "title_tesim": ["Bad"]}]
+        cast(Mock, importer.solr_client.search).return_value = solr_page(docs, 2, "*")
+
+        with pytest.raises(click.ClickException, match="Reindex cancelled"):
+            importer.reindex(max_errors=1)
+
+        add = cast(Mock, importer.solr_client.add)
+        assert [doc["id"] for doc in add.call_args.args[0]] == [docs[0]["id"]]
+
+    def test_dry_run(self, importer: Importer) -> None:
+        cast(Mock, importer.solr_client.search).return_value = solr_page(
+            [self.solr_doc(0)], 1, "*"
+        )
+        importer.reindex(dry_run=True)
+        cast(Mock, importer.solr_client.add).assert_not_called()
+
+    def test_resume_after_failure(
+        self, importer: Importer, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        importer.cache_dir = tmp_path
+        importer.submission = SubmissionSettings(batch_docs=2, max_concurrent=1)
+        docs = [self.solr_doc(n) for n in range(5)]
+        search = cast(Mock, importer.solr_client.search)
+        search.return_value = solr_page(docs, 5, "*")
+        add = cast(Mock, importer.solr_client.add)
+        add.side_effect = [None, requests.ConnectionError()]
+
+        with pytest.raises(requests.ConnectionError):
+            importer.reindex()
+        assert "--resume" in capsys.readouterr().err
+
+        add.side_effect = None
+        add.reset_mock()
+        search.return_value = solr_page(docs[2:], 3, "*")
+        importer.reindex(resume=True)
+
+        assert search.call_args.kwargs["fq"] == [
+            Importer.filter_after(docs[1]["ark_ssi"], docs[1]["id"])
+        ]
+        assert [doc["id"] for call in add.call_args_list for doc in call.args[0]] == [
+            doc["id"] for doc in docs[2:]
+        ]
+        assert not list(tmp_path.glob("checkpoints/*.json"))
+
+    def test_resume_without_checkpoint(self, importer: Importer, tmp_path: Path):
+        importer.cache_dir = tmp_path
+        with pytest.raises(click.ClickException, match="No checkpoint"):
+            importer.reindex(resume=True)
+
+    def test_resume_with_dry_run(self, importer: Importer, tmp_path: Path):
+        importer.cache_dir = tmp_path
+        with pytest.raises(click.UsageError, match="--dry-run"):
+            importer.reindex(resume=True, dry_run=True)
+
+    def stored_docs(self) -> list[dict]:
+        """Records as solr returns them: one that reindexing leaves unchanged but for
+        its timestamp, one with an outdated computed field, and one without a
+        _version_."""
+
+        docs = [{**self.solr_doc(n), "_version_": n + 1} for n in range(3)]
+        docs[0]["timestamp"] = "2020-01-01T00:00:00Z"
+        docs[1]["title_sim"] = ["Old title"]
+        del docs[2]["_version_"]
+        return docs
+
+    @pytest.mark.real_clock
+    def test_atomic_updates(
+        self, importer: Importer, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        docs = self.stored_docs()
+        cast(Mock, importer.solr_client.search).return_value = solr_page(docs, 3, "*")
+
+        importer.reindex()
+
+        add = cast(Mock, importer.solr_client.add)
+        update_call, replace_call = add.call_args_list
+        [update] = update_call.args[0]
+        assert update.keys() == {"id", "_version_", "title_sim", "timestamp"}
+        assert (update["id"], update["_version_"]) == (docs[1]["id"], 2)
+        assert update["title_sim"] == ["Title 1"]
+        assert update_call.kwargs["fieldUpdates"] == {
+            "title_sim": "set",
+            "timestamp": "set",
+        }
+        assert [doc["id"] for doc in replace_call.args[0]] == [docs[2]["id"]]
+        assert "fieldUpdates" not in replace_call.kwargs
+        assert "1 records were unchanged" in capsys.readouterr().out
+
+    def test_rejected_atomic_update_replaces_record(self, importer: Importer) -> None:
+        docs = self.stored_docs()
+        cast(Mock, importer.solr_client.search).return_value = solr_page(docs, 3, "*")
+
+        def add(batch: list[dict], **kwargs) -> None:
+            if "fieldUpdates" in kwargs:
+                raise SolrError("Solr responded with an error (HTTP 400): bad update")
+
+        cast(Mock, importer.solr_client.add).side_effect = add
+
+        importer.reindex()
+
+        replace_call = cast(Mock, importer.solr_client.add).call_args
+        assert [doc["id"] for doc in replace_call.args[0]] == [
+            docs[2]["id"],
+            docs[1]["id"],
+        ]
+        assert replace_call.args[0][1]["title_sim"] == ["Title 1"]
+
+    @staticmethod
+    def conflicting_add(batch: list[dict], **kwargs) -> None:
+        if "fieldUpdates" in kwargs and batch[0]["_version_"] == 2:
+            raise SolrError("Solr responded with an error (HTTP 409): version conflict")
+
+    def test_version_conflict_updates_current_record(
+        self, importer: Importer, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        docs = self.stored_docs()
+        cast(Mock, importer.solr_client.search).return_value = solr_page(docs, 3, "*")
+        add = cast(Mock, importer.solr_client.add)
+        add.side_effect = self.conflicting_add
+        current = {**docs[1], "_version_": 5, "description_tesim": ["Edited"]}
+        monkeypatch.setattr(
+            feed_ursus.importer.HttpClient,
+            "get",
+            lambda *args, **kwargs: fixtures.MockResponse(
+                200, {"response": {"docs": [current]}}
+            ),
+        )
+
+        importer.reindex()
+
+        retried = add.call_args_list[1]
+        assert retried.args[0] == [
+            {"id": docs[1]["id"], "_version_": 5, "title_sim": ["Title 1"]}
+        ]
+        assert all(
+            "description_tesim" not in doc
+            for call in add.call_args_list
+            for doc in call.args[0]
+        )
+
+    def test_version_conflict_with_deleted_record(
+        self,
+        importer: Importer,
+        monkeypatch: pytest.MonkeyPatch,
+        capsys: pytest.CaptureFixture[str],
+    ) -> None:
+        docs = self.stored_docs()
+        cast(Mock, importer.solr_client.search).return_value = solr_page(docs, 3, "*")
+        add = cast(Mock, importer.solr_client.add)
+        add.side_effect = self.conflicting_add
+        monkeypatch.setattr(
+            feed_ursus.importer.HttpClient,
+            "get",
+            lambda *args, **kwargs: fixtures.MockResponse(
+                200, {"response": {"docs": []}}
+            ),
+        )
+
+        importer.reindex()
+
+        assert [doc["id"] for call in add.call_args_list for doc in call.args[0]] == [
+            docs[1]["id"],  # the rejected update
+            docs[2]["id"],
+        ]
+        out = capsys.readouterr().out
+        assert "Deleted from solr while being reindexed" in out
+        assert "1 records changed in solr while being reindexed" in out
+
+    def test_unchanged_record_is_stamped_with_version(
+        self, importer: Importer, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        """so that reindex --incremental doesn't pick it again"""
+
+        doc = {**self.solr_doc(0), "_version_": 1, "feed_ursus_version_ssi": "0.0.1"}
+        cast(Mock, importer.solr_client.search).return_value = solr_page([doc], 1, "*")
+
+        importer.reindex()
+
+        add = cast(Mock, importer.solr_client.add)
+        assert add.call_args.args[0] == [
+            {
+                "id": doc["id"],
+                "_version_": 1,
+                "feed_ursus_version_ssi": importlib.metadata.version("feed_ursus"),
+            }
+        ]
+        assert "1 records were unchanged" in capsys.readouterr().out
+
+    def test_rejected_batch_does_not_resend_applied_updates(
+        self,
+        importer: Importer,
+        monkeypatch: pytest.MonkeyPatch,
+        capsys: pytest.CaptureFixture[str],
+    ) -> None:
+        """solr applies the updates before the one it rejects, so only the rest are
+        sent again"""
+
+        docs = [
+            {**self.solr_doc(n), "_version_": n + 1, "title_sim": ["Old title"]}
+            for n in range(3)
+        ]
+        cast(Mock, importer.solr_client.search).return_value = solr_page(
+            [dict(doc) for doc in docs], 3, "*"
+        )
+        stored = {doc["id"]: dict(doc) for doc in docs}
+        stored[docs[2]["id"]]["_version_"] = 33  # changed since it was read
+
+        def add(batch: list[dict], **kwargs) -> None:
+            for n, doc in enumerate(batch):
+                record = stored[doc["id"]]
+                if doc["_version_"] != record["_version_"]:
+                    raise SolrError(
+                        "Solr responded with an error (HTTP 409): version conflict"
+                    )
+                record.update(doc)
+                record["_version_"] = 100 + n
+
+        def get(_self, url: str, params: dict, **kwargs) -> fixtures.MockResponse:
+            found = [stored[id] for id in params["ids"].split(",")]
+            return fixtures.MockResponse(200, {"response": {"docs": found}})
+
+        add_mock = cast(Mock, importer.solr_client.add)
+        add_mock.side_effect = add
+        monkeypatch.setattr(feed_ursus.importer.HttpClient, "get", get)
+
+        importer.reindex()
+
+        sent = [
+            [(doc["id"], doc["_version_"]) for doc in call.args[0]]
+            for call in add_mock.call_args_list
+        ]
+        assert sent == [
+            [(doc["id"], doc["_version_"]) for doc in docs],
+            [(docs[2]["id"], 3)],
+            [(docs[2]["id"], 33)],  # worked out again from the current record
+        ]
+        assert "changed in solr" not in capsys.readouterr().out
+
+    def test_full_updates(self, importer: Importer) -> None:
+        docs = self.stored_docs()
+        cast(Mock, importer.solr_client.search).return_value = solr_page(docs, 3, "*")
+
+        importer.reindex(atomic=False)
+
+        add = cast(Mock, importer.solr_client.add)
+        assert [doc["id"] for doc in add.call_args.args[0]] == [
+            doc["id"] for doc in docs
+        ]
+        assert "fieldUpdates" not in add.call_args.kwargs
+
+    @staticmethod
+    def version_facets(*versions: str) -> Mock:
+        facets = Mock()
+        facets.facets = {
+            "facet_fields": {
+                "feed_ursus_version_ssi": [
+                    v for version in versions for v in (version, 1)
+                ]
+            }
+        }
+        return facets
+
+    def test_filter_outdated(self, importer: Importer) -> None:
+        current = importlib.metadata.version("feed_ursus")
+        cast(Mock, importer.solr_client.search).return_value = self.version_facets(
+            "0.0.1", current, "99.0", "not a version"
+        )
+
+        assert importer.filter_outdated("*:*", datetime(2026, 1, 1)) == (
+            "(*:* -feed_ursus_version_ssi:*)"
+            ' OR feed_ursus_version_ssi:"0.0.1"'
+            ' OR feed_ursus_version_ssi:"not a version"'
+            " OR system_modified_dtsi:[* TO 2026-01-01T00:00:00Z}"
+        )
+
+    def test_incremental(
+        self, importer: Importer, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        docs = [self.solr_doc(n) for n in range(2)]
+        search = cast(Mock, importer.solr_client.search)
+        search.side_effect = [
+            self.version_facets("0.0.1"),
+            solr_page([], 5, "*"),  # total
+            solr_page([], 2, "*"),  # outdated
+            solr_page(docs, 2, "AoE1"),
+            solr_page([], 2, "AoE1"),
+        ]
+
+        importer.reindex(incremental=True)
+
+        outdated = '(*:* -feed_ursus_version_ssi:*) OR feed_ursus_version_ssi:"0.0.1"'
+        assert search.call_args.kwargs["fq"] == [outdated]
+        assert "Skipping 3 of 5 records" in capsys.readouterr().out
+        added = cast(Mock, importer.solr_client.add).call_args.args[0]
+        assert [doc["id"] for doc in added] == [doc["id"] for doc in docs]
+        assert all(
+            doc["feed_ursus_version_ssi"] == importlib.metadata.version("feed_ursus")
+            for doc in added
+        )
+
+    def test_modified_before_needs_incremental(self, importer: Importer) -> None:
+        with pytest.raises(click.UsageError, match="--incremental"):
+            importer.reindex(modified_before=datetime(2024, 1, 1))
+
+        cast(Mock, importer.solr_client.search).assert_not_called()
+
+
+class TestDelete:
+    @pytest.fixture
+    def stored(self) -> dict[str, dict]:
+        records = [
+            {"id": f"{n}z-89112", "has_model_ssim": ["Work"]} for n in range(5)
+        ] + [
+            {
+                "id": f"{n}c-89112",
+                "has_model_ssim": ["Collection"],
+                "title_tesim": [f"Collection {n}"],
+            }
+            for n in range(3)
+        ]
+        return {record["id"]: record for record in records}
+
+    @pytest.fixture
+    def posts(
+        self, monkeypatch: pytest.MonkeyPatch, stored: dict[str, dict]
+    ) -> list[dict]:
+        posts: list[dict] = []
+
+        def post(_self, url: str, data: dict, **kwargs) -> fixtures.MockResponse:
+            posts.append(data)
+            docs = [stored[id] for id in data["ids"].split(",") if id in stored]
+            return fixtures.MockResponse(200, {"response": {"docs": docs}})
+
+        monkeypatch.setattr(feed_ursus.importer.HttpClient, "post", post)
+        return posts
+
+    @staticmethod
+    def search(query: str, **kwargs) -> Mock:
+        results = solr_page([], 100, "*")
+        results.facets = {
+            "facet_fields": {"member_of_collection_ids_ssim": ["0c-89112", 4, "x", 9]}
+        }
+        return results
+
+    def test_delete_in_chunks(
+        self,
+        importer: Importer,
+        posts: list[dict],
+        tmp_path: Path,
+        capsys: pytest.CaptureFixture[str],
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        csv_path = tmp_path / "delete.csv"
+        csv_path.write_text(
+            "Item ARK\n" + "".join(f"ark:/21198/z{n}\n" for n in range(4))
+        )
+        monkeypatch.setattr(Importer, "DELETE_CHUNK", 2)
+        monkeypatch.setattr(Importer, "DELETE_COLLECTIONS_CHUNK", 2)
+        search = cast(Mock, importer.solr_client.search)
+        search.side_effect = self.search
+
+        importer.delete(
+            [
+                str(csv_path),
+                "4z-89112",
+                "ark:/21198/c0",
+                "1c-89112",
+                "2c-89112",
+                "gone",
+            ],
+            yes=True,
+        )
+
+        assert [data["ids"].split(",") for data in posts] == [
+            ["0z-89112", "1z-89112"],
+            ["2z-89112", "3z-89112"],
+            ["4z-89112", "0c-89112"],
+            ["1c-89112", "2c-89112"],
+            ["gone"],
+        ]
+        assert "1 item was not found" in capsys.readouterr().out
+
+        facet_call = search.call_args
+        assert facet_call.kwargs["fq"] == (
+            "{!terms f=member_of_collection_ids_ssim}0c-89112,1c-89112,2c-89112"
+        )
+
+        delete_calls = cast(Mock, importer.solr_client.delete).call_args_list
+        assert [call.kwargs.get("id") for call in delete_calls[:3]] == [
+            ["0z-89112", "1z-89112"],
+            ["2z-89112", "3z-89112"],
+            ["4z-89112"],
+        ]
+        assert [call.kwargs.get("q") for call in delete_calls[3:]] == [
+            'id:("0c-89112" OR "1c-89112") OR '
+            'member_of_collection_ids_ssim:("0c-89112" OR "1c-89112")',
+            'id:("2c-89112") OR member_of_collection_ids_ssim:("2c-89112")',
+        ]
+
+    def test_confirms_with_child_counts(
+        self,
+        importer: Importer,
+        posts: list[dict],
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        cast(Mock, importer.solr_client.search).side_effect = self.search
+        prompts: list[str] = []
+        monkeypatch.setattr(
+            click,
+            "confirm",
+            lambda text: prompts.append(text) or "Collection 1" in text,
+        )
+
+        importer.delete(["0c-89112", "1c-89112"], yes=False)
+
+        assert prompts == [
+            "Delete collection Collection 0? 4 child records will also be deleted.",
+            "Delete collection Collection 1? 0 child records will also be deleted.",
+        ]
+        assert cast(Mock, importer.solr_client.delete).call_args.kwargs["q"] == (
+            'id:("1c-89112") OR member_of_collection_ids_ssim:("1c-89112")'
+        )
+
+    def test_reads_items_from_stdin(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr("sys.stdin", io.StringIO("ark:/21198/z1\n\n1c-89112\n"))
+
+        assert list(Importer.iterate_delete_ids(["0z-89112", "-"])) == [
+            "0z-89112",
+            "1z-89112",
+            "1c-89112",
+        ]
+
+
+class TestTitlesFromSolr:
+    @pytest.fixture
+    def collections(self) -> list[dict]:
+        return [
+            {"ark_ssi": f"ark:/21198/c{n}", "title_tesim": [f"Collection {n}"]}
+            for n in range(3)
+        ]
+
+    def make_importer(self, cache_dir: Path | None = None) -> Importer:
+        importer = Importer(solr_url="http://mock.url/solr/core", cache_dir=cache_dir)
+        importer.solr_client = Mock(Solr)
+        return importer
+
+    def mock_index_version(self, monkeypatch: pytest.MonkeyPatch, version: int) -> None:
+        monkeypatch.setattr(
+            feed_ursus.importer.HttpClient,
+            "get",
+            lambda *args, **kwargs: fixtures.MockResponse(
+                200, {"index": {"version": version}}
+            ),
+        )
+
+    def test_not_loaded_until_needed(self) -> None:
+        importer = self.make_importer()
+        cast(Mock, importer.solr_client.search).assert_not_called()
+
+    def test_pages_through_all_collections(
+        self, monkeypatch: pytest.MonkeyPatch, collections: list[dict]
+    ) -> None:
+        self.mock_index_version(monkeypatch, 1)
+        importer = self.make_importer()
+        search = cast(Mock, importer.solr_client.search)
+        search.side_effect = [
+            solr_page(collections[:2], 3, "AoE1"),
+            solr_page(collections[2:], 3, "AoE2"),
+            solr_page([], 3, "AoE2"),
+        ]
+
+        assert importer.titles == {
+            "ark:/21198/c0": "Collection 0",
+            "ark:/21198/c1": "Collection 1",
+            "ark:/21198/c2": "Collection 2",
+        }
+        assert [call.kwargs["cursorMark"] for call in search.call_args_list] == [
+            "*",
+            "AoE1",
+            "AoE2",
+        ]
+        assert search.call_args.kwargs["fl"] == "ark_ssi,title_tesim"
+
+    def test_cached_while_index_unchanged(
+        self, monkeypatch: pytest.MonkeyPatch, collections: list[dict], tmp_path: Path
+    ) -> None:
+        self.mock_index_version(monkeypatch, 1)
+        first = self.make_importer(cache_dir=tmp_path)
+        cast(Mock, first.solr_client.search).return_value = solr_page(
+            collections, 3, "*"
+        )
+        assert len(first.titles) == 3
+
+        second = self.make_importer(cache_dir=tmp_path)
+        assert second.titles == first.titles
+        cast(Mock, second.solr_client.search).assert_not_called()
+
+        self.mock_index_version(monkeypatch, 2)
+        third = self.make_importer(cache_dir=tmp_path)
+        cast(Mock, third.solr_client.search).return_value = solr_page(
+            collections[:1], 1, "*"
+        )
+        assert third.titles == {"ark:/21198/c0": "Collection 0"}
+
+
+def mock_dump_search(importer: Importer, docs: list[dict[str, str]]) -> None:
+    page = Mock(hits=len(docs), docs=docs, nextCursorMark="*")
+    page.__iter__ = Mock(return_value=iter(docs))
+    cast(Mock, importer.solr_client).search.side_effect = [page]
 
 
 def test_dump(importer: Importer) -> None:
@@ -233,12 +1172,7 @@ def test_dump(importer: Importer) -> None:
             {"ark_ssi": "ark:/21198/1", "title_tesim": ["Title 1"]},
             {"ark_ssi": "ark:/21198/2", "title_tesim": ["Title 2"]},
         ]
-        mock_result = Mock()
-        mock_result.__iter__ = Mock(return_value=iter(mock_docs))
-        cast(Mock, importer.solr_client).search.side_effect = [
-            Mock(hits=2),  # First call for total hits
-            mock_result,  # Second call for docs
-        ]
+        mock_dump_search(importer, mock_docs)
 
         importer.dump(filename_prefix=filename_prefix, batch_size=10000)
 
@@ -250,6 +1184,58 @@ def test_dump(importer: Importer) -> None:
             == '{"ark_ssi": "ark:/21198/1", "title_tesim": ["Title 1"]}\n{"ark_ssi": "ark:/21198/2", "title_tesim": ["Title 2"]}\n'
         )
 
+        # the whole index is fetched with cursorMark
+        assert (
+            cast(Mock, importer.solr_client).search.call_args.kwargs["cursorMark"]
+            == "*"
+        )
+
+
+def test_dump_compressed_shards_and_manifest(importer: Importer) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filename_prefix = str(Path(tmpdir) / "dump")
+        mock_docs = [{"ark_ssi": f"ark:/21198/{n}"} for n in range(5)]
+        mock_dump_search(importer, mock_docs)
+
+        importer.dump(
+            filename_prefix=filename_prefix,
+            batch_size=2,
+            compression=Compression.GZIP,
+            workers=2,
+        )
+
+        manifest = json.loads(Path(f"{filename_prefix}.manifest.json").read_text())
+        assert manifest["documents"] == 5
+        assert manifest["compression"] == "gzip"
+        assert [shard["filename"] for shard in manifest["shards"]] == [
+            "dump00001.jsonl.gz",
+            "dump00002.jsonl.gz",
+            "dump00003.jsonl.gz",
+        ]
+        assert [shard["documents"] for shard in manifest["shards"]] == [2, 2, 1]
+
+        lines = []
+        for shard in manifest["shards"]:
+            data = (Path(tmpdir) / shard["filename"]).read_bytes()
+            assert hashlib.sha256(data).hexdigest() == shard["sha256"]
+            lines += gzip.decompress(data).decode("utf-8").splitlines()
+        assert [json.loads(line) for line in lines] == mock_docs
+
+
+def test_dump_shard_names_sort_in_order(importer: Importer, tmp_path: Path) -> None:
+    """shard names have a fixed width, however many records turn up"""
+
+    filename_prefix = str(tmp_path / "dump")
+    mock_dump_search(importer, [{"ark_ssi": f"ark:/21198/{n}"} for n in range(11)])
+
+    importer.dump(filename_prefix=filename_prefix, batch_size=1)
+
+    manifest = json.loads(Path(f"{filename_prefix}.manifest.json").read_text())
+    filenames = [shard["filename"] for shard in manifest["shards"]]
+    assert filenames == sorted(f.name for f in tmp_path.glob("dump0*.jsonl"))
+    assert filenames[-2:] == ["dump00010.jsonl", "dump00011.jsonl"]
+    assert [shard["documents"] for shard in manifest["shards"]] == [1] * 11
+
 
 def test_load_dump_single_file(importer: Importer) -> None:
     with tempfile.TemporaryDirectory() as tmpdir:
@@ -279,6 +1265,7 @@ def test_load_dump_single_file(importer: Importer) -> None:
                 "discover_access_group_ssim": [],
                 "download_access_group_ssim": [],
                 "read_access_group_ssim": [],
+                "feed_ursus_version_ssi": importlib.metadata.version("feed_ursus"),
             },
             {
                 "ark_ssi": "ark:/21198/2",
@@ -292,10 +1279,103 @@ def test_load_dump_single_file(importer: Importer) -> None:
                 "discover_access_group_ssim": [],
                 "download_access_group_ssim": [],
                 "read_access_group_ssim": [],
+                "feed_ursus_version_ssi": importlib.metadata.version("feed_ursus"),
             },
         ]
 
 
+@pytest.mark.parametrize("workers", [1, 2])
+def test_load_dump_compressed_files(
+    importer: Importer, tmp_path: Path, workers: int
+) -> None:
+    for n, compression in enumerate([Compression.NONE, Compression.GZIP]):
+        (tmp_path / f"dump{n}.jsonl{compression.extension}").write_bytes(
+            compression.compress(
+                f'{{"ark_ssi": "ark:/21198/{n}", "title_tesim": ["Title {n}"]}}\n\n'.encode()
+            )
+        )
+    importer.submission = SubmissionSettings(batch_docs=1)
+
+    importer.load_dump(
+        sorted(str(path) for path in tmp_path.iterdir()), workers=workers
+    )
+
+    added = [
+        call.args[0] for call in cast(Mock, importer.solr_client).add.call_args_list
+    ]
+    assert [[doc["ark_ssi"] for doc in batch] for batch in added] == [
+        ["ark:/21198/0"],
+        ["ark:/21198/1"],
+    ]
+
+
+def test_load_dump_resume(importer: Importer, tmp_path: Path) -> None:
+    importer.cache_dir = tmp_path / "cache"
+    importer.submission = SubmissionSettings(batch_docs=1, max_concurrent=1)
+    filenames = []
+    for n in range(2):
+        dump_file = tmp_path / f"dump{n}.jsonl"
+        dump_file.write_text(
+            "".join(
+                f'{{"ark_ssi": "ark:/21198/{n}{line}", "title_tesim": ["T"]}}\n'
+                for line in range(2)
+            )
+        )
+        filenames.append(str(dump_file))
+
+    add = cast(Mock, importer.solr_client.add)
+    add.side_effect = [None, None, None, requests.ConnectionError()]
+    with pytest.raises(requests.ConnectionError):
+        importer.load_dump(filenames)
+
+    add.side_effect = None
+    add.reset_mock()
+    importer.load_dump(filenames, resume=True)
+
+    assert [call.args[0][0]["ark_ssi"] for call in add.call_args_list] == [
+        "ark:/21198/11"
+    ]
+
+
+def test_load_dump_skips_invalid_records(
+    importer: Importer, tmp_path: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    dump_file = tmp_path / "dump.jsonl"
+    dump_file.write_text(
+        '{"ark_ssi": "ark:/21198/1", "title_tesim": ["Title 1"]}\n'
+        '{"ark_ssi": "not an ark"}\n'
+    )
+
+    importer.load_dump([str(dump_file)])
+
+    added_records = cast(Mock, importer.solr_client).add.call_args[0][0]
+    assert [doc["ark_ssi"] for doc in added_records] == ["ark:/21198/1"]
+    assert "Could not import" in caplog.text
+
+
+def test_load_dump_skips_corrupt_lines(
+    importer: Importer, tmp_path: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    """a truncated line is reported like an invalid record, and the load carries on"""
+
+    dump_file = tmp_path / "dump.jsonl"
+    dump_file.write_text(
+        '{"ark_ssi": "ark:/21198/1", "title_tesim": ["Title 1"]}\n'
+        '{"ark_ssi": "ark:/21198/2", "title_tes\n'
+        '{"ark_ssi": "ark:/21198/3", "title_tesim": ["Title 3"]}\n'
+    )
+
+    importer.load_dump([str(dump_file)], workers=2)
+
+    added_records = cast(Mock, importer.solr_client).add.call_args[0][0]
+    assert [doc["ark_ssi"] for doc in added_records] == [
+        "ark:/21198/1",
+        "ark:/21198/3",
+    ]
+    assert 'Could not import \'{"ark_ssi": "ark:/21198/2"' in caplog.text
+    assert "1 records could not be loaded" in caplog.text
+
+
 class TestGetTitles:
     """Tests for Importer.get_titles"""
 
@@ -334,7 +1414,7 @@ class TestGetTitles:
                 }
 
         monkeypatch.setattr(
-            feed_ursus.importer.requests, "get", lambda *args, **kwargs: FakeResponse()
+            importer.http, "get", lambda *args, **kwargs: FakeResponse()
         )
 
         result = importer.get_titles(
@@ -353,10 +1433,103 @@ class TestGetTitles:
                 return {"response": {"docs": []}}
 
         monkeypatch.setattr(
-            feed_ursus.importer.requests, "get", lambda *args, **kwargs: FakeResponse()
+            importer.http, "get", lambda *args, **kwargs: FakeResponse()
         )
 
         with pytest.raises(UnknownItemError):
             importer.get_titles(
                 {"Parent ARK": "ark:/21198/one|~|ark:/21198/two"}, "Parent ARK"
             )
+
+    def test_known_missing_titles_are_not_requested_again(
+        self, importer: Importer, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        class FakeResponse:
+            def json(self):
+                return {"response": {"docs": []}}
+
+        get = Mock(return_value=FakeResponse())
+        monkeypatch.setattr(importer.http, "get", get)
+
+        for _ in range(2):
+            with pytest.raises(UnknownItemError):
+                importer.get_titles({"Parent ARK": "ark:/21198/two"}, "Parent ARK")
+
+        get.assert_called_once()
+
+
+class TestPrefetchTitles:
+    def test_load_csv_prefetches_titles_in_chunks(
+        self,
+        importer: Importer,
+        monkeypatch: pytest.MonkeyPatch,
+        tmp_path: Path,
+    ) -> None:
+        csv_file = tmp_path / "works.csv"
+        csv_file.write_text(
+            "Item ARK,Title,Parent ARK,Related Records\n"
+            + "".join(
+                f"ark:/21198/w{n},Work {n},ark:/21198/c{n % 3},ark:/21198/w{n + 1}\n"
+                for n in range(10)
+            ),
+            encoding="utf-8",
+        )
+
+        requested_ids: list[list[str]] = []
+
+        class FakeResponse:
+            def __init__(self, ids: list[str]):
+                self.ids = ids
+
+            def json(self):
+                return {
+                    "response": {
+                        "docs": [
+                            {
+                                "ark_ssi": f"ark:/21198/{id.split('-')[0][::-1]}",
+                                "title_tesim": [f"Title of {id}"],
+                            }
+                            for id in self.ids
+                        ]
+                    }
+                }
+
+        def get(url: str, **kwargs):
+            ids = url.split("ids=")[1].split("&")[0].split(",")
+            requested_ids.append(ids)
+            return FakeResponse(ids)
+
+        monkeypatch.setattr(importer.http, "get", get)
+        monkeypatch.setattr(Importer, "TITLE_FETCH_CHUNK", 2)
+
+        importer.load_csv(filenames=[str(csv_file)], batch=True)
+
+        # three collections + one related work that isn't in the csv, 2 per request
+        assert sorted(id for ids in requested_ids for id in ids) == sorted(
+            ["0c-89112", "1c-89112", "2c-89112", "01w-89112"]
+        )
+        assert [len(ids) for ids in requested_ids] == [2, 2]
+
+        added = cast(Mock, importer.solr_client.add).call_args.args[0]
+        assert len(added) == 11
+        assert added[1]["member_of_collections_ssim"] == ["Title of 0c-89112"]
+
+
+def test_import_does_not_build_record_models() -> None:
+    code = (
+        "import sys, feed_ursus.feed_ursus, feed_ursus.importer; "
+        "print(sorted({'feed_ursus.ursus_solr_record', 'deepdiff'} & set(sys.modules)))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "[]"
+
+
+def test_content_hash_ignores_volatile_fields() -> None:
+    doc = {"id": "1", "title_tesim": ["A"], "timestamp": "2026-01-01T00:00:00Z"}
+
+    assert content_hash(doc) == content_hash(
+        {**doc, "timestamp": "2026-01-02T00:00:00Z", "ingest_id_ssi": "another"}
+    )
+    assert content_hash(doc) != content_hash({**doc, "title_tesim": ["B"]})
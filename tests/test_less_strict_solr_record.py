@@ -3,6 +3,7 @@
 import pytest
 from pydantic import ValidationError
 
+from feed_ursus import less_strict_solr_record
 from feed_ursus.less_strict_solr_record import LessStrictSolrRecord
 from feed_ursus.ursus_solr_record import UrsusSolrRecord
 
@@ -86,3 +87,12 @@ def test_related_record_mismatch(minimal_solr_record):
 
     assert result["related_record_ssm"] == ["ARK:/21198/zz002jgs66"]
     assert "human_readable_related_record_title_ssm" not in result
+
+
+def test_model_is_built_once():
+    assert (
+        less_strict_solr_record.LessStrictSolrRecord
+        is less_strict_solr_record.LessStrictSolrRecord
+    )
+    with pytest.raises(AttributeError):
+        less_strict_solr_record.NoSuchModel
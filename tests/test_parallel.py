@@ -0,0 +1,105 @@
+"""Tests for parallel.py"""
+
+import threading
+from collections.abc import Iterator
+
+import pytest
+
+from feed_ursus.parallel import BackgroundWriter, ordered_map, prefetch
+
+
+def square(n: int) -> int:
+    return n * n
+
+
+held_lock = threading.Lock()
+
+
+def lock_is_free(_n: int) -> bool:
+    if held_lock.acquire(timeout=1):
+        held_lock.release()
+        return True
+    return False
+
+
+class TestOrderedMap:
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_results_in_input_order(self, workers: int) -> None:
+        assert list(ordered_map(square, range(50), workers=workers, chunksize=3)) == [
+            n * n for n in range(50)
+        ]
+
+    def test_workers_are_not_forked(self) -> None:
+        # a forked worker would inherit the lock in its held state
+        with held_lock:
+            assert all(ordered_map(lock_is_free, range(4), workers=2, chunksize=1))
+
+
+class TestPrefetch:
+    def test_yields_all_items_in_order(self) -> None:
+        assert list(prefetch(range(100), depth=7)) == list(range(100))
+
+    def test_reads_in_background_thread(self) -> None:
+        threads: list[threading.Thread] = []
+
+        def items() -> Iterator[int]:
+            for n in range(3):
+                threads.append(threading.current_thread())
+                yield n
+
+        assert list(prefetch(items())) == [0, 1, 2]
+        assert threading.current_thread() not in threads
+
+    def test_reraises_errors(self) -> None:
+        def items() -> Iterator[int]:
+            yield 1
+            raise ValueError("boom")
+
+        consumed: list[int] = []
+        with pytest.raises(ValueError, match="boom"):
+            for item in prefetch(items()):
+                consumed.append(item)
+        assert consumed == [1]
+
+    def test_stops_producer_when_consumer_stops(self) -> None:
+        closed = threading.Event()
+
+        def items() -> Iterator[int]:
+            try:
+                n = 0
+                while True:
+                    yield n
+                    n += 1
+            finally:
+                closed.set()
+
+        iterator = prefetch(items(), depth=2)
+        assert next(iterator) == 0
+        iterator.close()
+        assert closed.is_set()
+
+
+class TestBackgroundWriter:
+    def test_writes_everything_in_order(self) -> None:
+        written: list[int] = []
+        with BackgroundWriter[int](written.append, max_pending=1) as writer:
+            for n in range(20):
+                writer.submit(n)
+        assert written == list(range(20))
+
+    def test_writes_in_background_thread(self) -> None:
+        threads: list[threading.Thread] = []
+        with BackgroundWriter[int](
+            lambda _: threads.append(threading.current_thread())
+        ) as writer:
+            writer.submit(1)
+        assert threads and threading.current_thread() not in threads
+
+    def test_reraises_write_errors(self) -> None:
+        def fail(_: int) -> None:
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError, match="boom"):
+            with BackgroundWriter[int](fail) as writer:
+                for n in range(10):
+                    writer.submit(n)
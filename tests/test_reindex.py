@@ -6,10 +6,14 @@ from typing import Any
 
 import pytest
 
+import feed_ursus.reindex
 from feed_ursus.reindex import (
+    atomic_update,
     get_record_diff,
+    is_unchanged,
     normalize_record,
     normalize_value,
+    reindex_record,
 )
 
 
@@ -84,6 +88,142 @@ def test_get_record_diff(_summary, r1, r2, is_different):
     assert bool(result) == is_different
 
 
+@pytest.mark.parametrize(
+    ("r1", "r2", "is_different"),
+    [
+        ({"a": [2, 2]}, {"a": [2]}, False),
+        ({"a": [1]}, {"a": [1.0]}, True),
+        ({"a": [True]}, {"a": [1]}, True),
+        ({"a": "x"}, {"a": ["x"]}, True),
+    ],
+)
+def test_get_record_diff_agrees_with_deepdiff(r1, r2, is_different):
+    result = get_record_diff(r1, r2)
+    assert bool(result) == is_different
+
+
+def test_get_record_diff_skips_deepdiff_without_changes(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    def deepdiff(*args, **kwargs):
+        raise AssertionError("DeepDiff shouldn't run")
+
+    monkeypatch.setattr(feed_ursus.reindex, "DeepDiff", deepdiff)
+    assert get_record_diff({"a": 1, "b": ["x", "y"]}, {"a": 1, "b": ["y", "x"]}) is None
+
+
+def test_reindex_record_leaves_record_unchanged():
+    record = {
+        "ark_ssi": "ark:/21198/z1",
+        "title_tesim": ["Title"],
+        "local_identifier_ssm": ["a", "a"],
+        "read_access_group_ssim": ["public", "registered"],
+        "_version_": 1,
+    }
+    original = {
+        key: list(value) if isinstance(value, list) else value
+        for key, value in record.items()
+    }
+
+    reindex_record(record)
+
+    assert record == original
+
+
+class TestAtomicUpdate:
+    original = {
+        "id": "1-89112",
+        "_version_": 7,
+        "ark_ssi": "ark:/21198/1",
+        "description_tesim": ["A long description " * 20],
+        "year_isim": [1901],
+        "score": 1.0,
+    }
+
+    def test_changed_fields(self):
+        reindexed = {
+            "id": "1-89112",
+            "ark_ssi": "ark:/21198/1",
+            "description_tesim": ["A long description " * 20],
+            "year_isim": [1902],
+            "title_sim": ["Title"],  # not stored, so not in the original
+        }
+
+        assert atomic_update(self.original, reindexed) == {
+            "id": "1-89112",
+            "_version_": 7,
+            "year_isim": [1902],
+            "title_sim": ["Title"],
+            "score": None,
+        }
+
+    def test_unchanged(self):
+        reindexed = {
+            key: value for key, value in self.original.items() if key != "_version_"
+        }
+
+        assert atomic_update(self.original, reindexed) == {
+            "id": "1-89112",
+            "_version_": 7,
+        }
+
+    def test_timestamp_and_version_alone_are_not_changes(self):
+        reindexed = {
+            **self.original,
+            "timestamp": "2026-10-17T12:00:00Z",
+            "feed_ursus_version_ssi": "2.0",
+        }
+        del reindexed["_version_"]
+        original = {**self.original, "timestamp": "2020-01-01T00:00:00Z"}
+
+        assert atomic_update(original, reindexed) == {
+            "id": "1-89112",
+            "_version_": 7,
+            "feed_ursus_version_ssi": "2.0",
+        }
+
+    def test_unstored_fields_change_with_version(self):
+        original = {**self.original, "feed_ursus_version_ssi": "1.0"}
+        reindexed = {
+            **{key: value for key, value in original.items() if key != "_version_"},
+            "title_sim": ["Title"],  # not stored
+        }
+
+        assert atomic_update(original, reindexed) == {"id": "1-89112", "_version_": 7}
+        reindexed["feed_ursus_version_ssi"] = "2.0"
+        assert atomic_update(original, reindexed) == {
+            "id": "1-89112",
+            "_version_": 7,
+            "title_sim": ["Title"],
+            "feed_ursus_version_ssi": "2.0",
+        }
+
+    @pytest.mark.parametrize(
+        ("update", "expected"),
+        [
+            ({"id": "1", "_version_": 7}, True),
+            ({"id": "1", "_version_": 7, "feed_ursus_version_ssi": "2.0"}, True),
+            ({"id": "1", "_version_": 7, "year_isim": [1902]}, False),
+        ],
+    )
+    def test_is_unchanged(self, update, expected):
+        assert is_unchanged(update) is expected
+
+    @pytest.mark.parametrize(
+        ("original", "reindexed"),
+        [
+            ({"id": "1", "a": "x"}, {"id": "1", "a": "y"}),  # no _version_
+            ({"id": "1", "_version_": 7}, {"id": "2"}),  # different id
+            (
+                {"id": "1", "_version_": 7, "a": "x"},
+                {"id": "1", "a": "y"},
+            ),  # no smaller
+        ],
+    )
+    def test_replace_instead(self, original, reindexed):
+        assert atomic_update(original, reindexed) is None
+
+
 @pytest.mark.parametrize(
     ("value", "expected"),
     [
@@ -0,0 +1,268 @@
+# pyright: standard
+
+"""Tests for submission.py"""
+
+import json
+from typing import cast
+from unittest.mock import Mock
+
+import click
+import pytest
+import requests
+from click.testing import CliRunner
+from pysolr import Solr, SolrError  # type: ignore
+from requests.adapters import HTTPAdapter
+
+from feed_ursus.http_client import HttpClient
+from feed_ursus.submission import (
+    CommitMode,
+    CommitPolicy,
+    SubmissionSettings,
+    add_bisecting,
+    commit_options,
+    estimated_size,
+    submission_options,
+)
+
+
+@pytest.mark.parametrize(
+    ("policy", "params", "add_kwargs", "delete_kwargs"),
+    [
+        (
+            CommitPolicy(),
+            {"commit": "true"},
+            {"commit": True},
+            {"commit": True},
+        ),
+        (
+            CommitPolicy(CommitMode.SOFT),
+            {"softCommit": "true"},
+            {"commit": False, "softCommit": True},
+            {"commit": False, "softCommit": True},
+        ),
+        (
+            CommitPolicy(CommitMode.WITHIN, 5000),
+            {"commitWithin": "5000"},
+            {"commit": False, "commitWithin": 5000},
+            {"commit": False, "softCommit": True},
+        ),
+        (
+            CommitPolicy(CommitMode.FINAL),
+            {},
+            {"commit": False},
+            {"commit": False},
+        ),
+    ],
+)
+def test_commit_policy(
+    policy: CommitPolicy,
+    params: dict,
+    add_kwargs: dict,
+    delete_kwargs: dict,
+) -> None:
+    assert policy.update_params() == params
+    assert policy.add_kwargs() == add_kwargs
+    assert policy.delete_kwargs() == delete_kwargs
+
+
+@pytest.mark.parametrize(
+    ("mode", "commits"),
+    [
+        (CommitMode.HARD, 0),
+        (CommitMode.SOFT, 0),
+        (CommitMode.WITHIN, 0),
+        (CommitMode.FINAL, 1),
+    ],
+)
+def test_finish(mode: CommitMode, commits: int) -> None:
+    solr = Mock(Solr)
+    CommitPolicy(mode).finish(solr)
+    assert solr.commit.call_count == commits
+
+
+class TestCommitOptions:
+    @pytest.fixture
+    def command(self) -> tuple[click.Command, list[CommitPolicy]]:
+        received: list[CommitPolicy] = []
+
+        @click.command()
+        @commit_options
+        def command(commit_policy: CommitPolicy) -> None:
+            received.append(commit_policy)
+
+        return command, received
+
+    def test_default(self, command: tuple[click.Command, list[CommitPolicy]]) -> None:
+        cmd, received = command
+        result = CliRunner().invoke(cmd, [])
+        assert result.exit_code == 0, result.output
+        assert received == [CommitPolicy()]
+
+    def test_within(self, command: tuple[click.Command, list[CommitPolicy]]) -> None:
+        cmd, received = command
+        result = CliRunner().invoke(
+            cmd, ["--commit", "within", "--commit-within", "2500"]
+        )
+        assert result.exit_code == 0, result.output
+        assert received == [CommitPolicy(CommitMode.WITHIN, 2500)]
+
+
+class TestSubmissionOptions:
+    @pytest.fixture
+    def command(self) -> tuple[click.Command, list[SubmissionSettings]]:
+        received: list[SubmissionSettings] = []
+
+        @click.command()
+        @submission_options
+        def command(submission: SubmissionSettings) -> None:
+            received.append(submission)
+
+        return command, received
+
+    def test_default(
+        self, command: tuple[click.Command, list[SubmissionSettings]]
+    ) -> None:
+        cmd, received = command
+        result = CliRunner().invoke(cmd, [])
+        assert result.exit_code == 0, result.output
+        assert received == [SubmissionSettings()]
+
+    def test_retries_and_backoff(
+        self, command: tuple[click.Command, list[SubmissionSettings]]
+    ) -> None:
+        cmd, received = command
+        result = CliRunner().invoke(
+            cmd, ["--retries", "5"], env={"FEED_URSUS_BACKOFF": "2.5"}
+        )
+        assert result.exit_code == 0, result.output
+        assert received == [SubmissionSettings(retries=5, backoff=2.5)]
+
+
+class TestAddBisecting:
+    @staticmethod
+    def solr_rejecting(bad_ids: set[str]) -> Mock:
+        def add(docs: list[dict], **kwargs) -> None:
+            if any(doc["id"] in bad_ids for doc in docs):
+                raise SolrError("Solr responded with an error (HTTP 400): bad document")
+
+        solr = Mock(Solr)
+        solr.add.side_effect = add
+        return solr
+
+    def test_single_request_when_all_good(self) -> None:
+        solr = self.solr_rejecting(set())
+        docs = [{"id": str(n)} for n in range(10)]
+
+        assert add_bisecting(solr, docs) == 0
+        solr.add.assert_called_once_with(docs, commit=True)
+
+    def test_only_bad_documents_rejected(self) -> None:
+        solr = self.solr_rejecting({"3", "7"})
+        docs = [{"id": str(n)} for n in range(10)]
+        rejected: list[str] = []
+
+        n_rejected = add_bisecting(
+            solr, docs, on_error=lambda doc, e: rejected.append(doc["id"])
+        )
+
+        assert n_rejected == 2
+        assert rejected == ["3", "7"]
+        added = [
+            doc["id"]
+            for call in solr.add.call_args_list
+            if not any(doc["id"] in {"3", "7"} for doc in call.args[0])
+            for doc in call.args[0]
+        ]
+        assert sorted(added) == ["0", "1", "2", "4", "5", "6", "8", "9"]
+
+    def test_field_updates_passed_to_every_request(self) -> None:
+        solr = self.solr_rejecting({"1"})
+        docs = [{"id": "0", "a": 1}, {"id": "1", "a": 2}]
+
+        add_bisecting(solr, docs, field_updates={"a": "set"})
+
+        assert all(
+            call.kwargs["fieldUpdates"] == {"a": "set"}
+            for call in solr.add.call_args_list
+        )
+        assert len(solr.add.call_args_list) == 3
+
+    def test_connection_errors_are_raised(self) -> None:
+        solr = Mock(Solr)
+
+        def add(docs: list[dict], **kwargs) -> None:
+            try:
+                raise requests.ConnectionError("refused")
+            except requests.ConnectionError:
+                raise SolrError("Failed to connect to server")
+
+        solr.add.side_effect = add
+
+        with pytest.raises(SolrError):
+            add_bisecting(solr, [{"id": "1"}, {"id": "2"}])
+        solr.add.assert_called_once()
+
+    def test_server_errors_are_raised(self) -> None:
+        session = Mock(requests.Session)
+        response = requests.Response()
+        response.status_code = 503
+        response._content = b"Service Unavailable"
+        session.post.return_value = response
+        solr = Solr("http://mock.url/solr/core", session=session)
+        rejected: list[dict] = []
+
+        with pytest.raises(SolrError, match="HTTP 503"):
+            add_bisecting(
+                solr,
+                [{"id": str(n)} for n in range(1000)],
+                on_error=lambda doc, e: rejected.append(doc),
+            )
+        session.post.assert_called_once()
+        assert rejected == []
+
+
+class TestSubmissionSettings:
+    def test_batches_by_document_count(self) -> None:
+        docs = [{"id": str(n)} for n in range(5)]
+        batches = list(SubmissionSettings(batch_docs=2).batches(docs))
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+
+    def test_batches_by_size(self) -> None:
+        docs = [{"id": str(n), "text": "x" * 100} for n in range(5)]
+        batches = list(SubmissionSettings(batch_bytes=250).batches(docs))
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+
+    def test_estimated_size(self) -> None:
+        doc = {"id": "1", "title": ["A title", "Another"], "year": 1900, "x": None}
+        assert estimated_size(doc) >= len(json.dumps(doc))
+        assert estimated_size(doc) < 2 * len(json.dumps(doc))
+
+    def test_estimated_size_of_non_ascii_text(self) -> None:
+        doc = {"id": "1", "title": "ܟܬܒܐ ܕܩܕܝܫܐ"}
+        assert estimated_size(doc) >= len(json.dumps(doc))
+
+    def test_oversized_document_gets_own_batch(self) -> None:
+        docs = [{"id": "1"}, {"id": "2", "text": "x" * 1000}, {"id": "3"}]
+        batches = list(SubmissionSettings(batch_bytes=100).batches(docs))
+        assert [[doc["id"] for doc in batch] for batch in batches] == [
+            ["1"],
+            ["2"],
+            ["3"],
+        ]
+
+    def test_mount_retries_for_solr_only(self) -> None:
+        http = HttpClient()
+        SubmissionSettings(retries=5).mount(http, "http://localhost:8983/solr/ursus")
+
+        retry = cast(
+            HTTPAdapter,
+            http.session.get_adapter("http://localhost:8983/solr/ursus/update"),
+        ).max_retries
+        assert retry.total == 5
+        assert 503 in retry.status_forcelist
+        assert retry.allowed_methods is None
+
+        iiif_retry = cast(
+            HTTPAdapter, http.session.get_adapter("http://iiif.example/manifest")
+        ).max_retries
+        assert iiif_retry.total == 0
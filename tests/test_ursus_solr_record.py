@@ -351,6 +351,29 @@ class TestUrsusSolrRecord:
         record = UrsusSolrRecord.model_validate(minimal_csv_record)
         assert record.uniform_title_sim is None
 
+    def test_computed_fields_are_cached(
+        self, minimal_csv_record: dict[str, Any]
+    ) -> None:
+        record = UrsusSolrRecord.model_validate(
+            {**minimal_csv_record, "Type.typeOfResource": "still image"}
+        )
+
+        assert record.resource_type_sim is record.resource_type_sim
+        assert record.read_access_group_ssim is record.discover_access_group_ssim
+        assert record.download_access_group_ssim is record.discover_access_group_ssim
+
+    def test_cache_cleared_on_assignment(
+        self, minimal_csv_record: dict[str, Any]
+    ) -> None:
+        record = UrsusSolrRecord.model_validate(minimal_csv_record)
+        assert record.uniform_title_sim is None
+        first_dump = record.model_dump()
+
+        record.uniform_title_tesim = ["Uniform Title"]
+        assert record.uniform_title_sim == ["Uniform Title"]
+        assert record.model_dump()["uniform_title_sim"] == ["Uniform Title"]
+        assert first_dump["uniform_title_sim"] is None
+
     # Add more tests for other computed fields as needed
     def test_computed_architect_sim(self, minimal_csv_record: dict[str, Any]) -> None:
         record = UrsusSolrRecord.model_validate(
@@ -830,11 +853,38 @@ class TestUrsusSolrRecord:
             record = UrsusSolrRecord.model_validate(data)
             assert record.architect_sim == ["Arch1"]
 
+        def test_no_computed_fields_skips_serialization(
+            self, minimal_csv_record: dict[str, Any], monkeypatch: pytest.MonkeyPatch
+        ) -> None:
+            def fail(*args: Any, **kwargs: Any) -> None:
+                raise AssertionError("model_dump should not be called")
+
+            monkeypatch.setattr(UrsusSolrRecord, "model_dump", fail)
+            UrsusSolrRecord.model_validate(minimal_csv_record)
+
+        def test_only_given_computed_fields_are_serialized(
+            self, minimal_csv_record: dict[str, Any], monkeypatch: pytest.MonkeyPatch
+        ) -> None:
+            dumped: list[dict[str, Any]] = []
+            original = UrsusSolrRecord.model_dump
+
+            def spy(self: UrsusSolrRecord, **kwargs: Any) -> dict[str, Any]:
+                result = original(self, **kwargs)
+                dumped.append(result)
+                return result
+
+            monkeypatch.setattr(UrsusSolrRecord, "model_dump", spy)
+            UrsusSolrRecord.model_validate(
+                minimal_csv_record
+                | {"architect_tesim": ["Arch1"], "architect_sim": ["Arch1"]}
+            )
+            assert dumped == [{"architect_sim": ["Arch1"]}]
+
         def test_computed_field_missing_in_input(
             self, minimal_csv_record: dict[str, Any]
         ) -> None:
             # If computed field is missing in input, should not raise
-            data = minimal_csv_record | {
+            data: dict[str, Any] = minimal_csv_record | {
                 "architect_tesim": [],
             }
             record = UrsusSolrRecord.model_validate(data)
@@ -844,7 +894,7 @@ class TestUrsusSolrRecord:
             self, minimal_csv_record: dict[str, Any]
         ) -> None:
             # If computed field is empty string but computed is None, should raise
-            data = minimal_csv_record | {
+            data: dict[str, Any] = minimal_csv_record | {
                 "architect_tesim": [],
                 "architect_sim": "",
             }
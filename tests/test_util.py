@@ -3,6 +3,8 @@
 Tests type annotations, validators, and enums defined in the shared_types __init__.py.
 """
 
+from collections.abc import Iterator
+
 import pytest
 from pydantic import BaseModel, TypeAdapter, ValidationError
 
@@ -301,3 +303,33 @@ class TestSerializeTerm:
     def test_none(self):
         result = util.serialize_term(None, by="id")
         assert result is None
+
+
+class TestChunked:
+    def test_splits_into_chunks(self) -> None:
+        assert list(util.chunked(range(5), 2)) == [[0, 1], [2, 3], [4]]
+
+    def test_empty(self) -> None:
+        empty: list[int] = []
+        assert list(util.chunked(empty, 3)) == []
+
+    def test_consumes_lazily(self) -> None:
+        def numbers() -> Iterator[int]:
+            yield 1
+            yield 2
+            raise AssertionError("consumed too far")
+
+        assert next(util.chunked(numbers(), 2)) == [1, 2]
+
+
+class TestSolrQuote:
+    @pytest.mark.parametrize(
+        ("value", "expected"),
+        [
+            ("ark:/21198/z1", '"ark:/21198/z1"'),
+            ('say "hi"', '"say \\"hi\\""'),
+            ("back\\slash", '"back\\\\slash"'),
+        ],
+    )
+    def test_quotes(self, value: str, expected: str) -> None:
+        assert util.solr_quote(value) == expected